@@ -19,6 +19,7 @@ except ImportError:
     except Exception:
         __version__ = 'unknown'
 
+from .capabilities import CapabilityCache
 from .const import GOODWE_TCP_PORT, GOODWE_UDP_PORT
 from .dt import DT
 from .es import ES
@@ -28,6 +29,7 @@ from .hca import HCA
 from .inverter import Inverter, OperationMode, Sensor, SensorKind
 from .model import DT_MODEL_TAGS, ES_MODEL_TAGS, ET_MODEL_TAGS, HCA_MODEL_TAGS
 from .protocol import ProtocolCommand, UdpInverterProtocol, Aa55ProtocolCommand
+from .retry import CircuitBreaker, RetryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +44,8 @@ DISCOVERY_COMMAND = Aa55ProtocolCommand("010200", "0182")
 
 
 async def connect(host: str, port: int = GOODWE_UDP_PORT, family: str = None, comm_addr: int = 0, timeout: int = 1,
-                  retries: int = 3, do_discover: bool = True) -> Inverter:
+                  retries: int = 3, do_discover: bool = True,
+                  capability_cache: CapabilityCache | None = None) -> Inverter:
     """Contact the inverter at the specified host/port and answer appropriate Inverter instance.
 
     The specific inverter family/type will be detected automatically, but it can be passed explicitly.
@@ -54,6 +57,9 @@ async def connect(host: str, port: int = GOODWE_UDP_PORT, family: str = None, co
     Since the UDP communication is by definition unreliable, when no (valid) response is received by the specified
     timeout, it is considered lost and the command will be re-tried up to retries times.
 
+    When capability_cache is provided, the inverter capabilities learned by probing it are restored from it
+    (and stored to it), so they do not have to be probed again on every connect.
+
     Raise InverterError if unable to contact or recognise supported inverter.
     """
     if family in ET_FAMILY:
@@ -65,17 +71,20 @@ async def connect(host: str, port: int = GOODWE_UDP_PORT, family: str = None, co
     elif family in HCA_FAMILY:
         inv = HCA(host, port, comm_addr if comm_addr else 0xF7, timeout, retries)
     elif do_discover:
-        return await discover(host, port, timeout, retries)
+        return await discover(host, port, timeout, retries, capability_cache)
     else:
         raise InverterError("Specify either an inverter family or set do_discover True")
 
+    inv.set_capability_cache(capability_cache)
+
     logger.debug("Connecting to %s family inverter at %s:%s.", family, host, port)
     await inv.read_device_info()
     logger.debug("Connected to inverter %s, S/N:%s.", inv.model_name, inv.serial_number)
     return inv
 
 
-async def discover(host: str, port: int = GOODWE_UDP_PORT, timeout: int = 1, retries: int = 3) -> Inverter:
+async def discover(host: str, port: int = GOODWE_UDP_PORT, timeout: int = 1, retries: int = 3,
+                   capability_cache: CapabilityCache | None = None) -> Inverter:
     """Contact the inverter at the specified value and answer appropriate Inverter instance
 
     Raise InverterError if unable to contact or recognise supported inverter
@@ -116,6 +125,7 @@ async def discover(host: str, port: int = GOODWE_UDP_PORT, timeout: int = 1, ret
                         i = HCA(host, port, 0, timeout, retries)
                         break
             if i:
+                i.set_capability_cache(capability_cache)
                 await i.read_device_info()
                 logger.debug("Connected to inverter %s, S/N:%s.", i.model_name, i.serial_number)
                 return i
@@ -126,6 +136,7 @@ async def discover(host: str, port: int = GOODWE_UDP_PORT, timeout: int = 1, ret
     # Probe inverter specific protocols
     for inv in [ET, DT, ES]:
         i = inv(host, port, 0, timeout, retries)
+        i.set_capability_cache(capability_cache)
         try:
             logger.debug("Probing %s inverter at %s.", inv.__name__, host)
             await i.read_device_info()
@@ -0,0 +1,89 @@
+"""Negative cache of inverter registers availability."""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class _IllegalRange:
+    """Range of registers the inverter rejected with ILLEGAL DATA ADDRESS"""
+
+    def __init__(self, offset: int, count: int, recorded_at: float):
+        self.offset: int = offset
+        self.count: int = count
+        self.hits: int = 1
+        self.recorded_at: float = recorded_at
+
+    def overlaps(self, offset: int, count: int) -> bool:
+        return offset < self.offset + self.count and self.offset < offset + count
+
+
+class RegisterAvailability:
+    """
+    Map of register ranges known to be not available on the inverter.
+
+    Only the reads rejected with ILLEGAL DATA ADDRESS are recorded (not communication failures),
+    so such registers do not have to be queried (and fail) again and again.
+    The recorded ranges expire after ttl seconds (None means never), after that they are queried again.
+    The hits count tells how many times the range was rejected or the (skipped) read was avoided.
+    The instance can be passed as exclude argument to plan_reads().
+    """
+
+    def __init__(self, ttl: float | None = 3600, clock: Callable[[], float] = time.monotonic):
+        self.ttl: float | None = ttl
+        self._clock: Callable[[], float] = clock
+        self._ranges: dict[tuple[int, int], _IllegalRange] = {}
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def __contains__(self, register: int) -> bool:
+        """Answer True if the register is known to be not available"""
+        return bool(self._ranges) and self._find(register, 1) is not None
+
+    def _expire(self) -> None:
+        if self.ttl is not None and self._ranges:
+            now = self._clock()
+            for key in [k for k, r in self._ranges.items() if now - r.recorded_at >= self.ttl]:
+                del self._ranges[key]
+
+    def _find(self, offset: int, count: int) -> _IllegalRange | None:
+        self._expire()
+        for illegal in self._ranges.values():
+            if illegal.overlaps(offset, count):
+                return illegal
+        return None
+
+    def record_rejected(self, offset: int, count: int = 1) -> None:
+        """Record the registers read was rejected with ILLEGAL DATA ADDRESS"""
+        illegal = self._ranges.get((offset, count))
+        if illegal:
+            illegal.hits += 1
+            illegal.recorded_at = self._clock()
+        else:
+            logger.debug("Registers %d-%d not available.", offset, offset + count - 1)
+            self._ranges[(offset, count)] = _IllegalRange(offset, count, self._clock())
+
+    def is_available(self, offset: int, count: int = 1) -> bool:
+        """Answer False if any of the registers is known to be not available"""
+        if not self._ranges:
+            return True
+        illegal = self._find(offset, count)
+        if illegal:
+            illegal.hits += 1
+            return False
+        return True
+
+    def clear(self) -> None:
+        """Forget all recorded ranges"""
+        self._ranges.clear()
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Answer the (not expired) ranges recorded as not available, with their hits counts and age"""
+        self._expire()
+        now = self._clock()
+        return [{"offset": r.offset, "count": r.count, "hits": r.hits, "age": now - r.recorded_at}
+                for r in sorted(self._ranges.values(), key=lambda r: r.offset)]
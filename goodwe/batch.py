@@ -0,0 +1,257 @@
+"""Vectorized decoding of recorded register captures (requires optional numpy dependency)."""
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+from .protocol import ProtocolCommand, ProtocolResponse
+
+if TYPE_CHECKING:
+    from .inverter import Sensor
+    from .sensor import Derived
+
+logger = logging.getLogger(__name__)
+
+# Numpy dtypes of struct format characters used by decoder codecs
+_DTYPES = {'b': 'i1', 'H': '>u2', 'h': '>i2', 'I': '>u4', 'i': '>i4', 'Q': '>u8', 'f': '>f4'}
+
+_array_posts: dict[type, Callable[[Any, Any, Sensor], Any]] | None = None
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as ex:
+        raise ImportError("Batch decoding requires numpy, install it with 'pip install goodwe[numpy]'.") from ex
+    return numpy
+
+
+def _sensor_array_posts() -> dict[type, Callable[[Any, Any, Sensor], Any]]:
+    """
+    Answer the vectorized post-processing (np, raw column, sensor) of sensor types,
+    producing the same values as their read_value(), None values being masked.
+    """
+    global _array_posts
+    if _array_posts is None:
+        from .sensor import Apparent, Apparent4, Byte, ByteH, ByteL, CellVoltage, Current, CurrentS, Decimal, \
+            Energy, Energy4, Energy4W, Energy8, Enum, Enum2, EnumH, EnumL, Float, Frequency, Integer, IntegerS, \
+            Long, LongS, Power, Power4, Power4S, PowerS, Reactive, Reactive4, Temp, Voltage
+
+        def tenth_or_zero(np, v, s):
+            return np.where(v == 0xffff, 0, v / 10)
+
+        def masked(undef, scale=None):
+            def post(np, v, s):
+                return np.ma.masked_array(v / scale if scale else v, mask=v == undef)
+
+            return post
+
+        def labels(np, v, s):
+            return np.array([s._labels.get(int(x)) for x in v], dtype=object)
+
+        def raw(np, v, s):
+            return v
+
+        _array_posts = {
+            Voltage: tenth_or_zero,
+            Current: tenth_or_zero,
+            CurrentS: lambda np, v, s: v / 10,
+            Frequency: lambda np, v, s: v / 100,
+            Power: masked(0xffff),
+            PowerS: raw,
+            Power4: masked(0xffffffff),
+            Power4S: raw,
+            Energy: masked(0xffff, 10),
+            Energy4: masked(0xffffffff, 10),
+            Energy4W: masked(0xffffffff, 1000),
+            Energy8: masked(0xffffffffffffffff, 100),
+            Apparent: raw,
+            Apparent4: raw,
+            Reactive: raw,
+            Reactive4: raw,
+            Temp: lambda np, v, s: np.ma.masked_array(v / 10, mask=(v == -1) | (v == 32767)),
+            CellVoltage: lambda np, v, s: tenth_or_zero(np, v, s) / 100,
+            Byte: raw,
+            ByteH: raw,
+            ByteL: raw,
+            Integer: lambda np, v, s: np.where(v == 0xffff, 0, v),
+            IntegerS: raw,
+            Long: lambda np, v, s: np.where(v == 0xffffffff, 0, v),
+            LongS: raw,
+            Decimal: lambda np, v, s: v / s.scale,
+            Float: lambda np, v, s: np.round(v.astype(np.float64) / s.scale, 3),
+            Enum: labels,
+            EnumH: labels,
+            EnumL: labels,
+            Enum2: lambda np, v, s: labels(np, np.where(v == 0xffff, 0, v), s),
+        }
+    return _array_posts
+
+
+class _FrameResponse(ProtocolResponse):
+    """Single frame of the batch, used for sensors which can't be decoded vectorized"""
+
+    def __init__(self, data: bytes, start: int, step: int):
+        super().__init__(data, None)
+        self._start: int = start
+        self._step: int = step
+
+    def _position_of(self, address: int) -> int:
+        return super()._position_of(self._start + self._step * address)
+
+
+class FrameBatch:
+    """
+    Batch of N recorded response data frames (of the same block) as (N x block bytes) uint8 array.
+
+    The register values are accessed as columns (arrays of N values) by the register address.
+    The methods are also used by array_formula of Derived sensors.
+    """
+
+    def __init__(self, data: Any, command: ProtocolCommand | None = None):
+        np = _numpy()
+        self.np = np
+        self.data = np.asarray(data, dtype=np.uint8)
+        if self.data.ndim != 2:
+            raise ValueError(f"Expected 2-dimensional array of frames, got {self.data.ndim} dimension(s).")
+        if command is not None:
+            self.start: int = command.get_offset(0)
+            self.step: int = command.get_offset(1) - self.start
+        else:
+            self.start, self.step = 0, 1
+
+    @classmethod
+    def from_hex(cls, frames: Iterable[str], command: ProtocolCommand) -> FrameBatch:
+        """Create batch from raw responses (hex strings, as stored in sample files) of the command"""
+        np = _numpy()
+        rows = [np.frombuffer(command.trim_response(bytes.fromhex(frame.strip())), dtype=np.uint8)
+                for frame in frames]
+        return cls(np.stack(rows), command)
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def position(self, address: int) -> int:
+        """Answer the byte position of the register within the frames"""
+        return self.start + self.step * address
+
+    def contains(self, address: int, size: int) -> bool:
+        """Answer True if the frames contain the size bytes at register address"""
+        position = self.position(address)
+        return 0 <= position and position + size <= self.data.shape[1]
+
+    def column(self, address: int, dtype: str, shift: int = 0) -> Any:
+        """Answer the column of (big-endian) dtype values at register address (and byte shift)"""
+        np = self.np
+        position = self.position(address) + shift
+        size = np.dtype(dtype).itemsize
+        return np.ascontiguousarray(self.data[:, position:position + size]).view(dtype)[:, 0]
+
+    def _integers(self, address: int, dtype: str, undef_raw: int, undef: int | None) -> Any:
+        values = self.column(address, dtype).astype(self.np.int64)
+        if undef is not None:
+            values = self.np.where(values == undef_raw, undef, values)
+        return values
+
+    def uint16(self, address: int, undef: int | None = None) -> Any:
+        """Answer the column of 2 byte unsigned int values (0xffff replaced with undef if specified)"""
+        return self._integers(address, '>u2', 0xffff, undef)
+
+    def int16(self, address: int) -> Any:
+        """Answer the column of 2 byte signed int values"""
+        return self._integers(address, '>i2', 0, None)
+
+    def uint32(self, address: int, undef: int | None = None) -> Any:
+        """Answer the column of 4 byte unsigned int values (0xffffffff replaced with undef if specified)"""
+        return self._integers(address, '>u4', 0xffffffff, undef)
+
+    def int32(self, address: int) -> Any:
+        """Answer the column of 4 byte signed int values"""
+        return self._integers(address, '>i4', 0, None)
+
+    def defined(self, values: Any, undef: Any) -> Any:
+        """Answer the values with the undefined (masked) ones replaced by undef"""
+        return self.np.ma.filled(values, undef)
+
+    def positive(self, values: Any) -> Any:
+        """Answer the values with negative ones replaced by 0"""
+        return self.np.maximum(values, 0)
+
+    def frame(self, index: int) -> ProtocolResponse:
+        """Answer the single frame as ProtocolResponse"""
+        return _FrameResponse(self.data[index].tobytes(), self.start, self.step)
+
+    def decode(self, sensors: tuple[Sensor, ...]) -> dict[str, Any]:
+        """
+        Decode the sensors values of all frames, answer dictionary of columns (arrays) by sensor id.
+        The undefined (None) values are masked, sensor types without vectorized codec
+        (e.g. Calculated sensors) are decoded frame by frame.
+        Derived sensors are evaluated from the decoded columns, by array_formula when available.
+        """
+        from .decoder import _sensor_codecs
+        from .derived import evaluation_order
+        from .sensor import Derived
+
+        np = self.np
+        codecs = _sensor_codecs()
+        posts = _sensor_array_posts()
+        result = {}
+        for sensor in sensors:
+            if isinstance(sensor, Derived):
+                continue
+            post = posts.get(type(sensor))
+            if post is not None:
+                fmt, shift, _ = codecs[type(sensor)](sensor)
+                dtype = _DTYPES[fmt]
+                if self.contains(sensor.offset, np.dtype(dtype).itemsize + shift):
+                    result[sensor.id_] = post(np, self.column(sensor.offset, dtype, shift), sensor)
+                    continue
+            result[sensor.id_] = self._decode_frames(sensor)
+        for sensor in evaluation_order(s for s in sensors if isinstance(s, Derived)):
+            if all(i in result for i in sensor.inputs):
+                result[sensor.id_] = self._evaluate(sensor, [result[i] for i in sensor.inputs])
+        return result
+
+    def _evaluate(self, sensor: Derived, inputs: list[Any]) -> Any:
+        if sensor.array_formula is not None:
+            return sensor.array_formula(self, *inputs)
+        values = []
+        for row in zip(*(self._values(column) for column in inputs)):
+            try:
+                values.append(sensor.formula(*row))
+            except (ArithmeticError, TypeError, ValueError):
+                values.append(None)
+        return self._object_column(values)
+
+    def _values(self, column: Any) -> list[Any]:
+        """Answer values of the column as list, with masked values replaced by None"""
+        if self.np.ma.isMaskedArray(column):
+            return [None if masked else value
+                    for value, masked in zip(column.data.tolist(), self.np.ma.getmaskarray(column))]
+        return column.tolist()
+
+    def _object_column(self, values: list[Any]) -> Any:
+        column = self.np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+
+    def _decode_frames(self, sensor: Sensor) -> Any:
+        values = []
+        for index in range(len(self)):
+            try:
+                values.append(sensor.read(self.frame(index)))
+            except ValueError:
+                logger.debug("Error reading sensor %s of frame %d.", sensor.id_, index)
+                values.append(None)
+        return self._object_column(values)
+
+
+def decode_frames(frames: Any, sensors: tuple[Sensor, ...], command: ProtocolCommand | None = None) \
+        -> dict[str, Any]:
+    """
+    Decode the sensors values of (N x block bytes) uint8 array of response data frames.
+    When command is provided, the sensors offsets are register addresses of its response data,
+    otherwise they are byte positions within the frames.
+    Answer dictionary of columns (numpy arrays) by sensor id.
+    """
+    return FrameBatch(frames, command).decode(sensors)
@@ -0,0 +1,68 @@
+"""Persistent cache of inverter capabilities."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class CapabilityCache:
+    """
+    Cache of inverter capabilities (supported register blocks, settings variants etc.)
+    learned by probing the inverter, so they do not have to be probed again on next connect.
+
+    The entries are keyed by inverter serial number and are valid only for the firmware
+    they were learned with, any firmware change means the inverter has to be probed again.
+    When path is provided, the cache is loaded from and saved to that (JSON) file,
+    otherwise it is kept in memory only.
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None):
+        self.path: str | os.PathLike | None = path
+        self._entries: dict[str, dict[str, Any]] = {}
+        if path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                entries = json.load(file)
+            if isinstance(entries, dict):
+                self._entries = entries
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as ex:
+            logger.debug("Cannot load capability cache %s: %s", self.path, ex)
+
+    def _save(self) -> None:
+        tmp_path = f"{os.fspath(self.path)}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self._entries, file, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as ex:
+            logger.debug("Cannot save capability cache %s: %s", self.path, ex)
+
+    def get(self, serial_number: str, firmware: str) -> dict[str, Any] | None:
+        """Answer the capabilities learned for the inverter, or None if unknown or learned with other firmware"""
+        entry = self._entries.get(serial_number)
+        if not entry or entry.get("firmware") != firmware:
+            return None
+        return dict(entry.get("capabilities", {}))
+
+    def put(self, serial_number: str, firmware: str, capabilities: dict[str, Any]) -> None:
+        """Store the capabilities learned for the inverter (and save the cache file if they changed)"""
+        entry = {"firmware": firmware, "capabilities": dict(capabilities)}
+        if self._entries.get(serial_number) == entry:
+            return
+        self._entries[serial_number] = entry
+        if self.path is not None:
+            self._save()
+
+    def remove(self, serial_number: str) -> None:
+        """Forget the capabilities of the inverter, so it will be probed again on next connect"""
+        if self._entries.pop(serial_number, None) is not None and self.path is not None:
+            self._save()
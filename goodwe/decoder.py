@@ -0,0 +1,227 @@
+"""Compiled decoder of sensor values from response data."""
+from __future__ import annotations
+
+import logging
+from struct import Struct
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from .inverter import Sensor
+    from .protocol import ProtocolResponse
+
+logger = logging.getLogger(__name__)
+
+# Maximal number of distinct sensor tuples with cached decoder
+MAX_DECODERS = 256
+
+# Codecs of sensor types: (struct format character, byte shift within sensor offset, post-processing of raw value)
+_codecs: dict[type, Callable[[Sensor], tuple[str, int, Callable[[Any], Any] | None]]] | None = None
+_decoders: dict[int, tuple[tuple[Sensor, ...], SensorDecoder]] = {}
+
+
+def _tenth_or_zero(value: int) -> float:
+    return float(value) / 10 if value != 0xffff else 0
+
+
+def _tenth(value: int) -> float:
+    return float(value) / 10
+
+
+def _undef2(value: int) -> int | None:
+    return None if value == 0xffff else value
+
+
+def _undef4(value: int) -> int | None:
+    return None if value == 0xffffffff else value
+
+
+def _zero_undef2(value: int) -> int:
+    return 0 if value == 0xffff else value
+
+
+def _zero_undef4(value: int) -> int:
+    return 0 if value == 0xffffffff else value
+
+
+def _energy2(value: int) -> float | None:
+    return float(value) / 10 if value != 0xffff else None
+
+
+def _energy4(value: int) -> float | None:
+    return float(value) / 10 if value != 0xffffffff else None
+
+
+def _energy4w(value: int) -> float | None:
+    return float(value) / 1000 if value != 0xffffffff else None
+
+
+def _energy8(value: int) -> float | None:
+    return float(value) / 100 if value != 0xffffffffffffffff else None
+
+
+def _frequency(value: int) -> float:
+    return float(value) / 100
+
+
+def _temperature(value: int) -> float | None:
+    if value == -1 or value == 32767:
+        return None
+    return float(value) / 10
+
+
+def _cell_voltage(value: int) -> float:
+    return _tenth_or_zero(value) / 100
+
+
+def _sensor_codecs() -> dict[type, Callable[[Sensor], tuple[str, int, Callable[[Any], Any] | None]]]:
+    """
+    Answer the codecs of the (exact) sensor types, producing the same values as their read_value().
+    Sensor types not listed here (or their subclasses) are decoded by their own read_value().
+    """
+    global _codecs
+    if _codecs is None:
+        from .sensor import Apparent, Apparent4, Byte, ByteH, ByteL, CellVoltage, Current, CurrentS, Decimal, \
+            Energy, Energy4, Energy4W, Energy8, Enum, Enum2, EnumH, EnumL, Float, Frequency, Integer, IntegerS, \
+            Long, LongS, Power, Power4, Power4S, PowerS, Reactive, Reactive4, Temp, Voltage
+
+        _codecs = {
+            Voltage: lambda s: ('H', 0, _tenth_or_zero),
+            Current: lambda s: ('H', 0, _tenth_or_zero),
+            CurrentS: lambda s: ('h', 0, _tenth),
+            Frequency: lambda s: ('h', 0, _frequency),
+            Power: lambda s: ('H', 0, _undef2),
+            PowerS: lambda s: ('h', 0, None),
+            Power4: lambda s: ('I', 0, _undef4),
+            Power4S: lambda s: ('i', 0, None),
+            Energy: lambda s: ('H', 0, _energy2),
+            Energy4: lambda s: ('I', 0, _energy4),
+            Energy4W: lambda s: ('I', 0, _energy4w),
+            Energy8: lambda s: ('Q', 0, _energy8),
+            Apparent: lambda s: ('h', 0, None),
+            Apparent4: lambda s: ('i', 0, None),
+            Reactive: lambda s: ('h', 0, None),
+            Reactive4: lambda s: ('i', 0, None),
+            Temp: lambda s: ('h', 0, _temperature),
+            CellVoltage: lambda s: ('H', 0, _cell_voltage),
+            Byte: lambda s: ('b', 0, None),
+            ByteH: lambda s: ('b', 0, None),
+            ByteL: lambda s: ('b', 1, None),
+            Integer: lambda s: ('H', 0, _zero_undef2),
+            IntegerS: lambda s: ('h', 0, None),
+            Long: lambda s: ('I', 0, _zero_undef4),
+            LongS: lambda s: ('i', 0, None),
+            Decimal: lambda s: ('h', 0, lambda v, scale=s.scale: float(v) / scale),
+            Float: lambda s: ('f', 0, lambda v, scale=s.scale: round(v / scale, 3)),
+            Enum: lambda s: ('b', 0, s._labels.get),
+            EnumH: lambda s: ('b', 0, s._labels.get),
+            EnumL: lambda s: ('b', 1, s._labels.get),
+            Enum2: lambda s: ('H', 0, lambda v, labels=s._labels: labels.get(_zero_undef2(v))),
+        }
+    return _codecs
+
+
+class _DecodePlan:
+    """
+    Decoding plan of sensors for particular response layout.
+
+    The sensors with known codec are unpacked by (usually single) struct format per non-overlapping lane,
+    the raw values are then post-processed (scale, sign, undefined value) in single pass.
+    """
+
+    def __init__(self, sensors: tuple[Sensor, ...], start: int, step: int, length: int):
+        from .sensor import Derived
+
+        # derived sensors are not read from response, they are evaluated later from other values
+        sensors = tuple(s for s in sensors if not isinstance(s, Derived))
+        self.ids: tuple[str, ...] = tuple(s.id_ for s in sensors)
+        self.lanes: list[Struct] = []
+        self.slots: list[tuple[int, Callable[[Any], Any] | None]] = []
+        self.fallback: list[tuple[int, Sensor]] = []
+
+        codecs = _sensor_codecs()
+        fields = []
+        for index, sensor in enumerate(sensors):
+            codec = codecs.get(type(sensor))
+            if codec is not None:
+                fmt, shift, post = codec(sensor)
+                position = start + step * sensor.offset + shift
+                size = Struct('>' + fmt).size
+                # values (partially) outside of response data are left to read_value() and its semantics
+                if 0 <= position and position + size <= length:
+                    fields.append((position, size, fmt, index, post))
+                    continue
+            self.fallback.append((index, sensor))
+
+        fields.sort(key=lambda f: f[0])
+        while fields:
+            formats = ['>']
+            cursor = 0
+            overlapping = []
+            for field in fields:
+                position, size, fmt, index, post = field
+                if position < cursor:
+                    overlapping.append(field)
+                    continue
+                if position > cursor:
+                    formats.append(f'{position - cursor}x')
+                formats.append(fmt)
+                cursor = position + size
+                self.slots.append((index, post))
+            self.lanes.append(Struct(''.join(formats)))
+            fields = overlapping
+
+    def decode(self, data: memoryview, response: ProtocolResponse) -> dict[str, Any]:
+        raw = []
+        for lane in self.lanes:
+            raw.extend(lane.unpack_from(data))
+        values: list[Any] = [None] * len(self.ids)
+        for (index, post), value in zip(self.slots, raw):
+            values[index] = post(value) if post is not None else value
+        for index, sensor in self.fallback:
+            try:
+                values[index] = sensor.read(response)
+            except ValueError:
+                logger.exception("Error reading sensor %s.", sensor.id_)
+        return dict(zip(self.ids, values))
+
+
+class SensorDecoder:
+    """
+    Decoder of the sensors values from response data.
+
+    The decoding plan is compiled once per response layout (response data offset of the block base address
+    and data length) and gives identical results as reading the sensors one by one with Sensor.read().
+    The sensor types without known codec (custom sensors) are read by their own read_value(),
+    derived sensors are left out (see derived.py).
+    """
+
+    def __init__(self, sensors: tuple[Sensor, ...]):
+        self.sensors: tuple[Sensor, ...] = sensors
+        self._plans: dict[tuple[int, int, int], _DecodePlan] = {}
+
+    def decode(self, response: ProtocolResponse) -> dict[str, Any]:
+        """Decode the sensors values from the response"""
+        data = response.data
+        if response.command is not None:
+            start = response.command.get_offset(0)
+            step = response.command.get_offset(1) - start
+        else:
+            start, step = 0, 1
+        key = (start, step, len(data))
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = _DecodePlan(self.sensors, start, step, len(data))
+            self._plans[key] = plan
+        return plan.decode(data, response)
+
+
+def decoder_for(sensors: tuple[Sensor, ...]) -> SensorDecoder:
+    """Answer the (cached) decoder of the sensors tuple"""
+    entry = _decoders.get(id(sensors))
+    if entry is not None and entry[0] is sensors:
+        return entry[1]
+    decoder = SensorDecoder(sensors)
+    if len(_decoders) >= MAX_DECODERS:
+        del _decoders[next(iter(_decoders))]
+    _decoders[id(sensors)] = (sensors, decoder)
+    return decoder
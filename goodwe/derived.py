@@ -0,0 +1,74 @@
+"""Evaluation of derived sensors (values calculated from values of other sensors)."""
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, MutableMapping
+
+from .lazy import LazyRuntimeData
+
+if TYPE_CHECKING:
+    from .sensor import Derived
+
+logger = logging.getLogger(__name__)
+
+
+def evaluation_order(sensors: Iterable[Derived]) -> tuple[Derived, ...]:
+    """
+    Answer the derived sensors ordered so each one comes after the derived sensors it depends on.
+    Raise ValueError if the sensors depend on each other in cycle.
+    """
+    pending = {s.id_: s for s in sensors}
+    ordered: list[Derived] = []
+    done: set[str] = set()
+    while pending:
+        ready = [s for s in pending.values() if all(i in done or i not in pending for i in s.inputs)]
+        if not ready:
+            raise ValueError(f"Derived sensors {sorted(pending)} depend on each other in cycle.")
+        for sensor in ready:
+            ordered.append(sensor)
+            done.add(sensor.id_)
+            del pending[sensor.id_]
+    return tuple(ordered)
+
+
+def required_ids(sensors: tuple[Derived, ...], sensor_ids: Iterable[str]) -> set[str]:
+    """Answer the sensor ids extended with (transitive) inputs of the derived sensors among them"""
+    derived = {s.id_: s for s in sensors}
+    result = set()
+    pending = list(sensor_ids)
+    while pending:
+        sensor_id = pending.pop()
+        if sensor_id not in result:
+            result.add(sensor_id)
+            if sensor_id in derived:
+                pending.extend(derived[sensor_id].inputs)
+    return result
+
+
+def formula_value(sensor: Derived, data: Mapping[str, Any]) -> Any:
+    """Answer the value of derived sensor calculated from (input) values in data, None on error"""
+    try:
+        return sensor.formula(*(data.get(i) for i in sensor.inputs))
+    except (ArithmeticError, TypeError, ValueError):
+        logger.exception("Error evaluating sensor %s.", sensor.id_)
+        return None
+
+
+def evaluate(sensors: tuple[Derived, ...], data: MutableMapping[str, Any], known: set[str] | None = None) \
+        -> MutableMapping[str, Any]:
+    """
+    Evaluate the derived sensors (in evaluation order) over data and add their values to it.
+    When known sensor ids are provided, only the known derived sensors are evaluated
+    and their inputs which are not known (not present on the inverter model) are passed as None.
+    Sensors with any (other) input missing in data (e.g. its block was not read) are skipped.
+    In LazyRuntimeData the sensors are evaluated only when their values are accessed.
+    """
+    for sensor in sensors:
+        if known is not None and sensor.id_ not in known:
+            continue
+        if all(i in data or (known is not None and i not in known) for i in sensor.inputs):
+            if isinstance(data, LazyRuntimeData):
+                data.add_derived(sensor)
+            else:
+                data[sensor.id_] = formula_value(sensor, data)
+    return data
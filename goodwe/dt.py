@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 import logging
+from typing import Iterable
 
 from .const import *
 from .exceptions import InverterError, RequestFailedException, RequestRejectedException
 from .inverter import Inverter, OperationMode, SensorKind as Kind
 from .modbus import ILLEGAL_DATA_ADDRESS
 from .model import is_3_mppt, is_single_phase
+from .negotiator import BlockNegotiator
 from .protocol import ProtocolCommand
 from .sensor import *
 
@@ -158,7 +160,7 @@ class DT(Inverter):
         self._sensors_meter = self.__all_sensors_meter
         self._settings: dict[str, Sensor] = {s.id_: s for s in self.__all_settings}
         self._sensors_map: dict[str, Sensor] | None = None
-        self._has_meter: bool = True
+        self._meter_block: BlockNegotiator = BlockNegotiator('meter', (self._READ_METER_DATA,))
 
     @staticmethod
     def _single_phase_only(s: Sensor) -> bool:
@@ -170,6 +172,9 @@ class DT(Inverter):
         """Filter to exclude sensors on < 3 PV inverters"""
         return not s.id_.endswith('pv3')
 
+    def _probe_command(self) -> ProtocolCommand | None:
+        return self._read_command(0x7531, 1)
+
     async def read_device_info(self):
         response = await self._read_from_socket(self._READ_DEVICE_VERSION_INFO)
         response = response.response_data()
@@ -212,17 +217,21 @@ class DT(Inverter):
         except InverterError as e:
             logger.debug("Could not read meter version info.")
 
-    async def read_runtime_data(self) -> dict[str, Any]:
-        response = await self._read_from_socket(self._READ_RUNNING_DATA)
-        data = self._map_response(response, self._sensors)
+    async def _read_runtime_data(self, sensor_ids: Iterable[str] | None) -> dict[str, Any]:
+        ids = set(sensor_ids) if sensor_ids is not None else None
+        data = self._runtime_values()
+        if ids is None or any(s.id_ in ids for s in self._sensors):
+            response = await self._read_from_socket(self._READ_RUNNING_DATA)
+            data = self._map_runtime_response(response, self._sensors)
 
-        if self._has_meter:
+        if ids is None or any(s.id_ in ids for s in self._sensors_meter):
             try:
-                response = await self._read_from_socket(self._READ_METER_DATA)
-                data.update(self._map_response(response, self._sensors_meter))
+                response = await self._meter_block.read(self._read_from_socket)
+                if response is not None:
+                    data.update(self._map_runtime_response(response, self._sensors_meter))
             except (RequestRejectedException, RequestFailedException):
                 logger.info("Meter values not supported, disabling further attempts.")
-                self._has_meter = False
+                self._meter_block.mark_unsupported()
 
         return data
 
@@ -238,6 +247,9 @@ class DT(Inverter):
     async def read_setting(self, setting_id: str) -> Any:
         setting = self._settings.get(setting_id)
         if setting:
+            value = self._shadow_value(setting)
+            if value is not None:
+                return value
             return await self._read_sensor(setting)
         if setting_id.startswith("modbus"):
             response = await self._read_from_socket(self._read_command(int(setting_id[7:]), 1))
@@ -245,14 +257,16 @@ class DT(Inverter):
         raise ValueError(f'Unknown setting "{setting_id}"')
 
     async def _read_sensor(self, setting: Sensor) -> Any:
+        count = (setting.size_ + (setting.size_ % 2)) // 2
+        if not self._availability.is_available(setting.offset, count):
+            raise ValueError(f'Unknown sensor/setting "{setting.id_}"')
         try:
-            count = (setting.size_ + (setting.size_ % 2)) // 2
             response = await self._read_from_socket(self._read_command(setting.offset, count))
             return setting.read_value(response)
         except RequestRejectedException as ex:
             if ex.message == ILLEGAL_DATA_ADDRESS:
                 logger.debug("Unsupported sensor/setting %s", setting.id_)
-                self._settings.pop(setting.id_, None)
+                self._availability.record_rejected(setting.offset, count)
                 raise ValueError(f'Unknown sensor/setting "{setting.id_}"')
             return None
 
@@ -266,11 +280,13 @@ class DT(Inverter):
             else:
                 raise ValueError(f'Unknown setting "{setting_id}"')
 
+    async def write_settings(self, values: dict[str, Any]) -> dict[str, Exception | None]:
+        return await self._write_settings_batch(values, self._settings)
+
     async def _write_setting(self, setting: Sensor, value: Any):
         if setting.size_ == 1:
             # modbus can address/store only 16 bit values, read the other 8 bytes
-            response = await self._read_from_socket(self._read_command(setting.offset, 1))
-            raw_value = setting.encode_value(value, response.response_data()[0:2])
+            raw_value = setting.encode_value(value, await self._read_registers(setting.offset, 1))
         else:
             raw_value = setting.encode_value(value)
         if len(raw_value) <= 2:
@@ -280,11 +296,14 @@ class DT(Inverter):
             await self._read_from_socket(self._write_multi_command(setting.offset, raw_value))
 
     async def read_settings_data(self) -> dict[str, Any]:
-        data = {}
-        for setting in self.settings():
-            value = await self.read_setting(setting.id_)
-            data[setting.id_] = value
-        return data
+        return await self._read_sensors(self.settings(), self._read_setting_or_none)
+
+    async def _read_setting_or_none(self, setting: Sensor) -> Any:
+        try:
+            return await self.read_setting(setting.id_)
+        except (ValueError, RequestFailedException):
+            logger.exception("Error reading setting %s.", setting.id_)
+            return None
 
     async def get_grid_export_limit(self) -> int:
         return await self.read_setting('grid_export_limit')
@@ -316,7 +335,7 @@ class DT(Inverter):
 
     def sensors(self) -> tuple[Sensor, ...]:
         result = self._sensors
-        if self._has_meter:
+        if self._meter_block.supported:
             result = result + self._sensors_meter
         return result
 
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from typing import Iterable
 
 from .const import *
 from .exceptions import InverterError
@@ -201,9 +202,9 @@ class ES(Inverter):
         if self._supports_eco_mode_v2():
             self._settings.update({s.id_: s for s in self.__settings_arm_fw_14})
 
-    async def read_runtime_data(self) -> dict[str, Any]:
+    async def _read_runtime_data(self, sensor_ids: Iterable[str] | None) -> dict[str, Any]:
         response = await self._read_from_socket(self._READ_DEVICE_RUNNING_DATA)
-        data = self._map_response(response, self.__sensors)
+        data = self._map_runtime_response(response, self.__sensors)
         return data
 
     async def read_sensor(self, sensor_id: str) -> Any:
@@ -257,7 +258,7 @@ class ES(Inverter):
                 response = await self._read_from_socket(self._read_command(setting.offset, 1))
             else:
                 response = await self._read_from_socket(Aa55ReadCommand(setting.offset, 1))
-            raw_value = setting.encode_value(value, response.response_data()[0:2])
+            raw_value = setting.encode_value(value, bytes(response.data[0:2]))
         else:
             raw_value = setting.encode_value(value)
         if len(raw_value) <= 2:
@@ -2,13 +2,16 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+import time
+from typing import Any, Iterable
 
 from .const import *
+from .derived import evaluate, evaluation_order, required_ids
 from .exceptions import RequestFailedException, RequestRejectedException
 from .inverter import Inverter, OperationMode, SensorKind as Kind
 from .modbus import ILLEGAL_DATA_ADDRESS
 from .model import is_1_battery, is_2_battery, is_3_mppt, is_4_mppt, is_745_platform, is_single_phase
+from .negotiator import BlockNegotiator
 from .protocol import ProtocolCommand
 from .sensor import *
 
@@ -34,13 +37,10 @@ class ET(Inverter):
         Current("ipv4", 35116, "PV4 Current", Kind.PV),
         Power4("ppv4", 35117, "PV4 Power", Kind.PV),
         # ppv1 + ppv2 + ppv3 + ppv4
-        Calculated("ppv",
-                   lambda data:
-                   max(0, read_bytes4(data, 35105, 0)) +
-                   max(0, read_bytes4(data, 35109, 0)) +
-                   max(0, read_bytes4(data, 35113, 0)) +
-                   max(0, read_bytes4(data, 35117, 0)),
-                   "PV Power", "W", Kind.PV),
+        Derived("ppv", ("ppv1", "ppv2", "ppv3", "ppv4"),
+                lambda *ppv: sum(max(0, p or 0) for p in ppv),
+                "PV Power", "W", Kind.PV,
+                lambda frames, *ppv: sum(frames.positive(frames.defined(p, 0)) for p in ppv)),
         ByteH("pv4_mode", 35119, "PV4 Mode code", "", Kind.PV),
         EnumH("pv4_mode_label", 35119, PV_MODES, "PV4 Mode", Kind.PV),
         ByteL("pv3_mode", 35119, "PV3 Mode code", "", Kind.PV),
@@ -132,67 +132,10 @@ class ET(Inverter):
         Long("diagnose_result", 35220, "Diag Status Code"),
         EnumBitmap4("diagnose_result_label", 35220, DIAG_STATUS_CODES, "Diag Status"),
         # ppv1 + ppv2 + ppv3 + ppv4 + pbattery1 - active_power
-        Calculated("house_consumption",
-                   lambda data:
-                   read_bytes4(data, 35105, 0) +
-                   read_bytes4(data, 35109, 0) +
-                   read_bytes4(data, 35113, 0) +
-                   read_bytes4(data, 35117, 0) +
-                   read_bytes4_signed(data, 35182) -
-                   read_bytes4_signed(data, 35139),
-                   "House Consumption", "W", Kind.AC),
-
-        # TOU (Time of Use) Slots 1-8
-        # Writable settings exposed as sensors for visibility in HA
-        # Slots 1-4 require ARM firmware 19+, slots 5-8 require firmware 22+
-        TimeOfDay("tou_slot1_start_time", 47547, "TOU Slot 1 Start Time", Kind.BAT),
-        TimeOfDay("tou_slot1_end_time", 47548, "TOU Slot 1 End Time", Kind.BAT),
-        WorkWeekV2("tou_slot1_work_week", 47549, "TOU Slot 1 Work Week", Kind.BAT),
-        Integer("tou_slot1_param1", 47550, "TOU Slot 1 Parameter 1", "", Kind.BAT),
-        Integer("tou_slot1_param2", 47551, "TOU Slot 1 Parameter 2", "", Kind.BAT),
-        MonthMask("tou_slot1_months", 47552, "TOU Slot 1 Months", Kind.BAT),
-        TimeOfDay("tou_slot2_start_time", 47553, "TOU Slot 2 Start Time", Kind.BAT),
-        TimeOfDay("tou_slot2_end_time", 47554, "TOU Slot 2 End Time", Kind.BAT),
-        WorkWeekV2("tou_slot2_work_week", 47555, "TOU Slot 2 Work Week", Kind.BAT),
-        Integer("tou_slot2_param1", 47556, "TOU Slot 2 Parameter 1", "", Kind.BAT),
-        Integer("tou_slot2_param2", 47557, "TOU Slot 2 Parameter 2", "", Kind.BAT),
-        MonthMask("tou_slot2_months", 47558, "TOU Slot 2 Months", Kind.BAT),
-        TimeOfDay("tou_slot3_start_time", 47559, "TOU Slot 3 Start Time", Kind.BAT),
-        TimeOfDay("tou_slot3_end_time", 47560, "TOU Slot 3 End Time", Kind.BAT),
-        WorkWeekV2("tou_slot3_work_week", 47561, "TOU Slot 3 Work Week", Kind.BAT),
-        Integer("tou_slot3_param1", 47562, "TOU Slot 3 Parameter 1", "", Kind.BAT),
-        Integer("tou_slot3_param2", 47563, "TOU Slot 3 Parameter 2", "", Kind.BAT),
-        MonthMask("tou_slot3_months", 47564, "TOU Slot 3 Months", Kind.BAT),
-        TimeOfDay("tou_slot4_start_time", 47565, "TOU Slot 4 Start Time", Kind.BAT),
-        TimeOfDay("tou_slot4_end_time", 47566, "TOU Slot 4 End Time", Kind.BAT),
-        WorkWeekV2("tou_slot4_work_week", 47567, "TOU Slot 4 Work Week", Kind.BAT),
-        Integer("tou_slot4_param1", 47568, "TOU Slot 4 Parameter 1", "", Kind.BAT),
-        Integer("tou_slot4_param2", 47569, "TOU Slot 4 Parameter 2", "", Kind.BAT),
-        MonthMask("tou_slot4_months", 47570, "TOU Slot 4 Months", Kind.BAT),
-        TimeOfDay("tou_slot5_start_time", 47571, "TOU Slot 5 Start Time", Kind.BAT),
-        TimeOfDay("tou_slot5_end_time", 47572, "TOU Slot 5 End Time", Kind.BAT),
-        WorkWeekV2("tou_slot5_work_week", 47573, "TOU Slot 5 Work Week", Kind.BAT),
-        Integer("tou_slot5_param1", 47574, "TOU Slot 5 Parameter 1", "", Kind.BAT),
-        Integer("tou_slot5_param2", 47575, "TOU Slot 5 Parameter 2", "", Kind.BAT),
-        MonthMask("tou_slot5_months", 47576, "TOU Slot 5 Months", Kind.BAT),
-        TimeOfDay("tou_slot6_start_time", 47577, "TOU Slot 6 Start Time", Kind.BAT),
-        TimeOfDay("tou_slot6_end_time", 47578, "TOU Slot 6 End Time", Kind.BAT),
-        WorkWeekV2("tou_slot6_work_week", 47579, "TOU Slot 6 Work Week", Kind.BAT),
-        Integer("tou_slot6_param1", 47580, "TOU Slot 6 Parameter 1", "", Kind.BAT),
-        Integer("tou_slot6_param2", 47581, "TOU Slot 6 Parameter 2", "", Kind.BAT),
-        MonthMask("tou_slot6_months", 47582, "TOU Slot 6 Months", Kind.BAT),
-        TimeOfDay("tou_slot7_start_time", 47583, "TOU Slot 7 Start Time", Kind.BAT),
-        TimeOfDay("tou_slot7_end_time", 47584, "TOU Slot 7 End Time", Kind.BAT),
-        WorkWeekV2("tou_slot7_work_week", 47585, "TOU Slot 7 Work Week", Kind.BAT),
-        Integer("tou_slot7_param1", 47586, "TOU Slot 7 Parameter 1", "", Kind.BAT),
-        Integer("tou_slot7_param2", 47587, "TOU Slot 7 Parameter 2", "", Kind.BAT),
-        MonthMask("tou_slot7_months", 47588, "TOU Slot 7 Months", Kind.BAT),
-        TimeOfDay("tou_slot8_start_time", 47589, "TOU Slot 8 Start Time", Kind.BAT),
-        TimeOfDay("tou_slot8_end_time", 47590, "TOU Slot 8 End Time", Kind.BAT),
-        WorkWeekV2("tou_slot8_work_week", 47591, "TOU Slot 8 Work Week", Kind.BAT),
-        Integer("tou_slot8_param1", 47592, "TOU Slot 8 Parameter 1", "", Kind.BAT),
-        Integer("tou_slot8_param2", 47593, "TOU Slot 8 Parameter 2", "", Kind.BAT),
-        MonthMask("tou_slot8_months", 47594, "TOU Slot 8 Months", Kind.BAT),
+        Derived("house_consumption", ("ppv", "pbattery1", "active_power"),
+                lambda ppv, pbattery1, active_power: ppv + pbattery1 - active_power,
+                "House Consumption", "W", Kind.AC,
+                lambda frames, ppv, pbattery1, active_power: ppv + pbattery1 - active_power),
 
         # Serial Number is added manually in read_runtime_data() at line 892
         # It's already available in device info, no need to expose as sensor
@@ -335,7 +278,7 @@ class ET(Inverter):
         Integer("meter_type", 36043, "Meter Type", "", Kind.GRID),  # (0: Single phase, 1: 3P3W, 2: 3P4W, 3: HomeKit)
         Integer("meter_sw_version", 36044, "Meter Software Version", "", Kind.GRID),
 
-        # Sensors added in some ARM fw update (or platform 745/753), read when flag _has_meter_extended is on
+        # Sensors added in some ARM fw update (or platform 745/753), read by extended meter block variant
         Power4S("meter2_active_power", 36045, "Meter 2 Active Power", Kind.GRID),
         Float("meter2_e_total_exp", 36047, 1000, "Meter 2 Total Energy (export)", "kWh", Kind.GRID),
         Float("meter2_e_total_imp", 36049, 1000, "Meter 2 Total Energy (import)", "kWh", Kind.GRID),
@@ -463,8 +406,16 @@ class ET(Inverter):
         Power4S("parallel_meter_active_power_r", 10481, "Master Meter Active Power L1", Kind.GRID),
         Power4S("parallel_meter_active_power_s", 10483, "Master Meter Active Power L2", Kind.GRID),
         Power4S("parallel_meter_active_power_t", 10485, "Master Meter Active Power L3", Kind.GRID),
-        # NOTE: Calculated current sensors (I = P / V) are computed in read_runtime_data()
-        # and added directly to data dict, not read from Modbus registers
+        # Meter currents calculated from power and (running data) grid voltage: I = P / V
+        Derived("parallel_meter_current_l1_calc", ("parallel_meter_active_power_r", "vgrid"),
+                lambda power, voltage: round((power or 0) / voltage, 2) if (voltage or 0) > 0 else 0.0,
+                "Master Meter Current L1", "A", Kind.GRID),
+        Derived("parallel_meter_current_l2_calc", ("parallel_meter_active_power_s", "vgrid2"),
+                lambda power, voltage: round((power or 0) / voltage, 2) if (voltage or 0) > 0 else 0.0,
+                "Master Meter Current L2", "A", Kind.GRID),
+        Derived("parallel_meter_current_l3_calc", ("parallel_meter_active_power_t", "vgrid3"),
+                lambda power, voltage: round((power or 0) / voltage, 2) if (voltage or 0) > 0 else 0.0,
+                "Master Meter Current L3", "A", Kind.GRID),
         # Undocumented parallel registers 10486-10499 (observed with data)
         Integer("parallel_unknown_10486", 10486, "Parallel Unknown 10486", "", Kind.AC),
         Integer("parallel_unknown_10487", 10487, "Parallel Unknown 10487", "", Kind.AC),
@@ -482,6 +433,60 @@ class ET(Inverter):
         Integer("parallel_unknown_10499", 10499, "Parallel Unknown 10499", "", Kind.AC),
     )
 
+    # TOU (Time of Use) Slots 1-8, read in single block 47547-47594
+    # Writable settings exposed as sensors for visibility in HA
+    # Slots 1-4 require ARM firmware 19+, slots 5-8 require firmware 22+
+    __all_sensors_tou: tuple[Sensor, ...] = (
+        TimeOfDay("tou_slot1_start_time", 47547, "TOU Slot 1 Start Time", Kind.BAT),
+        TimeOfDay("tou_slot1_end_time", 47548, "TOU Slot 1 End Time", Kind.BAT),
+        WorkWeekV2("tou_slot1_work_week", 47549, "TOU Slot 1 Work Week", Kind.BAT),
+        Integer("tou_slot1_param1", 47550, "TOU Slot 1 Parameter 1", "", Kind.BAT),
+        Integer("tou_slot1_param2", 47551, "TOU Slot 1 Parameter 2", "", Kind.BAT),
+        MonthMask("tou_slot1_months", 47552, "TOU Slot 1 Months", Kind.BAT),
+        TimeOfDay("tou_slot2_start_time", 47553, "TOU Slot 2 Start Time", Kind.BAT),
+        TimeOfDay("tou_slot2_end_time", 47554, "TOU Slot 2 End Time", Kind.BAT),
+        WorkWeekV2("tou_slot2_work_week", 47555, "TOU Slot 2 Work Week", Kind.BAT),
+        Integer("tou_slot2_param1", 47556, "TOU Slot 2 Parameter 1", "", Kind.BAT),
+        Integer("tou_slot2_param2", 47557, "TOU Slot 2 Parameter 2", "", Kind.BAT),
+        MonthMask("tou_slot2_months", 47558, "TOU Slot 2 Months", Kind.BAT),
+        TimeOfDay("tou_slot3_start_time", 47559, "TOU Slot 3 Start Time", Kind.BAT),
+        TimeOfDay("tou_slot3_end_time", 47560, "TOU Slot 3 End Time", Kind.BAT),
+        WorkWeekV2("tou_slot3_work_week", 47561, "TOU Slot 3 Work Week", Kind.BAT),
+        Integer("tou_slot3_param1", 47562, "TOU Slot 3 Parameter 1", "", Kind.BAT),
+        Integer("tou_slot3_param2", 47563, "TOU Slot 3 Parameter 2", "", Kind.BAT),
+        MonthMask("tou_slot3_months", 47564, "TOU Slot 3 Months", Kind.BAT),
+        TimeOfDay("tou_slot4_start_time", 47565, "TOU Slot 4 Start Time", Kind.BAT),
+        TimeOfDay("tou_slot4_end_time", 47566, "TOU Slot 4 End Time", Kind.BAT),
+        WorkWeekV2("tou_slot4_work_week", 47567, "TOU Slot 4 Work Week", Kind.BAT),
+        Integer("tou_slot4_param1", 47568, "TOU Slot 4 Parameter 1", "", Kind.BAT),
+        Integer("tou_slot4_param2", 47569, "TOU Slot 4 Parameter 2", "", Kind.BAT),
+        MonthMask("tou_slot4_months", 47570, "TOU Slot 4 Months", Kind.BAT),
+        TimeOfDay("tou_slot5_start_time", 47571, "TOU Slot 5 Start Time", Kind.BAT),
+        TimeOfDay("tou_slot5_end_time", 47572, "TOU Slot 5 End Time", Kind.BAT),
+        WorkWeekV2("tou_slot5_work_week", 47573, "TOU Slot 5 Work Week", Kind.BAT),
+        Integer("tou_slot5_param1", 47574, "TOU Slot 5 Parameter 1", "", Kind.BAT),
+        Integer("tou_slot5_param2", 47575, "TOU Slot 5 Parameter 2", "", Kind.BAT),
+        MonthMask("tou_slot5_months", 47576, "TOU Slot 5 Months", Kind.BAT),
+        TimeOfDay("tou_slot6_start_time", 47577, "TOU Slot 6 Start Time", Kind.BAT),
+        TimeOfDay("tou_slot6_end_time", 47578, "TOU Slot 6 End Time", Kind.BAT),
+        WorkWeekV2("tou_slot6_work_week", 47579, "TOU Slot 6 Work Week", Kind.BAT),
+        Integer("tou_slot6_param1", 47580, "TOU Slot 6 Parameter 1", "", Kind.BAT),
+        Integer("tou_slot6_param2", 47581, "TOU Slot 6 Parameter 2", "", Kind.BAT),
+        MonthMask("tou_slot6_months", 47582, "TOU Slot 6 Months", Kind.BAT),
+        TimeOfDay("tou_slot7_start_time", 47583, "TOU Slot 7 Start Time", Kind.BAT),
+        TimeOfDay("tou_slot7_end_time", 47584, "TOU Slot 7 End Time", Kind.BAT),
+        WorkWeekV2("tou_slot7_work_week", 47585, "TOU Slot 7 Work Week", Kind.BAT),
+        Integer("tou_slot7_param1", 47586, "TOU Slot 7 Parameter 1", "", Kind.BAT),
+        Integer("tou_slot7_param2", 47587, "TOU Slot 7 Parameter 2", "", Kind.BAT),
+        MonthMask("tou_slot7_months", 47588, "TOU Slot 7 Months", Kind.BAT),
+        TimeOfDay("tou_slot8_start_time", 47589, "TOU Slot 8 Start Time", Kind.BAT),
+        TimeOfDay("tou_slot8_end_time", 47590, "TOU Slot 8 End Time", Kind.BAT),
+        WorkWeekV2("tou_slot8_work_week", 47591, "TOU Slot 8 Work Week", Kind.BAT),
+        Integer("tou_slot8_param1", 47592, "TOU Slot 8 Parameter 1", "", Kind.BAT),
+        Integer("tou_slot8_param2", 47593, "TOU Slot 8 Parameter 2", "", Kind.BAT),
+        MonthMask("tou_slot8_months", 47594, "TOU Slot 8 Months", Kind.BAT),
+    )
+
 
 
 
@@ -823,6 +828,11 @@ class ET(Inverter):
         self._READ_PARALLEL_DATA: ProtocolCommand = self._read_command(0x28a0, 0x56)
         # Extended backup per-phase + Battery2 basic runtime data (35228-35266)
         self._READ_BACKUP_EXTENDED_DATA: ProtocolCommand = self._read_command(0x898C, 0x27)
+        # TOU slots 1-8 (47547-47594), slots 5-8 only present since ARM fw 22
+        self._READ_TOU_DATA: ProtocolCommand = self._read_command(47547, 48)
+        self._READ_TOU_DATA_SLOTS_1_4: ProtocolCommand = self._read_command(47547, 24)
+        # TOU slot 8 parameters (47592-47593), the only TOU registers accessible on slave in parallel system
+        self._READ_TOU_SLOT8_PARAMS: ProtocolCommand = self._read_command(47592, 2)
         # Observation registers for undocumented data
         # Observation sensor commands - split into blocks (max 125 registers per read due to Modbus limitations)
         # 48xxx range: 48000-48806 (807 regs total) - split into 7 blocks
@@ -833,9 +843,6 @@ class ET(Inverter):
         self._has_peak_shaving: bool = True
         self._has_battery: bool = True
         self._has_battery2: bool = False
-        self._has_meter: bool = True
-        self._has_meter_extended: bool = False
-        self._has_meter_extended2: bool = False
         self._has_mppt: bool = False
         self._has_parallel: bool = False
         self._has_backup_extended: bool = True
@@ -849,8 +856,23 @@ class ET(Inverter):
         self._sensors_battery2_basic = self.__all_sensors_battery2_basic
         self._sensors_backup_extended = self.__all_sensors_backup_extended
         self._sensors_meter = self.__all_sensors_meter
+        # Meter sensors of the widest meter block variant, _sensors_meter are those of negotiated variant
+        self._sensors_meter_all = self.__all_sensors_meter
+        self._meter_block: BlockNegotiator = BlockNegotiator('meter', (self._READ_METER_DATA,))
         self._sensors_mppt = self.__all_sensors_mppt
         self._sensors_parallel = self.__all_sensors_parallel
+        self._sensors_derived: tuple[Derived, ...] = evaluation_order(
+            s for s in self.__all_sensors + self.__all_sensors_parallel if isinstance(s, Derived))
+        self._sensors_tou = self.__all_sensors_tou
+        # TOU sensors read by the negotiated TOU block variant
+        self._sensors_tou_variant = self.__all_sensors_tou
+        self._sensors_tou_slave = tuple(filter(self._not_slave_only_restricted, self.__all_sensors_tou))
+        self._tou_block: BlockNegotiator = BlockNegotiator('tou', (self._READ_TOU_DATA,
+                                                                   self._READ_TOU_DATA_SLOTS_1_4))
+        # TOU schedule rarely changes, so it is read less often than other runtime data
+        self._tou_refresh_interval: float = 300
+        self._tou_data: dict[str, Any] | None = None
+        self._tou_read_at: float = 0
         self._settings: dict[str, Sensor] = {s.id_: s for s in self.__all_settings}
         self._sensors_map: dict[str, Sensor] | None = None
 
@@ -916,6 +938,9 @@ class ET(Inverter):
         """
         return not (10400 <= s.offset <= 10485)
 
+    def _probe_command(self) -> ProtocolCommand | None:
+        return self._read_command(0x88b8, 1)
+
     async def read_device_info(self):
         response = await self._read_from_socket(self._READ_DEVICE_VERSION_INFO)
         response = response.response_data()
@@ -965,13 +990,20 @@ class ET(Inverter):
 
         if is_745_platform(self) or self.rated_power >= 15000:
             self._has_mppt = True
-            self._has_meter_extended = True
-            self._has_meter_extended2 = True
+            self._meter_block = BlockNegotiator('meter', (self._READ_METER_DATA_EXTENDED2,
+                                                          self._READ_METER_DATA_EXTENDED,
+                                                          self._READ_METER_DATA))
         else:
             self._sensors_meter = tuple(filter(self._not_extended_meter, self._sensors_meter))
 
         # Filter out reactive energy sensors (33xxx range) - no read command for this range yet
         self._sensors_meter = tuple(filter(self._not_reactive_energy, self._sensors_meter))
+        self._sensors_meter_all = self._sensors_meter
+
+        if self._restore_capabilities():
+            return
+        # Probes failing on communication errors (not rejected) are not conclusive and must not be cached
+        self._capabilities_known = True
 
         # Check and add EcoModeV2 settings added in (ETU fw 19)
         try:
@@ -983,6 +1015,7 @@ class ET(Inverter):
                 self._has_eco_mode_v2 = False
         except RequestFailedException:
             logger.debug("Cannot read EcoModeV2 settings, switching to EcoModeV1.")
+            self._capabilities_known = False
             self._has_eco_mode_v2 = False
 
         # Check and add Peak Shaving settings added in (ETU fw 22)
@@ -995,6 +1028,7 @@ class ET(Inverter):
                 self._has_peak_shaving = False
         except RequestFailedException:
             logger.debug("Cannot read _has_peak_shaving settings, disabling it.")
+            self._capabilities_known = False
             self._has_peak_shaving = False
 
         # Check and add new feature settings (anti-backflow 46708, LG VPP 47775, AC limit 48028)
@@ -1008,6 +1042,7 @@ class ET(Inverter):
                 logger.debug("New feature settings not supported (anti-backflow, LG VPP, AC limit).")
         except RequestFailedException:
             logger.debug("Cannot read new feature settings.")
+            self._capabilities_known = False
 
         # Check and add negative electric price plan settings (47785-47812)
         try:
@@ -1020,6 +1055,7 @@ class ET(Inverter):
                 logger.debug("Negative electric price plan settings not supported.")
         except RequestFailedException:
             logger.debug("Cannot read negative electric price plan settings.")
+            self._capabilities_known = False
 
         # Detect parallel system topology by reading register 10400 (Inverter Quantity)
         # This register tells us the system configuration:
@@ -1064,29 +1100,45 @@ class ET(Inverter):
                 raise ex
         except RequestFailedException as ex:
             logger.debug("Cannot determine parallel topology (communication error): %s", ex)
+            self._capabilities_known = False
             # Keep default "standalone" topology on communication errors
             self._has_parallel = False
 
-    async def read_runtime_data(self) -> dict[str, Any]:
-        response = await self._read_from_socket(self._READ_RUNNING_DATA)
-        data = self._map_response(response, self._sensors)
+        self._store_capabilities()
+
+    async def _read_runtime_data(self, sensor_ids: Iterable[str] | None) -> dict[str, Any]:
+        wanted = self._wanted_blocks(sensor_ids)
+        prefetched = self._prefetch(
+            self._READ_RUNNING_DATA if 'running' in wanted else None,
+            self._READ_BATTERY_INFO if self._has_battery and 'battery' in wanted else None,
+            self._READ_BATTERY2_INFO if self._has_battery2 and 'battery2' in wanted else None,
+            self._READ_BACKUP_EXTENDED_DATA if self._has_backup_extended and 'backup_extended' in wanted else None,
+            self._meter_block.command if 'meter' in wanted else None,
+            self._READ_MPPT_DATA if self._has_mppt and 'mppt' in wanted else None,
+            self._READ_PARALLEL_DATA if self._has_parallel and 'parallel' in wanted else None,
+            self._tou_prefetch_command() if 'tou' in wanted else None,
+        )
+        data = self._runtime_values()
+        if 'running' in wanted:
+            response = await self._read_prefetched(prefetched, self._READ_RUNNING_DATA)
+            data = self._map_runtime_response(response, self._sensors)
+            self._has_battery = data.get('battery_mode', 0) != 0
 
-        self._has_battery = data.get('battery_mode', 0) != 0
-        if self._has_battery:
+        if self._has_battery and 'battery' in wanted:
             try:
-                response = await self._read_from_socket(self._READ_BATTERY_INFO)
-                data.update(self._map_response(response, self._sensors_battery))
+                response = await self._read_prefetched(prefetched, self._READ_BATTERY_INFO)
+                data.update(self._map_runtime_response(response, self._sensors_battery))
             except RequestRejectedException as ex:
                 if ex.message == ILLEGAL_DATA_ADDRESS:
                     logger.info("Battery values not supported, disabling further attempts.")
                     self._has_battery = False
                 else:
                     raise ex
-        if self._has_battery2:
+        if self._has_battery2 and 'battery2' in wanted:
             try:
-                response = await self._read_from_socket(self._READ_BATTERY2_INFO)
+                response = await self._read_prefetched(prefetched, self._READ_BATTERY2_INFO)
                 data.update(
-                    self._map_response(response, self._sensors_battery2))
+                    self._map_runtime_response(response, self._sensors_battery2))
             except RequestRejectedException as ex:
                 if ex.message == ILLEGAL_DATA_ADDRESS:
                     logger.info("Battery 2 values not supported, disabling further attempts.")
@@ -1094,12 +1146,12 @@ class ET(Inverter):
                 else:
                     raise ex
 
-        if self._has_backup_extended:
+        if self._has_backup_extended and 'backup_extended' in wanted:
             try:
-                response = await self._read_from_socket(self._READ_BACKUP_EXTENDED_DATA)
-                data.update(self._map_response(response, self._sensors_backup_extended))
+                response = await self._read_prefetched(prefetched, self._READ_BACKUP_EXTENDED_DATA)
+                data.update(self._map_runtime_response(response, self._sensors_backup_extended))
                 if self._has_battery2:
-                    data.update(self._map_response(response, self._sensors_battery2_basic))
+                    data.update(self._map_runtime_response(response, self._sensors_battery2_basic))
             except RequestRejectedException as ex:
                 if ex.message == ILLEGAL_DATA_ADDRESS:
                     logger.info("Backup extended data not supported, disabling further attempts.")
@@ -1107,74 +1159,18 @@ class ET(Inverter):
                 else:
                     raise ex
 
-        if self._has_meter and self._has_meter_extended2:
-            try:
-                response = await self._read_from_socket(self._READ_METER_DATA_EXTENDED2)
-                data.update(self._map_response(response, self._sensors_meter))
-            except RequestRejectedException as ex:
-                if ex.message == ILLEGAL_DATA_ADDRESS:
-                    logger.info("Extended meter values not supported, disabling further attempts.")
-                    self._has_meter_extended2 = False
-                    self._sensors_meter = tuple(filter(self._not_extended_meter2, self._sensors_meter))
-                    try:
-                        response = await self._read_from_socket(self._READ_METER_DATA_EXTENDED)
-                        data.update(
-                            self._map_response(response, self._sensors_meter))
-                    except RequestRejectedException as ex2:
-                        if ex2.message == ILLEGAL_DATA_ADDRESS:
-                            logger.info("Extended meter values not supported, disabling further attempts.")
-                            self._has_meter_extended = False
-                            self._sensors_meter = tuple(filter(self._not_extended_meter, self._sensors_meter))
-                            try:
-                                response = await self._read_from_socket(self._READ_METER_DATA)
-                                data.update(
-                                    self._map_response(response, self._sensors_meter))
-                            except RequestRejectedException as ex3:
-                                if ex3.message == ILLEGAL_DATA_ADDRESS:
-                                    logger.info("Meter values not supported, disabling further attempts.")
-                                    self._has_meter = False
-                                else:
-                                    raise ex3
-                        else:
-                            raise ex2
-                else:
-                    raise ex
-        elif self._has_meter and self._has_meter_extended:
-            try:
-                response = await self._read_from_socket(self._READ_METER_DATA_EXTENDED)
-                data.update(self._map_response(response, self._sensors_meter))
-            except RequestRejectedException as ex:
-                if ex.message == ILLEGAL_DATA_ADDRESS:
-                    logger.info("Extended meter values not supported, disabling further attempts.")
-                    self._has_meter_extended = False
-                    self._sensors_meter = tuple(filter(self._not_extended_meter, self._sensors_meter))
-                    try:
-                        response = await self._read_from_socket(self._READ_METER_DATA)
-                        data.update(
-                            self._map_response(response, self._sensors_meter))
-                    except RequestRejectedException as ex2:
-                        if ex2.message == ILLEGAL_DATA_ADDRESS:
-                            logger.info("Meter values not supported, disabling further attempts.")
-                            self._has_meter = False
-                        else:
-                            raise ex2
-                else:
-                    raise ex
-        elif self._has_meter:
-            try:
-                response = await self._read_from_socket(self._READ_METER_DATA)
-                data.update(self._map_response(response, self._sensors_meter))
-            except RequestRejectedException as ex:
-                if ex.message == ILLEGAL_DATA_ADDRESS:
-                    logger.info("Meter values not supported, disabling further attempts.")
-                    self._has_meter = False
-                else:
-                    raise ex
+        if 'meter' in wanted:
+            meter_command = self._meter_block.command
+            response = await self._meter_block.read(lambda command: self._read_prefetched(prefetched, command))
+            if self._meter_block.command is not meter_command:
+                self._block_variants_changed()
+            if response is not None:
+                data.update(self._map_runtime_response(response, self._sensors_meter))
 
-        if self._has_mppt:
+        if self._has_mppt and 'mppt' in wanted:
             try:
-                response = await self._read_from_socket(self._READ_MPPT_DATA)
-                data.update(self._map_response(response, self._sensors_mppt))
+                response = await self._read_prefetched(prefetched, self._READ_MPPT_DATA)
+                data.update(self._map_runtime_response(response, self._sensors_mppt))
             except RequestRejectedException as ex:
                 if ex.message == ILLEGAL_DATA_ADDRESS:
                     logger.info("MPPT values not supported, disabling further attempts.")
@@ -1182,25 +1178,10 @@ class ET(Inverter):
                 else:
                     raise ex
 
-        if self._has_parallel:
+        if self._has_parallel and 'parallel' in wanted:
             try:
-                response = await self._read_from_socket(self._READ_PARALLEL_DATA)
-                data.update(self._map_response(response, self._sensors_parallel))
-                # Calculate meter current from power and voltage: I = P / V
-                # Power sources: parallel_meter_active_power_r/s/t (registers 10481/10483/10485)
-                # Voltage sources: vgrid/vgrid2/vgrid3 (registers 35121/35126/35131)
-                for phase, power_key, voltage_key in [
-                    ("l1", "parallel_meter_active_power_r", "vgrid"),
-                    ("l2", "parallel_meter_active_power_s", "vgrid2"),
-                    ("l3", "parallel_meter_active_power_t", "vgrid3"),
-                ]:
-                    power = data.get(power_key, 0) or 0
-                    voltage = data.get(voltage_key, 0) or 0
-                    if voltage > 0:
-                        current = round(power / voltage, 2)
-                    else:
-                        current = 0.0
-                    data[f"parallel_meter_current_{phase}_calc"] = current
+                response = await self._read_prefetched(prefetched, self._READ_PARALLEL_DATA)
+                data.update(self._map_runtime_response(response, self._sensors_parallel))
             except RequestRejectedException as ex:
                 if ex.message == ILLEGAL_DATA_ADDRESS:
                     logger.info("Parallel system values not supported, disabling further attempts.")
@@ -1208,13 +1189,148 @@ class ET(Inverter):
                 else:
                     raise ex
 
+        if 'tou' in wanted:
+            if self._parallel_topology != "slave_in_parallel":
+                data.update(await self._read_tou_data(prefetched, sensor_ids is not None))
+            else:
+                data.update(await self._read_tou_slave_data(prefetched))
+
+        # Values derived from other sensors (of any block)
+        evaluate(self._sensors_derived, data, {s.id_ for s in self.sensors()})
+
         # Add inverter serial number as a constant sensor value
         data["serial_number"] = self.serial_number
 
+        # Persist block variants learned (disabled) while reading
+        self._store_capabilities()
         return data
 
+    def set_tou_refresh_interval(self, interval: float) -> None:
+        """
+        Set the interval (in seconds) of re-reading TOU slots within read_runtime_data(),
+        meanwhile the last read values are answered. Explicitly requested TOU sensors are always read.
+        """
+        self._tou_refresh_interval = interval
+
+    def _tou_data_expired(self) -> bool:
+        return self._tou_data is None or time.monotonic() - self._tou_read_at >= self._tou_refresh_interval
+
+    async def _read_tou_data(self, prefetched: dict[ProtocolCommand, Any], force: bool) -> dict[str, Any]:
+        """Answer values of all TOU slots read in single block (or cached ones, when not expired)"""
+        if force or self._tou_data_expired():
+            tou_command = self._tou_block.command
+            response = await self._tou_block.read(lambda command: self._read_prefetched(prefetched, command))
+            if self._tou_block.command is not tou_command:
+                self._block_variants_changed()
+            if response is None:
+                self._tou_data = {}
+            else:
+                self._tou_data = self._map_runtime_response(response, self._sensors_tou_variant)
+            self._tou_read_at = time.monotonic()
+        return self._tou_data
+
+    async def _read_tou_slave_data(self, prefetched: dict[ProtocolCommand, Any]) -> dict[str, Any]:
+        """Answer values of TOU slot 8 parameters, the only TOU slot values accessible on slave inverter"""
+        try:
+            response = await self._read_prefetched(prefetched, self._READ_TOU_SLOT8_PARAMS)
+            return self._map_runtime_response(response, self._sensors_tou_slave)
+        except RequestRejectedException as ex:
+            if ex.message == ILLEGAL_DATA_ADDRESS:
+                logger.debug("TOU slot 8 parameters not supported on slave inverter.")
+                return {}
+            raise ex
+
+    def _tou_prefetch_command(self) -> ProtocolCommand | None:
+        if self._parallel_topology == "slave_in_parallel":
+            return self._READ_TOU_SLOT8_PARAMS
+        return self._tou_block.command if self._tou_data_expired() else None
+
+    def capabilities(self) -> dict[str, Any]:
+        return {
+            'eco_mode_v2': self._has_eco_mode_v2,
+            'peak_shaving': self._has_peak_shaving,
+            'new_features': self._has_new_features,
+            'neg_price': self._has_neg_price,
+            'parallel_topology': self._parallel_topology,
+            'parallel': self._has_parallel,
+            'battery2': self._has_battery2,
+            'backup_extended': self._has_backup_extended,
+            'meter_variant': self._meter_block.index,
+            'tou_variant': self._tou_block.index,
+            'mppt': self._has_mppt,
+        }
+
+    def _apply_capabilities(self, capabilities: dict[str, Any]) -> None:
+        self._has_eco_mode_v2 = capabilities.get('eco_mode_v2', self._has_eco_mode_v2)
+        self._has_peak_shaving = capabilities.get('peak_shaving', self._has_peak_shaving)
+        self._has_new_features = capabilities.get('new_features', self._has_new_features)
+        self._has_neg_price = capabilities.get('neg_price', self._has_neg_price)
+        self._parallel_topology = capabilities.get('parallel_topology', self._parallel_topology)
+        self._has_parallel = capabilities.get('parallel', self._has_parallel)
+        self._has_battery2 = capabilities.get('battery2', self._has_battery2)
+        self._has_backup_extended = capabilities.get('backup_extended', self._has_backup_extended)
+        self._meter_block.select(capabilities.get('meter_variant', self._meter_block.index))
+        self._tou_block.select(capabilities.get('tou_variant', self._tou_block.index))
+        self._has_mppt = capabilities.get('mppt', self._has_mppt)
+
+        if self._has_eco_mode_v2:
+            self._settings.update({s.id_: s for s in self.__settings_arm_fw_19})
+        if self._has_peak_shaving:
+            self._settings.update({s.id_: s for s in self.__settings_arm_fw_22})
+        if self._has_new_features:
+            self._settings.update({s.id_: s for s in self.__settings_new_features})
+        if self._has_neg_price:
+            self._settings.update({s.id_: s for s in self.__settings_neg_price})
+        self._block_variants_changed()
+
+    def _block_variants_changed(self) -> None:
+        """
+        Update the sensors to those read by the negotiated meter and TOU block variants
+        and drop everything derived from the previous ones (sensors lookup map, cached TOU values)
+        """
+        self._update_meter_sensors()
+        if self._tou_block.command is self._READ_TOU_DATA:
+            self._sensors_tou_variant = self._sensors_tou
+        else:
+            self._sensors_tou_variant = self._sensors_tou[:24]
+        self._sensors_map = None
+        self._tou_data = None
+
+    def _update_meter_sensors(self) -> None:
+        """Update the meter sensors to those read by the negotiated meter block variant"""
+        sensors = self._sensors_meter_all
+        if self._meter_block.command is not self._READ_METER_DATA_EXTENDED2:
+            sensors = tuple(filter(self._not_extended_meter2, sensors))
+        if self._meter_block.command in (self._READ_METER_DATA_EXTENDED2, self._READ_METER_DATA_EXTENDED):
+            self._sensors_meter = sensors
+        else:
+            self._sensors_meter = tuple(filter(self._not_extended_meter, sensors))
+
+    def _runtime_blocks(self) -> dict[str, tuple[Sensor, ...]]:
+        """Answer the runtime data blocks (by name) and the sensors read from them"""
+        return {
+            'running': self._sensors,
+            'battery': self._sensors_battery,
+            'battery2': self._sensors_battery2,
+            'backup_extended': self._sensors_backup_extended + self._sensors_battery2_basic,
+            'meter': self._sensors_meter,
+            'mppt': self._sensors_mppt,
+            'parallel': self._sensors_parallel,
+            'tou': self._sensors_tou,
+        }
+
+    def _wanted_blocks(self, sensor_ids: Iterable[str] | None) -> set[str]:
+        """Answer names of runtime data blocks containing the sensors (all blocks if sensor_ids is None)"""
+        blocks = self._runtime_blocks()
+        if sensor_ids is None:
+            return set(blocks)
+        ids = required_ids(self._sensors_derived, sensor_ids)
+        return {name for name, sensors in blocks.items() if any(s.id_ in ids for s in sensors)}
+
     async def read_sensor(self, sensor_id: str) -> Any:
         sensor: Sensor = self._get_sensor(sensor_id)
+        if isinstance(sensor, Derived):
+            return (await self.read_runtime_data([sensor_id])).get(sensor_id)
         if sensor:
             return await self._read_sensor(sensor)
         if sensor_id.startswith("modbus"):
@@ -1229,6 +1345,9 @@ class ET(Inverter):
             # Topology is detected in read_device_info() by reading register 10400
             if self._parallel_topology == "slave_in_parallel" and not self._not_slave_only_restricted(setting):
                 raise RequestRejectedException(ILLEGAL_DATA_ADDRESS)
+            value = self._shadow_value(setting)
+            if value is not None:
+                return value
             return await self._read_sensor(setting)
         if setting_id.startswith("modbus"):
             response = await self._read_from_socket(self._read_command(int(setting_id[7:]), 1))
@@ -1236,15 +1355,17 @@ class ET(Inverter):
         raise ValueError(f'Unknown setting "{setting_id}"')
 
     async def _read_sensor(self, sensor: Sensor) -> Any:
+        count = (sensor.size_ + (sensor.size_ % 2)) // 2
+        if not self._availability.is_available(sensor.offset, count):
+            raise ValueError(f'Unknown sensor/setting "{sensor.id_}"')
         try:
-            count = (sensor.size_ + (sensor.size_ % 2)) // 2
             response = await self._read_from_socket(self._read_command(sensor.offset, count))
             return sensor.read_value(response)
         except RequestRejectedException as ex:
             if ex.message == ILLEGAL_DATA_ADDRESS:
                 logger.debug("Unsupported sensor/setting %s", sensor.id_)
-                # Don't permanently remove settings - transient errors shouldn't disable features
-                # Settings are filtered during initialization based on firmware/model detection
+                # Don't permanently remove settings, just skip the registers until availability map expires them
+                self._availability.record_rejected(sensor.offset, count)
                 raise ValueError(f'Unknown sensor/setting "{sensor.id_}"')
             return None
 
@@ -1258,11 +1379,13 @@ class ET(Inverter):
             else:
                 raise ValueError(f'Unknown setting "{setting_id}"')
 
+    async def write_settings(self, values: dict[str, Any]) -> dict[str, Exception | None]:
+        return await self._write_settings_batch(values, self._settings)
+
     async def _write_setting(self, setting: Sensor, value: Any):
         if setting.size_ == 1:
             # modbus can address/store only 16 bit values, read the other 8 bytes
-            response = await self._read_from_socket(self._read_command(setting.offset, 1))
-            raw_value = setting.encode_value(value, response.response_data()[0:2])
+            raw_value = setting.encode_value(value, await self._read_registers(setting.offset, 1))
         else:
             raw_value = setting.encode_value(value)
         if len(raw_value) <= 2:
@@ -1272,15 +1395,14 @@ class ET(Inverter):
             await self._read_from_socket(self._write_multi_command(setting.offset, raw_value))
 
     async def read_settings_data(self) -> dict[str, Any]:
-        data = {}
-        for setting in self.settings():
-            try:
-                value = await self.read_setting(setting.id_)
-                data[setting.id_] = value
-            except (ValueError, RequestFailedException):
-                logger.exception("Error reading setting %s.", setting.id_)
-                data[setting.id_] = None
-        return data
+        return await self._read_sensors(self.settings(), self._read_setting_or_none)
+
+    async def _read_setting_or_none(self, setting: Sensor) -> Any:
+        try:
+            return await self.read_setting(setting.id_)
+        except (ValueError, RequestFailedException):
+            logger.exception("Error reading setting %s.", setting.id_)
+            return None
 
     async def get_grid_export_limit(self) -> int:
         return await self.read_setting('grid_export_limit')
@@ -1357,12 +1479,16 @@ class ET(Inverter):
                 pass
             eco_mode.set_schedule_type(ScheduleType.ECO_MODE, is_745_platform(self))
             if operation_mode == OperationMode.ECO_CHARGE:
-                await self.write_setting('eco_mode_1', eco_mode.encode_charge(eco_mode_power, eco_mode_soc))
+                eco_mode_value = eco_mode.encode_charge(eco_mode_power, eco_mode_soc)
             else:
-                await self.write_setting('eco_mode_1', eco_mode.encode_discharge(eco_mode_power))
-            await self.write_setting('eco_mode_2_switch', 0)
-            await self.write_setting('eco_mode_3_switch', 0)
-            await self.write_setting('eco_mode_4_switch', 0)
+                eco_mode_value = eco_mode.encode_discharge(eco_mode_power)
+            results = await self.write_settings({'eco_mode_1': eco_mode_value,
+                                                 'eco_mode_2_switch': 0,
+                                                 'eco_mode_3_switch': 0,
+                                                 'eco_mode_4_switch': 0})
+            for error in results.values():
+                if error:
+                    raise error
             await self.write_setting('work_mode', 3)
             await self._set_offline(False)
 
@@ -1404,6 +1530,13 @@ class ET(Inverter):
         if self._parallel_topology == "slave_in_parallel":
             result = tuple(filter(self._not_slave_only_restricted, result))
 
+        # TOU slots (47547-47594)
+        # - Only slot 8 parameters (47592-47593) available on slave_in_parallel (master manages EMS/TOU)
+        if self._parallel_topology == "slave_in_parallel":
+            result = result + self._sensors_tou_slave
+        elif self._tou_block.supported:
+            result = result + self._sensors_tou_variant
+
         # Meter data sensors
         # - Available on standalone and master_in_parallel
         # - NOT available on slave_in_parallel (meter connected to master only)
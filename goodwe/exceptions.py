@@ -48,3 +48,14 @@ class PartialResponseException(InverterError):
 
 class MaxRetriesException(InverterError):
     """Indicates the maximum number of retries has been reached"""
+
+
+class CircuitOpenException(RequestFailedException):
+    """
+    Indicates request was not sent at all, since the inverter did not respond to recent requests
+    and the circuit breaker is open (e.g. inverter is offline at night).
+
+    Attributes:
+        message -- explanation of the error
+        consecutive_failures_count -- number requests failed in a consecutive streak
+    """
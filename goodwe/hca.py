@@ -3,11 +3,12 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 from .const import GOODWE_TCP_PORT
 from .exceptions import InverterError, RequestFailedException
 from .inverter import Inverter, OperationMode, Sensor, SensorKind as Kind
+from .negotiator import BlockNegotiator
 from .protocol import ProtocolCommand, ProtocolResponse
 from .sensor import (
     Current, Decimal, Energy4, Enum2, Integer, Long, SwitchValue, Voltage,
@@ -445,11 +446,17 @@ class HCA(Inverter):
         self._READ_RUNNING_DATA2: ProtocolCommand = self._read_command(10103, 6)
         # Block 3: registers 10157-10176 (20 regs) - last session record
         self._READ_RUNNING_DATA3: ProtocolCommand = self._read_command(10157, 20)
+        # Blocks 2 and 3 are not present on all firmware versions
+        self._block2: BlockNegotiator = BlockNegotiator('session energy', (self._READ_RUNNING_DATA2,))
+        self._block3: BlockNegotiator = BlockNegotiator('last session', (self._READ_RUNNING_DATA3,))
         self._is_single_phase: bool = False
         self._sensors_block1: tuple[Sensor, ...] = self.__sensors_block1_3phase
         self._sensors_map: dict[str, Sensor] | None = None
         self._settings_map: dict[str, Sensor] = {s.id_: s for s in self.__all_settings}
 
+    def _probe_command(self) -> ProtocolCommand | None:
+        return self._read_command(10040, 1)
+
     async def read_device_info(self):
         response = await self._read_from_socket(self._READ_DEVICE_INFO)
         raw = response.response_data()
@@ -483,13 +490,18 @@ class HCA(Inverter):
         """Return True if device is a single-phase charger."""
         return self._is_single_phase
 
-    async def read_runtime_data(self) -> dict[str, Any]:
-        response1 = await self._read_from_socket(self._READ_RUNNING_DATA)
-        response2 = await self._read_from_socket(self._READ_RUNNING_DATA2)
-        response3 = await self._read_from_socket(self._READ_RUNNING_DATA3)
-        data = self._map_response(response1, self._sensors_block1)
-        data.update(self._map_response(response2, self.__sensors_block2))
-        data.update(self._map_response(response3, self.__sensors_block3))
+    async def _read_runtime_data(self, sensor_ids: Iterable[str] | None) -> dict[str, Any]:
+        ids = set(sensor_ids) if sensor_ids is not None else None
+        data = self._runtime_values()
+        if ids is None or any(s.id_ in ids for s in self._sensors_block1):
+            response = await self._read_from_socket(self._READ_RUNNING_DATA)
+            data.update(self._map_runtime_response(response, self._sensors_block1))
+        for block, sensors in ((self._block2, self.__sensors_block2),
+                               (self._block3, self.__sensors_block3)):
+            if ids is None or any(s.id_ in ids for s in sensors):
+                response = await block.read(self._read_from_socket)
+                if response is not None:
+                    data.update(self._map_runtime_response(response, sensors))
         data["serial_number"] = self.serial_number
         return data
 
@@ -551,14 +563,14 @@ class HCA(Inverter):
             raise ValueError(f'Unknown setting "{setting_id}"')
 
     async def read_settings_data(self) -> dict[str, Any]:
-        data = {}
-        for setting in self.__all_settings:
-            try:
-                data[setting.id_] = await self.read_setting(setting.id_)
-            except (ValueError, RequestFailedException):
-                logger.exception("Error reading setting %s.", setting.id_)
-                data[setting.id_] = None
-        return data
+        return await self._read_sensors(self.__all_settings, self._read_setting_or_none)
+
+    async def _read_setting_or_none(self, setting: Sensor) -> Any:
+        try:
+            return await self.read_setting(setting.id_)
+        except (ValueError, RequestFailedException):
+            logger.exception("Error reading setting %s.", setting.id_)
+            return None
 
     async def get_grid_export_limit(self) -> int:
         raise InverterError("Not supported by HCA EV charger")
@@ -590,7 +602,12 @@ class HCA(Inverter):
         return ""
 
     def sensors(self) -> tuple[Sensor, ...]:
-        return self._sensors_block1 + self.__sensors_block2 + self.__sensors_block3
+        result = self._sensors_block1
+        if self._block2.supported:
+            result = result + self.__sensors_block2
+        if self._block3.supported:
+            result = result + self.__sensors_block3
+        return result
 
     def settings(self) -> tuple[Sensor, ...]:
         return tuple(self._settings_map.values())
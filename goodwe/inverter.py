@@ -1,17 +1,30 @@
 """Generic inverter API module."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum, IntEnum
-from typing import Any, Callable, Optional
-
-from .exceptions import MaxRetriesException, RequestFailedException
-from .protocol import InverterProtocol, ProtocolCommand, ProtocolResponse, TcpInverterProtocol, UdpInverterProtocol
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, TypeVar
+
+from .availability import RegisterAvailability
+from .capabilities import CapabilityCache
+from .decoder import decoder_for
+from .exceptions import CircuitOpenException, InverterError, MaxRetriesException, RequestFailedException, \
+    RequestRejectedException
+from .lazy import LazyRuntimeData
+from .protocol import InverterProtocol, ModbusRtuReadCommand, ModbusTcpReadCommand, ProtocolCommand, \
+    ProtocolResponse, RttEstimator, TcpInverterProtocol, TraceListener, UdpInverterProtocol
+from .planner import ReadBlock, plan_reads, plan_writes, sensor_registers
+from .retry import CircuitBreaker, RetryPolicy
+from .shadow import RegisterShadow
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
 
 class SensorKind(Enum):
     """
@@ -92,6 +105,15 @@ class Inverter(ABC):
     def __init__(self, host: str, port: int, comm_addr: int = 0, timeout: int = 1, retries: int = 3):
         self._protocol: InverterProtocol = self._create_protocol(host, port, comm_addr, timeout, retries)
         self._consecutive_failures_count: int = 0
+        self._circuit_breaker: CircuitBreaker | None = None
+        self._capability_cache: CapabilityCache | None = None
+        self._capabilities_known: bool = False
+        self._availability: RegisterAvailability = RegisterAvailability()
+        self._shadow: RegisterShadow | None = None
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._freshness_window: float = 0
+        self._recent: dict[Hashable, tuple[Any, float]] = {}
+        self._lazy_decoding: bool = False
 
         self.model_name: str | None = None
         self.serial_number: str | None = None
@@ -119,21 +141,305 @@ class Inverter(ABC):
         return self._protocol.write_multi_command(offset, values)
 
     async def _read_from_socket(self, command: ProtocolCommand) -> ProtocolResponse:
+        if isinstance(command, (ModbusRtuReadCommand, ModbusTcpReadCommand)):
+            # concurrent (or recent enough) identical reads share the same response
+            return await self._single_flight(command, lambda: self._execute_command(command),
+                                             lambda r: ProtocolResponse(r.raw_data, r.command))
+        try:
+            return await self._execute_command(command)
+        finally:
+            # the (write) command changes the registers, results of reads issued before it are stale
+            self._recent.clear()
+            self._in_flight.clear()
+
+    async def _single_flight(self, key: Hashable, factory: Callable[[], Awaitable[T]],
+                             copy: Callable[[T], T]) -> T:
+        """
+        Answer result of the operation identified by key.
+        When the same operation is already in progress, its result is shared instead of running it again.
+        When the freshness window is set, result of operation finished within that window is answered.
+        The callers other than the one starting the operation receive copy of the result.
+        """
+        if self._freshness_window > 0:
+            recent = self._recent.get(key)
+            if recent is not None and time.monotonic() - recent[1] <= self._freshness_window:
+                return copy(recent[0])
+        future = self._in_flight.get(key)
+        if future is not None:
+            return copy(await asyncio.shield(future))
+        future = asyncio.ensure_future(factory())
+        self._in_flight[key] = future
+        future.add_done_callback(lambda f: self._flight_done(key, f))
+        return await asyncio.shield(future)
+
+    def _flight_done(self, key: Hashable, future: asyncio.Future) -> None:
+        # operations dropped from in-flight ones (by a write meanwhile) are not remembered
+        current = self._in_flight.get(key) is future
+        if current:
+            del self._in_flight[key]
+        # failed operations are not remembered (and their exception is consumed here, callers get it anyway)
+        if future.cancelled() or future.exception() is not None:
+            self._recent.pop(key, None)
+        elif current and self._freshness_window > 0:
+            self._recent[key] = (future.result(), time.monotonic())
+
+    async def _execute_command(self, command: ProtocolCommand) -> ProtocolResponse:
+        if self._circuit_breaker and not self._circuit_breaker.allow_request():
+            raise CircuitOpenException(f'Inverter is not responding, request {command} not sent',
+                                       self._consecutive_failures_count)
         try:
             result = await command.execute(self._protocol)
             self._consecutive_failures_count = 0
+            if self._circuit_breaker:
+                self._circuit_breaker.record_success()
+            if self._shadow is not None:
+                self._shadow.record(command, result)
             return result
+        except RequestRejectedException:
+            # the inverter is responding, it just refused the request
+            if self._circuit_breaker:
+                self._circuit_breaker.record_success()
+            raise
         except MaxRetriesException:
-            self._consecutive_failures_count += 1
+            self._request_failed()
             raise RequestFailedException(f'No valid response received even after {self._protocol.retries} retries',
                                          self._consecutive_failures_count) from None
         except RequestFailedException as ex:
-            self._consecutive_failures_count += 1
+            self._request_failed()
             raise RequestFailedException(ex.message, self._consecutive_failures_count) from None
 
+    def _request_failed(self) -> None:
+        self._consecutive_failures_count += 1
+        if self._circuit_breaker:
+            self._circuit_breaker.record_failure()
+
     def set_keep_alive(self, keep_alive: bool) -> None:
         self._protocol.keep_alive = keep_alive
 
+    def add_trace_listener(self, listener: TraceListener) -> None:
+        """
+        Register callback(direction, data, command, timestamp) receiving every raw frame
+        sent to (direction 'sent') or received from (direction 'received') the inverter.
+        There is no tracing overhead when no listener is registered.
+        """
+        self._protocol.add_trace_listener(listener)
+
+    def remove_trace_listener(self, listener: TraceListener) -> None:
+        """Unregister previously registered trace callback"""
+        self._protocol.remove_trace_listener(listener)
+
+    def set_managed_connection(self, enabled: bool, probe_interval: float = 30, idle_ttl: float = 300) -> None:
+        """
+        Enable (or disable) managed Modbus/TCP connection.
+        The connection is kept open between requests, when there was no traffic for probe_interval seconds
+        a lightweight probe request is sent to keep it warm (and detect it's dead before next poll).
+        When closed by the inverter, it is re-opened immediately. When there was no request
+        for idle_ttl seconds, the connection is closed.
+        Only Modbus/TCP (port 502) transport is affected.
+        """
+        if isinstance(self._protocol, TcpInverterProtocol):
+            self._protocol.managed = enabled
+            self._protocol.probe_command = self._probe_command() if enabled else None
+            self._protocol.probe_interval = probe_interval
+            self._protocol.idle_ttl = idle_ttl
+            self._protocol.keep_alive = enabled or self._protocol.is_pipelined()
+
+    def _probe_command(self) -> ProtocolCommand | None:
+        """Answer the cheap command used to probe the managed connection is still alive"""
+        return None
+
+    def set_shared_udp_endpoint(self, local_port: int | None = 0) -> None:
+        """
+        Communicate via UDP socket bound to local_port (0 means any free port) shared with other inverters,
+        instead of opening dedicated socket for each request (or keep-alive connection).
+        Responses are dispatched to the inverters by their address. None restores the dedicated sockets.
+        Only UDP transport is affected.
+        """
+        if isinstance(self._protocol, UdpInverterProtocol):
+            self._protocol.shared_local_port = local_port
+
+    def set_retry_policy(self, retry_policy: RetryPolicy | None) -> None:
+        """
+        Set the policy of retrying requests (backoff delays and retry budget).
+        None (default) means failed requests are retried immediately, up to retries times.
+        """
+        self._protocol.retry_policy = retry_policy
+
+    def set_circuit_breaker(self, circuit_breaker: CircuitBreaker | None) -> None:
+        """
+        Set the circuit breaker failing requests immediately (with CircuitOpenException)
+        when the inverter did not respond to several consecutive requests (e.g. it is offline at night).
+        None (default) means every request is always sent.
+        """
+        self._circuit_breaker = circuit_breaker
+
+    def set_capability_cache(self, capability_cache: CapabilityCache | None) -> None:
+        """
+        Set the cache of inverter capabilities (e.g. supported register blocks) learned by probing.
+        When the cache contains capabilities of this inverter (learned with the same firmware),
+        read_device_info() restores them instead of probing the inverter again.
+        """
+        self._capability_cache = capability_cache
+
+    def capabilities(self) -> dict[str, Any]:
+        """Answer the capabilities of the inverter learned by probing (stored in capability cache)"""
+        return {}
+
+    def _apply_capabilities(self, capabilities: dict[str, Any]) -> None:
+        """Restore the capabilities previously answered by capabilities()"""
+
+    def _firmware_id(self) -> str:
+        """Answer the firmware identification the learned capabilities are valid for"""
+        return f"{self.firmware}/{self.arm_firmware}/{self.dsp1_version}/{self.dsp2_version}/{self.arm_version}"
+
+    def _restore_capabilities(self) -> bool:
+        """Restore the capabilities from the capability cache, answer True when they were found"""
+        if not self._capability_cache or not self.serial_number:
+            return False
+        capabilities = self._capability_cache.get(self.serial_number, self._firmware_id())
+        if capabilities is None:
+            return False
+        logger.debug("Restoring capabilities of inverter %s from cache.", self.serial_number)
+        self._apply_capabilities(capabilities)
+        self._capabilities_known = True
+        return True
+
+    def _store_capabilities(self) -> None:
+        """Store the (current) capabilities to the capability cache, if they were conclusively learned"""
+        if self._capability_cache and self._capabilities_known and self.serial_number:
+            self._capability_cache.put(self.serial_number, self._firmware_id(), self.capabilities())
+
+    def set_register_availability(self, availability: RegisterAvailability) -> None:
+        """
+        Set the map of registers known to be not available (rejected with ILLEGAL DATA ADDRESS),
+        e.g. to change the time (ttl) after which they are queried again.
+        """
+        self._availability = availability
+
+    def unavailable_registers(self) -> list[dict[str, Any]]:
+        """Answer the register ranges known to be not available, with their hits counts and age (in seconds)"""
+        return self._availability.snapshot()
+
+    def set_freshness_window(self, window: float) -> None:
+        """
+        Set the time (in seconds) the result of (block) read or read_runtime_data() is answered
+        to other callers asking for the same data, instead of requesting it again.
+        Concurrent identical requests always share single in-flight request.
+        Value of 0 (default) means only the in-flight requests are shared.
+        Any write command discards the remembered (and in-flight) results.
+        """
+        self._freshness_window = window
+        self._recent.clear()
+
+    def set_lazy_decoding(self, enabled: bool) -> None:
+        """
+        Enable (or disable) the lazy decoding of runtime data.
+        When enabled, read_runtime_data() answers LazyRuntimeData mapping keeping the response data blocks
+        and decoding each sensor value on its first access. Converting it by dict() answers the same
+        values as the (default) eager decoding.
+        """
+        self._lazy_decoding = enabled
+        self._recent.clear()
+
+    def set_register_shadow(self, max_age: float | None) -> None:
+        """
+        Enable (or disable with None) the shadow copy of registers values seen in any read or write.
+        When values of the registers are not older than max_age seconds, the read-modify-write of 1 byte
+        settings does not read the register again and read_setting() answers the value from the shadow.
+        """
+        self._shadow = RegisterShadow(max_age) if max_age is not None else None
+
+    async def _read_registers(self, offset: int, count: int) -> bytes:
+        """Answer the current raw values of the registers (from register shadow, if they are fresh enough)"""
+        if self._shadow is not None:
+            data = self._shadow.get(offset, count)
+            if data is not None:
+                return data
+        response = await self._read_from_socket(self._read_command(offset, count))
+        return bytes(response.data[0:count * 2])
+
+    def _shadow_value(self, sensor: Sensor) -> Any:
+        """Answer the value of the sensor decoded from register shadow, None if it is not known (fresh)"""
+        if self._shadow is not None:
+            data = self._shadow.get(sensor.offset, sensor_registers(sensor))
+            if data is not None:
+                return sensor.read_value(ProtocolResponse(data, None))
+        return None
+
+    def set_adaptive_timeout(self, enabled: bool, min_timeout: float = 0.1, max_timeout: float = 5) -> None:
+        """
+        Enable (or disable) adaptive request timeouts.
+        When enabled, the time to wait for response before retrying is derived from measured
+        round-trip times (smoothed RTT plus 4 times its variance) and kept within min/max bounds.
+        The configured fixed timeout is used as the initial value.
+        """
+        if enabled:
+            if not 0 < min_timeout <= max_timeout:
+                raise ValueError("Adaptive timeout bounds must satisfy 0 < min_timeout <= max_timeout.")
+            self._protocol.rtt = RttEstimator(self._protocol.timeout, min_timeout, max_timeout)
+        else:
+            self._protocol.rtt = None
+
+    @property
+    def rtt_stats(self) -> dict[str, Any] | None:
+        """Answer the round-trip time statistics (in seconds) or None if adaptive timeouts are not enabled"""
+        if self._protocol.rtt:
+            return self._protocol.rtt.stats()
+        return None
+
+    def metrics(self) -> dict[str, Any]:
+        """
+        Answer snapshot of the communication metrics - counters of requests, responses, retries, timeouts,
+        fragmented and rejected (by failure code) responses, (re)connects and bytes transferred,
+        plus histograms of request latency by command type (and RTT statistics if adaptive timeouts are enabled).
+        """
+        result = self._protocol.metrics.snapshot()
+        result["consecutive_failures"] = self._consecutive_failures_count
+        if self._protocol.rtt:
+            result["rtt"] = self._protocol.rtt.stats()
+        return result
+
+    def reset_metrics(self) -> None:
+        """Reset all the communication metrics counters and histograms"""
+        self._protocol.metrics.reset()
+
+    def set_pipelining(self, window: int) -> None:
+        """
+        Set the max number of requests sent to inverter without waiting for their responses.
+        Only Modbus/TCP (port 502) transport supports it, responses are matched by transaction id.
+        Value of 1 (default) means strict one-request-at-a-time communication.
+        """
+        if window < 1:
+            raise ValueError("Pipelining window must be at least 1.")
+        if isinstance(self._protocol, TcpInverterProtocol):
+            self._protocol.pipeline = window
+            if window > 1:
+                self._protocol.keep_alive = True
+
+    def _prefetch(self, *commands: ProtocolCommand | None) -> dict[ProtocolCommand, asyncio.Task]:
+        """
+        Send the commands ahead (when protocol supports pipelining), so their responses
+        can be collected later via _read_prefetched() without paying round-trip for each of them.
+        """
+        if not self._protocol.is_pipelined():
+            return {}
+        result = {}
+        for command in commands:
+            if command is not None and command not in result:
+                task = asyncio.create_task(self._read_from_socket(command))
+                # Consume the result of prefetched response, even if it will not be used
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                result[command] = task
+        return result
+
+    async def _read_prefetched(self, prefetched: dict[ProtocolCommand, asyncio.Task],
+                               command: ProtocolCommand) -> ProtocolResponse:
+        """Answer response of prefetched command, or read it now if it was not prefetched"""
+        task = prefetched.pop(command, None)
+        if task is not None:
+            return await task
+        return await self._read_from_socket(command)
+
     @abstractmethod
     async def read_device_info(self):
         """
@@ -142,13 +448,25 @@ class Inverter(ABC):
         """
         raise NotImplementedError()
 
-    @abstractmethod
-    async def read_runtime_data(self) -> dict[str, Any]:
+    async def read_runtime_data(self, sensor_ids: Iterable[str] | None = None) -> dict[str, Any] | LazyRuntimeData:
         """
         Request the runtime data from the inverter.
         Answer dictionary of individual sensors and their values.
         List of supported sensors (and their definitions) is provided by sensors() method.
+
+        When sensor_ids are specified, only the data blocks containing these sensors are requested.
+        The answer may then contain also other sensors read within the same blocks.
+
+        Concurrent calls asking for the same sensors share single request of the data.
+        With lazy decoding enabled (see set_lazy_decoding()) the values are decoded on access.
         """
+        ids = frozenset(sensor_ids) if sensor_ids is not None else None
+        return (await self._single_flight(('runtime_data', ids), lambda: self._read_runtime_data(ids),
+                                          lambda data: data)).copy()
+
+    @abstractmethod
+    async def _read_runtime_data(self, sensor_ids: Iterable[str] | None) -> dict[str, Any] | LazyRuntimeData:
+        """Request the runtime data from the inverter (see read_runtime_data())"""
         raise NotImplementedError()
 
     @abstractmethod
@@ -179,6 +497,24 @@ class Inverter(ABC):
         """
         raise NotImplementedError()
 
+    async def write_settings(self, values: dict[str, Any]) -> dict[str, Exception | None]:
+        """
+        Set the values of several inverter settings/configuration parameters at once.
+        Answer dictionary of settings and the exception their write failed with (None if it succeeded).
+
+        BEWARE !!!
+        This method modifies inverter operational parameter (usually accessible to installers only).
+        Use with caution and at your own risk !
+        """
+        result: dict[str, Exception | None] = {}
+        for setting_id, value in values.items():
+            try:
+                await self.write_setting(setting_id, value)
+                result[setting_id] = None
+            except (InverterError, ValueError) as ex:
+                result[setting_id] = ex
+        return result
+
     @abstractmethod
     async def read_settings_data(self) -> dict[str, Any]:
         """
@@ -285,17 +621,176 @@ class Inverter(ABC):
             return TcpInverterProtocol(host, port, comm_addr, timeout, retries)
         return UdpInverterProtocol(host, port, comm_addr, timeout, retries)
 
+    async def _read_sensors(self, sensors: tuple[Sensor, ...],
+                            read_single: Callable[[Sensor], Awaitable[Any]]) -> dict[str, Any]:
+        """
+        Read values of the sensors (settings) using as few block reads as possible.
+        Sensors of rejected blocks (and sensors which cannot be read in blocks) are read by read_single().
+        Registers known to be not available are not read at all.
+        """
+        data: dict[str, Any] = {s.id_: None for s in sensors}
+        available = tuple(s for s in sensors
+                          if s.offset < 0 or self._availability.is_available(s.offset, sensor_registers(s)))
+        remaining = {s.id_: s for s in available}
+        for block in plan_reads(available, exclude=self._availability):
+            try:
+                response = await self._read_from_socket(self._read_command(block.offset, block.count))
+                data.update(self._map_response(response, block.sensors))
+                for sensor in block.sensors:
+                    remaining.pop(sensor.id_, None)
+            except RequestRejectedException as ex:
+                logger.debug("Block read %s rejected (%s), reading values individually.", block, ex.message)
+            except RequestFailedException:
+                logger.exception("Error reading settings %s.", [s.id_ for s in block.sensors])
+                for sensor in block.sensors:
+                    remaining.pop(sensor.id_, None)
+        for sensor in remaining.values():
+            data[sensor.id_] = await read_single(sensor)
+        return data
+
+    async def _write_settings_batch(self, values: dict[str, Any],
+                                    settings: dict[str, Sensor]) -> dict[str, Exception | None]:
+        """
+        Write the settings values with as few requests as possible.
+        All values are encoded first, contiguous registers are written by single multi-write request
+        and 1 byte settings sharing the same register (ByteH/ByteL) are merged to single register write.
+        Registers only partially covered by the values are read (in blocks) before being written.
+        """
+        result: dict[str, Exception | None] = {}
+        encoded, coverage = self._encode_settings(values, settings, result)
+        partners = await self._partner_registers(coverage, encoded, result)
+        frames = self._coalesce_writes(encoded, partners, result)
+        await self._execute_writes(frames, result)
+        return {setting_id: result.get(setting_id) for setting_id in values}
+
+    @staticmethod
+    def _encode_setting(setting_id: str, value: Any, settings: dict[str, Sensor]) -> tuple[Sensor, bytes | None]:
+        """Answer the setting and its encoded value (None for 1 byte setting encoded into register value later)"""
+        setting = settings.get(setting_id)
+        if setting is None:
+            if not setting_id.startswith("modbus"):
+                raise ValueError(f'Unknown setting "{setting_id}"')
+            setting = Sensor(setting_id, int(setting_id[7:]), setting_id, 2, "", None)
+            return setting, int(value).to_bytes(2, byteorder="big", signed=int(value) < 0)
+        if setting.size_ == 1:
+            return setting, None
+        return setting, setting.encode_value(value)
+
+    @staticmethod
+    def _covered_bytes(setting: Sensor, value: Any, raw_value: bytes | None) -> dict[int, set[int]]:
+        """Answer the bytes of each register replaced by the setting value"""
+        if raw_value is None:
+            # bytes of the register value (not replaced by setting value) differ
+            zeros = setting.encode_value(value, b'\x00\x00')
+            ones = setting.encode_value(value, b'\xff\xff')
+            return {setting.offset: {i for i in range(2) if zeros[i] == ones[i]}}
+        return {register: {0, 1} for register in range(setting.offset, setting.offset + len(raw_value) // 2)}
+
+    def _encode_settings(self, values: dict[str, Any], settings: dict[str, Sensor],
+                         result: dict[str, Exception | None]) \
+            -> tuple[list[tuple[Sensor, Any, bytes | None]], dict[int, set[int]]]:
+        """
+        Encode the settings values, answer list of (setting, value, encoded value) and bytes of each register
+        covered by the values. Values failing to encode are reported in result.
+        """
+        encoded: list[tuple[Sensor, Any, bytes | None]] = []
+        coverage: dict[int, set[int]] = {}
+        for setting_id, value in values.items():
+            try:
+                setting, raw_value = self._encode_setting(setting_id, value, settings)
+                covered = self._covered_bytes(setting, value, raw_value)
+            except (ValueError, TypeError, NotImplementedError) as ex:
+                result[setting_id] = ex
+                continue
+            for register, covered_bytes in covered.items():
+                coverage.setdefault(register, set()).update(covered_bytes)
+            encoded.append((setting, value, raw_value))
+        return encoded, coverage
+
+    async def _partner_registers(self, coverage: dict[int, set[int]], encoded: list[tuple[Sensor, Any, bytes | None]],
+                                 result: dict[str, Exception | None]) -> dict[int, bytes]:
+        """
+        Answer current values of the registers only partially covered by the values (ByteH/ByteL partner bytes),
+        taken from the register shadow or read (in blocks). Settings of registers failed to read are reported in result.
+        """
+        registers: dict[int, bytes] = {}
+        partial = []
+        for register, covered in sorted(coverage.items()):
+            if len(covered) == 2:
+                continue
+            shadow_value = self._shadow.get(register) if self._shadow is not None else None
+            if shadow_value is None:
+                partial.append(register)
+            else:
+                registers[register] = shadow_value
+        for block in plan_reads(tuple(Sensor("", register, "", 2, "", None) for register in partial)):
+            try:
+                registers.update(await self._read_register_block(block))
+            except InverterError as ex:
+                result.update({setting.id_: ex for setting, _, raw_value in encoded
+                               if raw_value is None and block.offset <= setting.offset < block.offset + block.count})
+        return registers
+
+    async def _read_register_block(self, block: ReadBlock) -> dict[int, bytes]:
+        """Read the block, answer the values of its (register) sensors"""
+        response = await self._read_from_socket(self._read_command(block.offset, block.count))
+        registers: dict[int, bytes] = {}
+        for sensor in block.sensors:
+            start = (sensor.offset - block.offset) * 2
+            if len(response.data) >= start + 2:
+                registers[sensor.offset] = bytes(response.data[start:start + 2])
+        return registers
+
+    @staticmethod
+    def _coalesce_writes(encoded: list[tuple[Sensor, Any, bytes | None]], partners: dict[int, bytes],
+                         result: dict[str, Exception | None]) -> list[tuple[int, bytes, set[str]]]:
+        """
+        Merge the encoded values (skipping the ones already failed) into register values
+        and answer the write frames (offset, registers values and ids of the settings written by it).
+        """
+        registers: dict[int, bytes] = {}
+        owners: dict[int, list[str]] = {}
+        for setting, value, raw_value in encoded:
+            if setting.id_ in result:
+                continue
+            if raw_value is None:
+                raw_value = setting.encode_value(value, registers.get(setting.offset,
+                                                                      partners.get(setting.offset, b'\x00\x00')))
+            for i in range(0, len(raw_value), 2):
+                registers[setting.offset + i // 2] = raw_value[i:i + 2]
+                owners.setdefault(setting.offset + i // 2, []).append(setting.id_)
+        return [(offset, raw_value, {i for r in range(offset, offset + len(raw_value) // 2) for i in owners[r]})
+                for offset, raw_value in plan_writes(registers)]
+
+    async def _execute_writes(self, frames: list[tuple[int, bytes, set[str]]],
+                              result: dict[str, Exception | None]) -> None:
+        """Write the frames, failures are reported in result for each setting of the failed frame"""
+        for offset, raw_value, setting_ids in frames:
+            try:
+                if len(raw_value) == 2:
+                    value = int.from_bytes(raw_value, byteorder="big", signed=True)
+                    await self._read_from_socket(self._write_command(offset, value))
+                else:
+                    await self._read_from_socket(self._write_multi_command(offset, raw_value))
+            except InverterError as ex:
+                for setting_id in setting_ids:
+                    result[setting_id] = ex
+
     @staticmethod
     def _map_response(response: ProtocolResponse, sensors: tuple[Sensor, ...]) -> dict[str, Any]:
         """Process the response data and return dictionary with runtime values"""
-        result = {}
-        for sensor in sensors:
-            try:
-                result[sensor.id_] = sensor.read(response)
-            except ValueError:
-                logger.exception("Error reading sensor %s.", sensor.id_)
-                result[sensor.id_] = None
-        return result
+        return decoder_for(sensors).decode(response)
+
+    def _runtime_values(self) -> dict[str, Any] | LazyRuntimeData:
+        """Answer empty container of runtime values (lazy one when lazy decoding is enabled)"""
+        return LazyRuntimeData() if self._lazy_decoding else {}
+
+    def _map_runtime_response(self, response: ProtocolResponse, sensors: tuple[Sensor, ...]) \
+            -> dict[str, Any] | LazyRuntimeData:
+        """Process the runtime data response, decoding the values now or on access when lazy decoding is enabled"""
+        if self._lazy_decoding:
+            return LazyRuntimeData().add_response(response, sensors)
+        return self._map_response(response, sensors)
 
     @staticmethod
     def _decode(data: bytes) -> str:
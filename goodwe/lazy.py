@@ -0,0 +1,116 @@
+"""Runtime data mapping decoding the sensors values on first access."""
+from __future__ import annotations
+
+import logging
+from collections.abc import MutableMapping
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+if TYPE_CHECKING:
+    from .inverter import Sensor
+    from .protocol import ProtocolResponse
+    from .sensor import Derived
+
+logger = logging.getLogger(__name__)
+
+
+class _Pending:
+    """Value of the mapping not decoded (evaluated) yet"""
+    __slots__ = ()
+
+    def resolve(self, data: LazyRuntimeData) -> Any:
+        raise NotImplementedError()
+
+
+class _SensorValue(_Pending):
+    __slots__ = ('sensor', 'response')
+
+    def __init__(self, sensor: Sensor, response: ProtocolResponse):
+        self.sensor: Sensor = sensor
+        self.response: ProtocolResponse = response
+
+    def resolve(self, data: LazyRuntimeData) -> Any:
+        try:
+            return self.sensor.read(self.response)
+        except ValueError:
+            logger.exception("Error reading sensor %s.", self.sensor.id_)
+            return None
+
+
+class _DerivedValue(_Pending):
+    __slots__ = ('sensor',)
+
+    def __init__(self, sensor: Derived):
+        self.sensor: Derived = sensor
+
+    def resolve(self, data: LazyRuntimeData) -> Any:
+        from .derived import formula_value
+
+        return formula_value(self.sensor, data)
+
+
+class LazyRuntimeData(MutableMapping):
+    """
+    Mapping of sensor values keeping the (raw) response data blocks,
+    each sensor value is decoded on its first access and cached afterwards.
+
+    The keys (and their order) are the same as of the eagerly decoded dictionary,
+    so dict(data) answers identical values as the eager decoding.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, Any] = {}
+
+    def add_response(self, response: ProtocolResponse, sensors: Iterable[Sensor]) -> LazyRuntimeData:
+        """Add the sensors (to be decoded from response on access), answer self"""
+        from .sensor import Derived
+
+        for sensor in sensors:
+            if not isinstance(sensor, Derived):
+                self._entries[sensor.id_] = _SensorValue(sensor, response)
+        return self
+
+    def add_derived(self, sensor: Derived) -> None:
+        """Add the derived sensor (to be evaluated from the other values on access)"""
+        self._entries[sensor.id_] = _DerivedValue(sensor)
+
+    def is_decoded(self, key: str) -> bool:
+        """Answer True if the value of the key was already decoded (or set explicitly)"""
+        return not isinstance(self._entries[key], _Pending)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._entries[key]
+        if isinstance(value, _Pending):
+            value = value.resolve(self)
+            self._entries[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._entries[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def update(self, other: Any = (), **kwargs: Any) -> None:
+        """Update the mapping, the values of other lazy mapping are taken over without decoding"""
+        if isinstance(other, LazyRuntimeData):
+            self._entries.update(other._entries)
+            other = ()
+        super().update(other, **kwargs)
+
+    def copy(self) -> LazyRuntimeData:
+        """Answer shallow copy of the mapping, sharing the values not decoded yet"""
+        result = LazyRuntimeData()
+        result._entries = dict(self._entries)
+        return result
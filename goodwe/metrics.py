@@ -0,0 +1,96 @@
+"""Transport metrics of inverter communication."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds (in seconds) of latency histogram buckets
+LATENCY_BUCKETS: tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """Histogram of observed values with fixed bucket upper bounds (plus count, sum, min and max)"""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets: tuple[float, ...] = buckets
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.count: int = 0
+        self.sum: float = 0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def snapshot(self) -> dict[str, Any]:
+        """Answer dictionary with histogram values, buckets are cumulative (as in Prometheus)"""
+        buckets = {}
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            buckets[bound] = total
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.sum / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+class ProtocolMetrics:
+    """
+    Counters and latency histograms of single inverter protocol (connection).
+
+    Counters:
+    requests - requests sent by client (retries not included)
+    responses - valid responses received
+    retries - requests re-sent after timeout or connection failure
+    timeouts - requests which did not receive response in time
+    fragmented_responses - responses composed from several received fragments
+    dropped_fragments - received fragments which could not be used
+    connects - connections opened (Modbus/TCP only)
+    reconnects - connections re-opened, i.e. all but the first one (Modbus/TCP only)
+    bytes_sent, bytes_received - raw bytes transferred
+
+    Rejected responses are counted by their failure code, latency histograms by command type.
+    """
+
+    def __init__(self):
+        self.counters: dict[str, int] = {}
+        self.rejected: dict[str, int] = {}
+        self.latency: dict[str, Histogram] = {}
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def count_rejected(self, failure_code: str) -> None:
+        failure_code = failure_code or "INVALID RESPONSE"
+        self.rejected[failure_code] = self.rejected.get(failure_code, 0) + 1
+
+    def observe_latency(self, command: Any, seconds: float) -> None:
+        command_type = type(command).__name__
+        histogram = self.latency.get(command_type)
+        if histogram is None:
+            histogram = self.latency[command_type] = Histogram()
+        histogram.observe(seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Answer dictionary with current values of all metrics"""
+        return {
+            **self.counters,
+            "rejected": dict(self.rejected),
+            "latency": {name: histogram.snapshot() for name, histogram in self.latency.items()},
+        }
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.rejected.clear()
+        self.latency.clear()
@@ -161,6 +161,24 @@ def create_modbus_tcp_multi_request(comm_addr: int, cmd: int, offset: int, value
     return bytes(data)
 
 
+def modbus_tcp_frame_length(data: Union[bytearray, bytes]) -> int:
+    """
+    Determine the length of Modbus/TCP response frame at start of data.
+    The MBAP length field (data[4:5]) is not reliable on Goodwe dongles,
+    so the length is derived from the command return type when possible.
+    Answer 0 when there is not enough data to determine the frame length yet.
+    """
+    if len(data) < 9:
+        return 0
+    if data[7] & 0x80:
+        return 9
+    if data[7] == MODBUS_READ_CMD:
+        return data[8] + 9
+    if data[7] in (MODBUS_WRITE_CMD, MODBUS_WRITE_MULTI_CMD):
+        return 12
+    return int.from_bytes(data[4:6], byteorder='big', signed=False) + 6
+
+
 def validate_modbus_rtu_response(data: bytes, cmd: int, offset: int, value: int) -> bool:
     """
     Validate the modbus RTU response.
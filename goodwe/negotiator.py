@@ -0,0 +1,84 @@
+"""Negotiation of register block variants supported by the inverter."""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Awaitable, Callable, Sequence
+
+from .exceptions import RequestRejectedException
+from .modbus import ILLEGAL_DATA_ADDRESS
+from .protocol import ProtocolCommand, ProtocolResponse
+
+logger = logging.getLogger(__name__)
+
+RETRY_INTERVAL: float = 24 * 3600
+
+
+class BlockNegotiator:
+    """
+    Negotiation of the read command (variant) of logical register block supported by the inverter.
+
+    The variants are ordered from the widest one, the variants rejected by inverter (ILLEGAL DATA ADDRESS)
+    are skipped and the first supported one is remembered and used for subsequent reads.
+    When retry_interval is set, the wider variants (or the whole block, if no variant was supported)
+    are tried again after that many seconds, e.g. they may have become available after firmware update.
+    """
+
+    def __init__(self, name: str, variants: Sequence[ProtocolCommand], retry_interval: float | None = RETRY_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name: str = name
+        self.variants: tuple[ProtocolCommand, ...] = tuple(variants)
+        self.retry_interval: float | None = retry_interval
+        self.index: int = 0
+        self._clock: Callable[[], float] = clock
+        self._negotiated_at: float = 0
+
+    @property
+    def supported(self) -> bool:
+        """Answer True if some variant of the block is (believed to be) supported"""
+        return self.index < len(self.variants)
+
+    @property
+    def command(self) -> ProtocolCommand | None:
+        """Answer the command of currently negotiated variant, None if block is not supported"""
+        return self.variants[self.index] if self.supported else None
+
+    def select(self, index: int) -> None:
+        """Set the negotiated variant (index of len(variants) means unsupported block)"""
+        self.index = min(max(index, 0), len(self.variants))
+        self._negotiated_at = self._clock()
+
+    def mark_unsupported(self) -> None:
+        """Mark the block as not supported (until it is retried)"""
+        self.select(len(self.variants))
+
+    def _retry_due(self) -> bool:
+        return self.index > 0 and self.retry_interval is not None \
+            and self._clock() - self._negotiated_at >= self.retry_interval
+
+    async def read(self, read_command: Callable[[ProtocolCommand], Awaitable[ProtocolResponse]]) \
+            -> ProtocolResponse | None:
+        """
+        Read the block using the negotiated variant (negotiating it first when necessary).
+        Answer the response or None when the block is not supported.
+        """
+        retry = self._retry_due()
+        index = 0 if retry else self.index
+        while index < len(self.variants):
+            try:
+                response = await read_command(self.variants[index])
+            except RequestRejectedException as ex:
+                if ex.message != ILLEGAL_DATA_ADDRESS:
+                    raise ex
+                logger.debug("Block %s variant %d not supported.", self.name, index)
+                index += 1
+                continue
+            if index != self.index:
+                logger.info("Block %s negotiated variant %d of %d.", self.name, index + 1, len(self.variants))
+            if retry or index != self.index:
+                self.select(index)
+            return response
+        if retry or index != self.index:
+            logger.info("Block %s not supported, disabling further attempts.", self.name)
+            self.select(index)
+        return None
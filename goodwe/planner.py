@@ -0,0 +1,93 @@
+"""Planning of (block) reads and writes of sensors/settings registers."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Container, Iterable
+
+if TYPE_CHECKING:
+    from .inverter import Sensor
+
+# Max number of registers a single modbus read request may ask for
+MAX_READ_REGISTERS: int = 125
+# Max number of registers a single modbus write multiple request may write
+MAX_WRITE_REGISTERS: int = 123
+
+
+class ReadBlock:
+    """Single read request of count registers starting at offset, covering the sensors values"""
+
+    def __init__(self, offset: int, count: int, sensors: tuple[Sensor, ...]):
+        self.offset: int = offset
+        self.count: int = count
+        self.sensors: tuple[Sensor, ...] = sensors
+
+    def __eq__(self, other):
+        if not isinstance(other, ReadBlock):
+            return NotImplemented
+        return (self.offset, self.count, self.sensors) == (other.offset, other.count, other.sensors)
+
+    def __repr__(self):
+        return f'ReadBlock({self.offset}, {self.count}, {[s.id_ for s in self.sensors]})'
+
+
+def sensor_registers(sensor: Sensor) -> int:
+    """Answer number of (16 bit) registers the sensor value occupies"""
+    return (sensor.size_ + (sensor.size_ % 2)) // 2
+
+
+def plan_reads(sensors: Iterable[Sensor], max_registers: int = MAX_READ_REGISTERS, max_gap: int = 8,
+               exclude: Container[int] = ()) -> list[ReadBlock]:
+    """
+    Plan the minimal list of block reads covering all the sensors registers.
+
+    Sensors separated by at most max_gap unused registers are read within the same block,
+    no block is longer than max_registers (unless a single sensor is).
+    Sensors without own registers (e.g. calculated ones) are skipped, as well as sensors
+    occupying any of the excluded (known to be illegal) registers. Excluded registers are never
+    used to fill the gaps between sensors.
+    """
+    candidates = []
+    for sensor in sensors:
+        count = sensor_registers(sensor)
+        if sensor.offset < 0 or count <= 0:
+            continue
+        if exclude and any(r in exclude for r in range(sensor.offset, sensor.offset + count)):
+            continue
+        candidates.append((sensor.offset, sensor.offset + count, sensor))
+    candidates.sort(key=lambda c: (c[0], c[1]))
+
+    blocks = []
+    start = end = 0
+    members: list[Sensor] = []
+    for first, last, sensor in candidates:
+        if members and first - end <= max_gap and max(end, last) - start <= max_registers \
+                and not (exclude and any(r in exclude for r in range(end, first))):
+            end = max(end, last)
+            members.append(sensor)
+            continue
+        if members:
+            blocks.append(ReadBlock(start, end - start, tuple(members)))
+        start, end, members = first, last, [sensor]
+    if members:
+        blocks.append(ReadBlock(start, end - start, tuple(members)))
+    return blocks
+
+
+def plan_writes(registers: dict[int, bytes], max_registers: int = MAX_WRITE_REGISTERS) -> list[tuple[int, bytes]]:
+    """
+    Plan the minimal list of (offset, values) writes of the registers (2 bytes) values.
+    Only contiguous registers are merged (registers in between must not be overwritten),
+    no write is longer than max_registers.
+    """
+    writes: list[tuple[int, bytes]] = []
+    start = 0
+    values = bytearray()
+    for register in sorted(registers):
+        if values and register == start + len(values) // 2 and len(values) // 2 < max_registers:
+            values.extend(registers[register])
+            continue
+        if values:
+            writes.append((start, bytes(values)))
+        start, values = register, bytearray(registers[register])
+    if values:
+        writes.append((start, bytes(values)))
+    return writes
@@ -2,29 +2,89 @@
 from __future__ import annotations
 
 import asyncio
-import io
 import logging
 import platform
 import socket
+import time
 from asyncio.futures import Future
-from typing import Optional, Callable
+from typing import Any, Optional, Callable
 
-from .exceptions import MaxRetriesException, PartialResponseException, RequestFailedException, RequestRejectedException
+from .exceptions import InverterError, MaxRetriesException, PartialResponseException, RequestFailedException, \
+    RequestRejectedException
 from .modbus import create_modbus_rtu_request, create_modbus_rtu_multi_request, create_modbus_tcp_request, \
-    create_modbus_tcp_multi_request, validate_modbus_rtu_response, validate_modbus_tcp_response, MODBUS_READ_CMD, \
-    MODBUS_WRITE_CMD, MODBUS_WRITE_MULTI_CMD
+    create_modbus_tcp_multi_request, modbus_tcp_frame_length, validate_modbus_rtu_response, \
+    validate_modbus_tcp_response, MODBUS_READ_CMD, MODBUS_WRITE_CMD, MODBUS_WRITE_MULTI_CMD
+from .metrics import ProtocolMetrics
+from .retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
-_modbus_tcp_tx = 0
+TRACE_SENT: str = 'sent'
+TRACE_RECEIVED: str = 'received'
 
+# Trace listener callback(direction, data, command, timestamp)
+TraceListener = Callable[[str, bytes, Optional['ProtocolCommand'], float], None]
 
-def _next_tx() -> bytes:
-    global _modbus_tcp_tx
-    _modbus_tcp_tx += 1
-    if _modbus_tcp_tx == 0xFFFF:
-        _modbus_tcp_tx = 1
-    return int.to_bytes(_modbus_tcp_tx, length=2, byteorder="big", signed=False)
+
+class _Hex:
+    """Lazy hex representation of bytes, formatted only when the log message is really emitted"""
+    __slots__ = ('data',)
+
+    def __init__(self, data: bytes | bytearray):
+        self.data = data
+
+    def __str__(self):
+        return self.data.hex()
+
+
+class RttEstimator:
+    """
+    Round-trip time estimator deriving the request (retransmit) timeout from measured response times.
+    Smoothed RTT and its variance are computed as in TCP (Jacobson/Karels, RFC 6298),
+    the resulting timeout is kept within min_timeout and max_timeout bounds.
+    """
+
+    ALPHA: float = 1 / 8
+    BETA: float = 1 / 4
+    K: int = 4
+
+    def __init__(self, initial_timeout: float, min_timeout: float, max_timeout: float):
+        self.min_timeout: float = min_timeout
+        self.max_timeout: float = max_timeout
+        self.srtt: float | None = None
+        self.rttvar: float | None = None
+        self.rto: float = self._clamp(initial_timeout)
+        self.samples: int = 0
+        self.timeouts: int = 0
+
+    def _clamp(self, value: float) -> float:
+        return min(max(value, self.min_timeout), self.max_timeout)
+
+    def update(self, rtt: float) -> None:
+        """Account new round-trip time sample (of request which was not retransmitted)"""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.samples += 1
+        self.rto = self._clamp(self.srtt + self.K * self.rttvar)
+
+    def backoff(self) -> None:
+        """Double the timeout after request timed out"""
+        self.timeouts += 1
+        self.rto = self._clamp(self.rto * 2)
+
+    def stats(self) -> dict[str, Any]:
+        """Answer dictionary with current RTT statistics"""
+        return {
+            "srtt": self.srtt,
+            "rttvar": self.rttvar,
+            "rto": self.rto,
+            "samples": self.samples,
+            "timeouts": self.timeouts,
+        }
 
 
 class InverterProtocol:
@@ -44,6 +104,13 @@ class InverterProtocol:
         self.command: ProtocolCommand | None = None
         self._partial_data: bytes | None = None
         self._partial_missing: int = 0
+        # RTT estimator of adaptive timeouts (None if fixed timeout is used)
+        self.rtt: RttEstimator | None = None
+        # Retry backoff/budget policy (None means immediate retries)
+        self.retry_policy: RetryPolicy | None = None
+        self._trace_listeners: list[TraceListener] = []
+        self.metrics: ProtocolMetrics = ProtocolMetrics()
+        self._sent_at: float = 0
 
     def _ensure_lock(self) -> asyncio.Lock:
         """Validate (or create) asyncio Lock.
@@ -62,12 +129,62 @@ class InverterProtocol:
         self._close_transport()
         return self._lock
 
-    def _max_retries_reached(self) -> Future:
-        logger.debug("Max number of retries (%d) reached, request %s failed.", self.retries, self.command)
+    def add_trace_listener(self, listener: TraceListener) -> None:
+        """Register callback receiving every raw frame sent or received"""
+        self._trace_listeners.append(listener)
+
+    def remove_trace_listener(self, listener: TraceListener) -> None:
+        """Unregister previously registered trace callback"""
+        self._trace_listeners.remove(listener)
+
+    def _trace(self, direction: str, data: bytes, command: ProtocolCommand | None) -> None:
+        """Notify trace listeners, callers should check self._trace_listeners first to avoid any overhead"""
+        timestamp = time.time()
+        for listener in self._trace_listeners:
+            try:
+                listener(direction, data, command, timestamp)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Trace listener failed.")
+
+    def _request_timeout(self) -> float:
+        """Answer the time to wait for response, either fixed or derived from measured RTT"""
+        if self.rtt:
+            return self.rtt.rto
+        return self.timeout
+
+    def _account_response_time(self, sent_at: float) -> None:
+        """Feed the RTT estimator with response time of request (0 means retransmitted request)"""
+        if self.rtt and sent_at:
+            self.rtt.update(asyncio.get_running_loop().time() - sent_at)
+
+    def _retry_allowed(self, attempt: int) -> bool:
+        """Answer True if the request failed in attempt (0 is the first one, not a retry) should be retried"""
+        if attempt >= self.retries:
+            return False
+        return self.retry_policy is None or self.retry_policy.acquire_retry()
+
+    async def _retry_delay(self, attempt: int) -> None:
+        """Wait before the retry attempt (according to the retry policy)"""
+        if self.retry_policy:
+            await self._sleep(self.retry_policy.delay(attempt))
+
+    @staticmethod
+    async def _sleep(delay: float) -> None:
+        if delay > 0:
+            logger.debug("Waiting %.3fs before retry.", delay)
+            await asyncio.sleep(delay)
+
+    def _request_succeeded(self) -> None:
+        if self.retry_policy:
+            self.retry_policy.record_success()
+
+    def _max_retries_reached(self, command: ProtocolCommand) -> Future:
+        """Close the (possibly broken) transport and answer the future failed with MaxRetriesException"""
+        logger.debug("Max number of retries (%d) reached, request %s failed.", self.retries, command)
         self._close_transport()
-        self.response_future = asyncio.get_running_loop().create_future()
-        self.response_future.set_exception(MaxRetriesException)
-        return self.response_future
+        response_future = asyncio.get_running_loop().create_future()
+        response_future.set_exception(MaxRetriesException)
+        return response_future
 
     def _close_transport(self) -> None:
         if self._transport:
@@ -84,6 +201,10 @@ class InverterProtocol:
         """Close the underlying transport/connection."""
         raise NotImplementedError()
 
+    def is_pipelined(self) -> bool:
+        """Answer True if several requests may be in flight on the connection at the same time."""
+        return False
+
     async def send_request(self, command: ProtocolCommand) -> Future:
         """Convert command to request and send it to inverter."""
         raise NotImplementedError()
@@ -106,6 +227,13 @@ class UdpInverterProtocol(InverterProtocol, asyncio.DatagramProtocol):
         super().__init__(host, port, comm_addr, timeout, retries)
         self._transport: asyncio.transports.DatagramTransport | None = None
         self._retry: int = 0
+        # Reassembly buffer of response fragmented to multiple datagrams
+        self._fragments: bytearray | None = None
+        self._fragments_count: int = 0
+        self._fragments_expected: int = 0
+        # Local port of UDP socket shared with other inverters (None means dedicated socket)
+        self.shared_local_port: int | None = None
+        self._peer_addr: tuple[str, int] | None = None
 
     def read_command(self, offset: int, count: int) -> ProtocolCommand:
         """Create read protocol command."""
@@ -121,6 +249,13 @@ class UdpInverterProtocol(InverterProtocol, asyncio.DatagramProtocol):
 
     async def _connect(self) -> None:
         if not self._transport or self._transport.is_closing():
+            if self.shared_local_port is not None:
+                if not self._peer_addr:
+                    self._peer_addr = await SharedUdpEndpoint.resolve(self._host, self._port)
+                endpoint = await SharedUdpEndpoint.get(self.shared_local_port)
+                self._transport = endpoint.attach(self, self._peer_addr)
+                self.protocol = self
+                return
             self._transport, self.protocol = await asyncio.get_running_loop().create_datagram_endpoint(
                 lambda: self,
                 remote_addr=(self._host, self._port),
@@ -140,35 +275,62 @@ class UdpInverterProtocol(InverterProtocol, asyncio.DatagramProtocol):
 
     def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
         """On datagram received"""
+        self.metrics.count('bytes_received', len(data))
+        if self._trace_listeners:
+            self._trace(TRACE_RECEIVED, data, self.command)
+        if self._fragments is None and self.command and self.command.response_header \
+                and not data.startswith(self.command.response_header):
+            # Not a start of response, it's a late fragment of (already failed) previous response
+            logger.debug("Dropped stale response fragment: %s", _Hex(data))
+            self.metrics.count('dropped_fragments')
+            return
         if self._timer:
             self._timer.cancel()
             self._timer = None
         try:
-            if self._partial_data and self._partial_missing == len(data):
-                logger.debug("Composed fragmented response: %s + %s", self._partial_data.hex(), data.hex())
-                data = self._partial_data + data
-                self._partial_data = None
-                self._partial_missing = 0
+            if self._fragments is not None:
+                if len(self._fragments) + len(data) <= self._fragments_expected:
+                    self._fragments.extend(data)
+                    self._fragments_count += 1
+                    data = bytes(self._fragments)
+                else:
+                    logger.debug("Dropped %d response fragment(s): %s", self._fragments_count,
+                                 _Hex(self._fragments))
+                    self._drop_fragments()
             if self.command.validator(data):
-                logger.debug("Received: %s", data.hex())
+                if self._fragments is not None:
+                    logger.debug("Composed response from %d fragments.", self._fragments_count)
+                    self.metrics.count('fragmented_responses')
+                    self._fragments = None
+                logger.debug("Received: %s", _Hex(data))
+                self._account_response_time(self._sent_at)
                 self._retry = 0
                 self.response_future.set_result(data)
             else:
-                logger.debug("Received invalid response: %s", data.hex())
+                logger.debug("Received invalid response: %s", _Hex(data))
+                self._drop_fragments()
                 asyncio.get_running_loop().call_soon(self._timeout_mechanism)
         except PartialResponseException as ex:
-            logger.debug("Received response fragment (%d of %d): %s", ex.length, ex.expected, data.hex())
-            self._partial_data = data
-            self._partial_missing = ex.expected - ex.length
-            self._timer = asyncio.get_running_loop().call_later(self.timeout, self._timeout_mechanism)
+            logger.debug("Received response fragment (%d of %d): %s", ex.length, ex.expected, _Hex(data))
+            if self._fragments is None:
+                self._fragments = bytearray(data)
+                self._fragments_count = 1
+            self._fragments_expected = ex.expected
+            self._timer = asyncio.get_running_loop().call_later(self._request_timeout(), self._timeout_mechanism)
         except asyncio.InvalidStateError:
-            logger.debug("Response already handled: %s", data.hex())
+            logger.debug("Response already handled: %s", _Hex(data))
         except RequestRejectedException as ex:
-            logger.debug("Received exception response: %s", data.hex())
+            logger.debug("Received exception response: %s", _Hex(data))
+            self._fragments = None
             if self.response_future and not self.response_future.done():
                 self.response_future.set_exception(ex)
             self._close_transport()
 
+    def _drop_fragments(self) -> None:
+        if self._fragments is not None:
+            self.metrics.count('dropped_fragments', self._fragments_count)
+            self._fragments = None
+
     def error_received(self, exc: Exception) -> None:
         """On error received"""
         logger.debug("Received error: %s", exc)
@@ -179,20 +341,24 @@ class UdpInverterProtocol(InverterProtocol, asyncio.DatagramProtocol):
         """Send message via transport"""
         await self._ensure_lock().acquire()
         try:
-            await self._connect()
-            response_future = asyncio.get_running_loop().create_future()
-            self._send_request(command, response_future)
-            await response_future
-            return response_future
-        except asyncio.CancelledError:
-            if self._retry < self.retries:
-                self._retry += 1
-                if self._lock and self._lock.locked():
-                    self._lock.release()
-                if not self.keep_alive:
-                    self._close_transport()
-                return await self.send_request(command)
-            return self._max_retries_reached()
+            self._retry = 0
+            while True:
+                try:
+                    await self._connect()
+                    response_future = asyncio.get_running_loop().create_future()
+                    self._send_request(command, response_future)
+                    await response_future
+                    self._request_succeeded()
+                    return response_future
+                except asyncio.CancelledError:
+                    if not self._retry_allowed(self._retry):
+                        self.response_future = self._max_retries_reached(command)
+                        return self.response_future
+                    self._retry += 1
+                    self.metrics.count('retries')
+                    if not self.keep_alive:
+                        self._close_transport()
+                    await self._retry_delay(self._retry)
         finally:
             if self._lock and self._lock.locked():
                 self._lock.release()
@@ -203,15 +369,19 @@ class UdpInverterProtocol(InverterProtocol, asyncio.DatagramProtocol):
         """Send message via transport"""
         self.command = command
         self.response_future = response_future
-        self._partial_data = None
-        self._partial_missing = 0
+        self._drop_fragments()
         payload = command.request_bytes()
         if self._retry > 0:
             logger.debug("Sending: %s - retry #%s/%s", self.command, self._retry, self.retries)
         else:
             logger.debug("Sending: %s", self.command)
         self._transport.sendto(payload)
-        self._timer = asyncio.get_running_loop().call_later(self.timeout, self._timeout_mechanism)
+        self.metrics.count('bytes_sent', len(payload))
+        if self._trace_listeners:
+            self._trace(TRACE_SENT, payload, command)
+        # Response time of retransmitted request is ambiguous (Karn's algorithm), don't measure it
+        self._sent_at = asyncio.get_running_loop().time() if self.rtt and self._retry == 0 else 0
+        self._timer = asyncio.get_running_loop().call_later(self._request_timeout(), self._timeout_mechanism)
 
     def _timeout_mechanism(self) -> None:
         """Timeout mechanism to prevent hanging transport"""
@@ -220,8 +390,12 @@ class UdpInverterProtocol(InverterProtocol, asyncio.DatagramProtocol):
             self._retry = 0
         else:
             if self._timer:
-                logger.debug("Failed to receive response to %s in time (%ds).", self.command, self.timeout)
+                logger.debug("Failed to receive response to %s in time (%.3fs).", self.command,
+                             self._request_timeout())
                 self._timer = None
+                self.metrics.count('timeouts')
+                if self.rtt:
+                    self.rtt.backoff()
             if self.response_future and not self.response_future.done():
                 self.response_future.cancel()
 
@@ -229,11 +403,178 @@ class UdpInverterProtocol(InverterProtocol, asyncio.DatagramProtocol):
         self._close_transport()
 
 
+class SharedUdpEndpoint(asyncio.DatagramProtocol):
+    """
+    Single UDP socket (per local port and event loop) shared by many UdpInverterProtocol instances.
+    Received datagrams are dispatched to the protocols by the sender (inverter) address.
+    The socket is closed when no protocol is attached to it for IDLE_TIMEOUT seconds.
+    """
+
+    IDLE_TIMEOUT: float = 30
+
+    _endpoints: dict[tuple[asyncio.AbstractEventLoop, int], SharedUdpEndpoint] = {}
+
+    def __init__(self, local_port: int):
+        self.local_port: int = local_port
+        self._transport: asyncio.DatagramTransport | None = None
+        self._peers: dict[tuple[str, int], list[UdpInverterProtocol]] = {}
+        self._idle_timer: asyncio.TimerHandle | None = None
+
+    @staticmethod
+    async def resolve(host: str, port: int) -> tuple[str, int]:
+        """Resolve host name to the (ip, port) address datagrams will be received from"""
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, family=socket.AF_INET,
+                                                             type=socket.SOCK_DGRAM)
+        return infos[0][4][0], infos[0][4][1]
+
+    @classmethod
+    async def get(cls, local_port: int = 0) -> SharedUdpEndpoint:
+        """Answer the shared endpoint bound to local port (0 means any port), open it if necessary"""
+        loop = asyncio.get_running_loop()
+        endpoint = cls._endpoints.get((loop, local_port))
+        if endpoint and endpoint._transport and not endpoint._transport.is_closing():
+            return endpoint
+        logger.debug("Opening shared UDP socket on port %d.", local_port)
+        _, endpoint = await loop.create_datagram_endpoint(
+            lambda: SharedUdpEndpoint(local_port),
+            local_addr=('0.0.0.0', local_port),
+            family=socket.AF_INET,
+        )
+        cls._endpoints[(loop, local_port)] = endpoint
+        return endpoint
+
+    def attach(self, protocol: UdpInverterProtocol, addr: tuple[str, int]) -> asyncio.DatagramTransport:
+        """Register the protocol as receiver of datagrams from addr, answer its (virtual) transport"""
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        self._peers.setdefault(addr, []).append(protocol)
+        return _SharedUdpTransport(self, protocol, addr)
+
+    def detach(self, protocol: UdpInverterProtocol, addr: tuple[str, int]) -> None:
+        """Unregister the protocol, schedule closing of the socket if it was the last one"""
+        protocols = self._peers.get(addr)
+        if protocols and protocol in protocols:
+            protocols.remove(protocol)
+            if not protocols:
+                del self._peers[addr]
+        if not self._peers and self._transport and not self._idle_timer:
+            self._idle_timer = asyncio.get_event_loop().call_later(self.IDLE_TIMEOUT, self.close)
+
+    def sendto(self, data: bytes, addr: tuple[str, int]) -> None:
+        self._transport.sendto(data, addr)
+
+    def close(self) -> None:
+        """Close the shared socket"""
+        self._idle_timer = None
+        if self._transport:
+            self._transport.close()
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        """On connection made"""
+        self._transport = transport
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """On connection lost"""
+        logger.debug("Shared UDP socket on port %d closed.", self.local_port)
+        self._transport = None
+        for key, endpoint in list(self._endpoints.items()):
+            if endpoint is self:
+                del self._endpoints[key]
+        for protocols in list(self._peers.values()):
+            for protocol in list(protocols):
+                protocol.connection_lost(exc)
+        self._peers.clear()
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """On datagram received, dispatch it to protocol(s) communicating with its sender"""
+        protocols = self._peers.get(addr[0:2])
+        if not protocols:
+            logger.debug("Received datagram from unknown peer %s: %s", addr, _Hex(data))
+            return
+        if len(protocols) == 1:
+            protocols[0].datagram_received(data, addr)
+            return
+        for protocol in protocols:
+            if protocol.response_future and not protocol.response_future.done():
+                protocol.datagram_received(data, addr)
+
+    def error_received(self, exc: Exception) -> None:
+        """On error received"""
+        logger.debug("Shared UDP socket received error: %s", exc)
+
+
+class _SharedUdpTransport:
+    """Transport of single UdpInverterProtocol sending datagrams via SharedUdpEndpoint"""
+
+    def __init__(self, endpoint: SharedUdpEndpoint, protocol: UdpInverterProtocol, addr: tuple[str, int]):
+        self._endpoint: SharedUdpEndpoint | None = endpoint
+        self._protocol: UdpInverterProtocol = protocol
+        self._addr: tuple[str, int] = addr
+
+    def sendto(self, data: bytes, addr: tuple[str, int] | None = None) -> None:
+        self._endpoint.sendto(data, addr or self._addr)
+
+    def is_closing(self) -> bool:
+        return self._endpoint is None or self._endpoint._transport is None
+
+    def close(self) -> None:
+        if self._endpoint:
+            self._endpoint.detach(self._protocol, self._addr)
+            self._endpoint = None
+
+    def get_extra_info(self, name: str, default: Any = None) -> Any:
+        if name == 'peername':
+            return self._addr
+        if self._endpoint and self._endpoint._transport:
+            return self._endpoint._transport.get_extra_info(name, default)
+        return default
+
+
 class TcpInverterProtocol(InverterProtocol, asyncio.Protocol):
     def __init__(self, host: str, port: int, comm_addr: int, timeout: int = 1, retries: int = 0):
         super().__init__(host, port, comm_addr, timeout, retries)
         self._transport: asyncio.transports.Transport | None = None
         self._retry: int = 0
+        self._tx: int = 0
+        # Max number of requests in flight (1 means strict request/response sequence)
+        self.pipeline: int = 1
+        self._window: asyncio.Semaphore | None = None
+        self._window_size: int = 0
+        # In-flight pipelined requests (command, future, timer, sent_at) by Modbus/TCP transaction identifier
+        self._pending: dict[bytes, tuple[ProtocolCommand, Future, asyncio.TimerHandle, float]] = {}
+        self._stream: bytearray = bytearray()
+        # Managed connection - kept warm by probes, reconnected when lost and closed when idle for too long
+        self.managed: bool = False
+        self.probe_command: ProtocolCommand | None = None
+        self.probe_interval: float = 30
+        self.idle_ttl: float = 300
+        self._watchdog: asyncio.Task | None = None
+        self._last_request: float = 0
+        self._last_traffic: float = 0
+
+    def is_pipelined(self) -> bool:
+        """Answer True if several requests may be in flight on the connection at the same time."""
+        return self.pipeline > 1
+
+    def _next_tx(self) -> int:
+        """Answer next Modbus/TCP transaction identifier of this connection"""
+        self._tx += 1
+        if self._tx == 0xFFFF:
+            self._tx = 1
+        return self._tx
+
+    def _ensure_window(self) -> asyncio.Semaphore:
+        """Validate (or create) the semaphore limiting number of in-flight requests.
+
+           Like the lock, the semaphore is bound to the event loop it was created in.
+        """
+        running_loop = self._running_loop
+        self._ensure_lock()
+        if self._window is None or running_loop != self._running_loop or self._window_size != self.pipeline:
+            self._window = asyncio.Semaphore(max(1, self.pipeline))
+            self._window_size = self.pipeline
+        return self._window
 
     def read_command(self, offset: int, count: int) -> ProtocolCommand:
         """Create read protocol command."""
@@ -254,6 +595,9 @@ class TcpInverterProtocol(InverterProtocol, asyncio.Protocol):
                 lambda: self,
                 host=self._host, port=self._port,
             )
+            if self.metrics.counters.get('connects'):
+                self.metrics.count('reconnects')
+            self.metrics.count('connects')
             if self.keep_alive:
                 try:
                     sock = self._transport.get_extra_info('socket')
@@ -266,6 +610,55 @@ class TcpInverterProtocol(InverterProtocol, asyncio.Protocol):
                             sock.ioctl(socket.SIO_KEEPALIVE_VALS, (1, 10000, 10000))
                 except AttributeError as ex:
                     logger.debug("Failed to apply KEEPALIVE: %s", ex)
+            if self.managed:
+                self._last_traffic = asyncio.get_running_loop().time()
+                self._start_watchdog()
+
+    def _start_watchdog(self) -> None:
+        if self._watchdog and not self._watchdog.done() and self._watchdog.get_loop() is asyncio.get_running_loop():
+            return
+        self._watchdog = asyncio.create_task(self._watch_connection())
+
+    async def _watch_connection(self) -> None:
+        """Probe the connection when there was no traffic for probe_interval, close it when idle for idle_ttl"""
+        loop = asyncio.get_running_loop()
+        while self.managed and self._transport and not self._transport.is_closing():
+            now = loop.time()
+            if now - self._last_request >= self.idle_ttl:
+                logger.debug("Closing connection idle for %.0fs.", now - self._last_request)
+                await self.close()
+                return
+            if self.probe_command and now - self._last_traffic >= self.probe_interval:
+                logger.debug("Probing idle connection.")
+                try:
+                    error = (await self.send_request(self.probe_command)).exception()
+                except InverterError as ex:
+                    error = ex
+                # rejected probe is still a response of the connected inverter
+                if error is not None and not isinstance(error, RequestRejectedException):
+                    logger.debug("Connection probe failed: %r.", error)
+                    self._connection_broken()
+                continue
+            next_probe = self._last_traffic + self.probe_interval if self.probe_command else now + self.idle_ttl
+            await asyncio.sleep(max(min(next_probe, self._last_request + self.idle_ttl) - now, 0.01))
+
+    async def _reconnect(self) -> None:
+        """Re-open the lost connection (of managed connection) ahead of next request"""
+        async with self._ensure_lock():
+            try:
+                await asyncio.wait_for(self._connect(), timeout=5)
+            except (ConnectionRefusedError, TimeoutError, OSError, asyncio.TimeoutError) as ex:
+                logger.debug("Failed to reconnect: %r.", ex)
+
+    def _connection_broken(self) -> None:
+        """Close the transport closed by the inverter, re-open it if the connection is managed"""
+        reconnect = self.managed and self._transport is not None
+        self._close_transport()
+        if reconnect:
+            try:
+                asyncio.get_running_loop().create_task(self._reconnect())
+            except RuntimeError:
+                logger.debug("Failed to schedule reconnect.")
 
     def connection_made(self, transport: asyncio.DatagramTransport) -> None:
         """On connection made"""
@@ -273,7 +666,7 @@ class TcpInverterProtocol(InverterProtocol, asyncio.Protocol):
 
     def eof_received(self) -> None:
         logger.debug("EOF received.")
-        self._close_transport()
+        self._connection_broken()
 
     def connection_lost(self, exc: Optional[Exception]) -> None:
         """On connection lost"""
@@ -281,35 +674,46 @@ class TcpInverterProtocol(InverterProtocol, asyncio.Protocol):
             logger.debug("Connection closed with error: %s.", exc)
         else:
             logger.debug("Connection closed.")
-        self._close_transport()
+        self._connection_broken()
 
     def data_received(self, data: bytes) -> None:
         """On data received"""
+        self.metrics.count('bytes_received', len(data))
+        if self.managed:
+            self._last_traffic = asyncio.get_running_loop().time()
+        if self._trace_listeners:
+            self._trace(TRACE_RECEIVED, data, self.command if not self._pending else None)
+        if self._pending or self._stream:
+            self._stream.extend(data)
+            self._dispatch_pipelined()
+            return
         if self._timer:
             self._timer.cancel()
         try:
             if self._partial_data and self._partial_missing == len(data):
-                logger.debug("Composed fragmented response: %s + %s", self._partial_data.hex(), data.hex())
+                logger.debug("Composed fragmented response: %s + %s", _Hex(self._partial_data), _Hex(data))
+                self.metrics.count('fragmented_responses')
                 data = self._partial_data + data
                 self._partial_data = None
                 self._partial_missing = 0
             if self.command.validator(data):
-                logger.debug("Received: %s", data.hex())
+                logger.debug("Received: %s", _Hex(data))
+                self._account_response_time(self._sent_at)
                 self._retry = 0
                 self.response_future.set_result(data)
             else:
-                logger.debug("Received invalid response: %s", data.hex())
+                logger.debug("Received invalid response: %s", _Hex(data))
                 self.response_future.set_exception(RequestRejectedException())
                 self._close_transport()
         except PartialResponseException as ex:
-            logger.debug("Received response fragment (%d of %d): %s", ex.length, ex.expected, data.hex())
+            logger.debug("Received response fragment (%d of %d): %s", ex.length, ex.expected, _Hex(data))
             self._partial_data = data
             self._partial_missing = ex.expected - ex.length
-            self._timer = asyncio.get_running_loop().call_later(self.timeout, self._timeout_mechanism)
+            self._timer = asyncio.get_running_loop().call_later(self._request_timeout(), self._timeout_mechanism)
         except asyncio.InvalidStateError:
-            logger.debug("Response already handled: %s", data.hex())
+            logger.debug("Response already handled: %s", _Hex(data))
         except RequestRejectedException as ex:
-            logger.debug("Received exception response: %s", data.hex())
+            logger.debug("Received exception response: %s", _Hex(data))
             if self.response_future and not self.response_future.done():
                 self.response_future.set_exception(ex)
             # self._close_transport()
@@ -322,31 +726,36 @@ class TcpInverterProtocol(InverterProtocol, asyncio.Protocol):
 
     async def send_request(self, command: ProtocolCommand) -> Future:
         """Send message via transport"""
+        if self.managed and command is not self.probe_command:
+            self._last_request = asyncio.get_running_loop().time()
+        if self.is_pipelined():
+            return await self._send_pipelined(command)
         await self._ensure_lock().acquire()
         try:
-            await asyncio.wait_for(self._connect(), timeout=5)
-            response_future = asyncio.get_running_loop().create_future()
-            self._send_request(command, response_future)
-            await response_future
-            return response_future
-        except asyncio.CancelledError:
-            if self._retry < self.retries:
-                if self._timer:
-                    logger.debug("Connection broken error.")
-                self._retry += 1
-                if self._lock and self._lock.locked():
-                    self._lock.release()
-                self._close_transport()
-                return await self.send_request(command)
-            return self._max_retries_reached()
-        except (ConnectionRefusedError, TimeoutError, OSError, asyncio.TimeoutError):
-            if self._retry < self.retries:
-                logger.debug("Connection refused error.")
+            self._retry = 0
+            while True:
+                try:
+                    await asyncio.wait_for(self._connect(), timeout=5)
+                    response_future = asyncio.get_running_loop().create_future()
+                    self._send_request(command, response_future)
+                    await response_future
+                    self._request_succeeded()
+                    return response_future
+                except asyncio.CancelledError:
+                    if not self._retry_allowed(self._retry):
+                        self.response_future = self._max_retries_reached(command)
+                        return self.response_future
+                    if self._timer:
+                        logger.debug("Connection broken error.")
+                    self._close_transport()
+                except (ConnectionRefusedError, TimeoutError, OSError, asyncio.TimeoutError):
+                    if not self._retry_allowed(self._retry):
+                        self.response_future = self._max_retries_reached(command)
+                        return self.response_future
+                    logger.debug("Connection refused error.")
                 self._retry += 1
-                if self._lock and self._lock.locked():
-                    self._lock.release()
-                return await self.send_request(command)
-            return self._max_retries_reached()
+                self.metrics.count('retries')
+                await self._retry_delay(self._retry)
         finally:
             if self._lock and self._lock.locked():
                 self._lock.release()
@@ -357,13 +766,18 @@ class TcpInverterProtocol(InverterProtocol, asyncio.Protocol):
         self.response_future = response_future
         self._partial_data = None
         self._partial_missing = 0
-        payload = command.request_bytes()
+        payload = command.request_bytes(self._next_tx())
         if self._retry > 0:
             logger.debug("Sending: %s - retry #%s/%s", self.command, self._retry, self.retries)
         else:
             logger.debug("Sending: %s", self.command)
         self._transport.write(payload)
-        self._timer = asyncio.get_running_loop().call_later(self.timeout, self._timeout_mechanism)
+        self.metrics.count('bytes_sent', len(payload))
+        if self._trace_listeners:
+            self._trace(TRACE_SENT, payload, command)
+        # Response time of retransmitted request is ambiguous (Karn's algorithm), don't measure it
+        self._sent_at = asyncio.get_running_loop().time() if self.rtt and self._retry == 0 else 0
+        self._timer = asyncio.get_running_loop().call_later(self._request_timeout(), self._timeout_mechanism)
 
     def _timeout_mechanism(self) -> None:
         """Retry mechanism to prevent hanging transport"""
@@ -371,13 +785,113 @@ class TcpInverterProtocol(InverterProtocol, asyncio.Protocol):
             self._retry = 0
         else:
             if self._timer:
-                logger.debug("Failed to receive response to %s in time (%ds).", self.command, self.timeout)
+                logger.debug("Failed to receive response to %s in time (%.3fs).", self.command,
+                             self._request_timeout())
                 self._timer = None
+                self.metrics.count('timeouts')
+                if self.rtt:
+                    self.rtt.backoff()
+            self._close_transport()
+
+    async def _send_pipelined(self, command: ProtocolCommand) -> Future:
+        """Send message via transport without waiting for responses to other in-flight requests.
+
+           Responses are matched to requests by their Modbus/TCP transaction identifier.
+        """
+        async with self._ensure_window():
+            retry = 0
+            while True:
+                if retry > 0:
+                    logger.debug("Sending: %s - retry #%s/%s", command, retry, self.retries)
+                try:
+                    response_future = asyncio.get_running_loop().create_future()
+                    async with self._lock:
+                        await asyncio.wait_for(self._connect(), timeout=5)
+                        self._send_pipelined_request(command, response_future, retry == 0)
+                    await response_future
+                    self._request_succeeded()
+                    return response_future
+                except (ConnectionRefusedError, TimeoutError, OSError, asyncio.TimeoutError) as ex:
+                    logger.debug("Request %s failed: %r.", command, ex)
+                if not self._retry_allowed(retry):
+                    return self._max_retries_reached(command)
+                retry += 1
+                self.metrics.count('retries')
+                await self._retry_delay(retry)
+
+    def _send_pipelined_request(self, command: ProtocolCommand, response_future: Future, measure: bool) -> None:
+        """Send message via transport and register it among in-flight requests"""
+        payload = command.request_bytes(self._next_tx())
+        tx = payload[0:2]
+        loop = asyncio.get_running_loop()
+        timer = loop.call_later(self._request_timeout(), self._pipelined_timeout, tx)
+        self._pending[tx] = (command, response_future, timer, loop.time() if self.rtt and measure else 0)
+        logger.debug("Sending: %s (%d in flight)", command, len(self._pending))
+        self._transport.write(payload)
+        self.metrics.count('bytes_sent', len(payload))
+        if self._trace_listeners:
+            self._trace(TRACE_SENT, payload, command)
+
+    def _pipelined_timeout(self, tx: bytes) -> None:
+        """Fail the in-flight request and close the (stalled) connection, next request will reopen it"""
+        command, response_future, _, _ = self._pending.pop(tx, (None, None, None, 0))
+        if response_future and not response_future.done():
+            logger.debug("Failed to receive response to %s in time (%.3fs).", command, self._request_timeout())
+            self.metrics.count('timeouts')
+            if self.rtt:
+                self.rtt.backoff()
+            response_future.set_exception(asyncio.TimeoutError())
+            # fails the other in-flight requests and drops the partially received stream
             self._close_transport()
 
+    def _dispatch_pipelined(self) -> None:
+        """Split received stream to response frames and route them to their requests"""
+        while True:
+            length = modbus_tcp_frame_length(self._stream)
+            if not length or len(self._stream) < length:
+                return
+            if self._stream[2:4] != b'\x00\x00':
+                logger.debug("Received invalid response stream: %s", _Hex(self._stream))
+                self._stream.clear()
+                return
+            data = bytes(self._stream[:length])
+            del self._stream[:length]
+            command, response_future, timer, sent_at = self._pending.pop(data[0:2], (None, None, None, 0))
+            if not command:
+                logger.debug("Received response to unknown transaction: %s", _Hex(data))
+                continue
+            timer.cancel()
+            try:
+                if command.validator(data):
+                    logger.debug("Received: %s", _Hex(data))
+                    self._account_response_time(sent_at)
+                    response_future.set_result(data)
+                else:
+                    logger.debug("Received invalid response: %s", _Hex(data))
+                    response_future.set_exception(RequestRejectedException())
+            except (PartialResponseException, RequestRejectedException) as ex:
+                logger.debug("Received exception response: %s", _Hex(data))
+                response_future.set_exception(
+                    ex if isinstance(ex, RequestRejectedException) else RequestRejectedException())
+            except asyncio.InvalidStateError:
+                logger.debug("Response already handled: %s", _Hex(data))
+
+    def _close_transport(self) -> None:
+        super()._close_transport()
+        self._stream.clear()
+        # Cancel in-flight pipelined requests on connection lost
+        for command, response_future, timer, _ in self._pending.values():
+            timer.cancel()
+            if not response_future.done():
+                response_future.set_exception(ConnectionResetError())
+        self._pending.clear()
+
     async def close(self):
         await self._ensure_lock().acquire()
         try:
+            if self._pending:
+                # other pipelined requests are still in flight, the last of them will close it
+                return
             self._close_transport()
         finally:
             if self._lock and self._lock.locked():
@@ -385,34 +899,60 @@ class TcpInverterProtocol(InverterProtocol, asyncio.Protocol):
 
 
 class ProtocolResponse:
-    """Definition of response to protocol command"""
+    """
+    Definition of response to protocol command.
+
+    The response data are kept as (zero-copy) memoryview of the received raw data.
+    Values can be read at any address with read_at(), independently of each other,
+    seek() and read() provide the sequential (stateful) reading on top of that.
+    """
 
     def __init__(self, raw_data: bytes, command: Optional[ProtocolCommand]):
         self.raw_data: bytes = raw_data
         self.command: ProtocolCommand = command
-        self._bytes: io.BytesIO = io.BytesIO(self.response_data())
+        view = memoryview(raw_data)
+        self._data: memoryview = command.trim_response(view) if command is not None else view
+        self._position: int = 0
 
     def __repr__(self):
         return self.raw_data.hex()
 
+    @property
+    def data(self) -> memoryview:
+        """Answer the response data (without header and checksum) as memoryview"""
+        return self._data
+
     def response_data(self) -> bytes:
         if self.command is not None:
             return self.command.trim_response(self.raw_data)
         return self.raw_data
 
+    def _position_of(self, address: int) -> int:
+        position = self.command.get_offset(address) if self.command is not None else address
+        if position < 0:
+            raise ValueError(f"negative seek value {position}")
+        return position
+
+    def read_at(self, address: int, size: int) -> memoryview:
+        """Answer (up to) size bytes of data at address, without affecting the read position"""
+        position = self._position_of(address)
+        return self._data[position:position + size]
+
     def seek(self, address: int) -> None:
-        if self.command is not None:
-            self._bytes.seek(self.command.get_offset(address))
-        else:
-            self._bytes.seek(address)
+        self._position = self._position_of(address)
 
     def read(self, size: int) -> bytes:
-        return self._bytes.read(size)
+        data = self._data[self._position:self._position + size]
+        self._position += len(data)
+        return bytes(data)
 
 
 class ProtocolCommand:
     """Definition of inverter protocol command"""
 
+    # Bytes every response starts with (if known)
+    response_header: bytes = b''
+
     def __init__(self, request: bytes, validator: Callable[[bytes], bool]):
         self.request: bytes = request
         self.validator: Callable[[bytes], bool] = validator
@@ -429,8 +969,8 @@ class ProtocolCommand:
     def __repr__(self):
         return self.request.hex()
 
-    def request_bytes(self) -> bytes:
-        """Return raw bytes payload, optionally pre-processed"""
+    def request_bytes(self, tx_id: int = 0) -> bytes:
+        """Return raw bytes payload, optionally pre-processed (e.g. with transaction identifier)"""
         return self.request
 
     def trim_response(self, raw_response: bytes):
@@ -447,14 +987,21 @@ class ProtocolCommand:
 
         Return ProtocolResponse with raw response data
         """
+        protocol.metrics.count('requests')
+        started = asyncio.get_running_loop().time()
         try:
             response_future = await protocol.send_request(self)
             result = response_future.result()
             if result is not None:
+                protocol.metrics.count('responses')
+                protocol.metrics.observe_latency(self, asyncio.get_running_loop().time() - started)
                 return ProtocolResponse(result, self)
             raise RequestFailedException(
                 "No response received to '" + self.request.hex() + "' request."
             )
+        except RequestRejectedException as ex:
+            protocol.metrics.count_rejected(ex.message)
+            raise
         except (asyncio.CancelledError, ConnectionRefusedError):
             raise RequestFailedException(
                 "No valid response received to '" + self.request.hex() + "' request."
@@ -479,6 +1026,8 @@ class Aa55ProtocolCommand(ProtocolCommand):
     The last 2 bytes are again plain checksum of header+payload.
     """
 
+    response_header: bytes = b'\xaa\x55'
+
     def __init__(self, payload: str, response_type: str, offset: int = 0, value: int = 0):
         super().__init__(
             bytes.fromhex(
@@ -602,6 +1151,8 @@ class ModbusRtuProtocolCommand(ProtocolCommand):
     Last 2 bytes of response is again the CRC-16 of the response.
     """
 
+    response_header: bytes = b'\xaa\x55'
+
     def __init__(self, request: bytes, cmd: int, offset: int, value: int):
         super().__init__(
             request,
@@ -658,6 +1209,7 @@ class ModbusRtuWriteMultiCommand(ModbusRtuProtocolCommand):
         super().__init__(
             create_modbus_rtu_multi_request(comm_addr, MODBUS_WRITE_MULTI_CMD, offset, values),
             MODBUS_WRITE_MULTI_CMD, offset, len(values) // 2)
+        self.values: bytes = values
 
 
 class ModbusTcpProtocolCommand(ProtocolCommand):
@@ -672,12 +1224,14 @@ class ModbusTcpProtocolCommand(ProtocolCommand):
         )
         self.first_address: int = offset
         self.value = value
+        # Request without transaction identifier, self.request itself is never modified
+        self._pdu: bytes = request[2:]
 
-    def request_bytes(self) -> bytes:
-        """Return raw bytes payload, optionally pre-processed"""
-        # Apply sequential Modbus/TCP transaction identifier
-        self.request = _next_tx() + self.request[2:]
-        return self.request
+    def request_bytes(self, tx_id: int = 0) -> bytes:
+        """Return raw bytes payload with the Modbus/TCP transaction identifier applied"""
+        if not tx_id:
+            return self.request
+        return tx_id.to_bytes(2, byteorder="big", signed=False) + self._pdu
 
     def trim_response(self, raw_response: bytes):
         """Trim raw response from header and checksum data"""
@@ -727,3 +1281,4 @@ class ModbusTcpWriteMultiCommand(ModbusTcpProtocolCommand):
         super().__init__(
             create_modbus_tcp_multi_request(comm_addr, MODBUS_WRITE_MULTI_CMD, offset, values),
             MODBUS_WRITE_MULTI_CMD, offset, len(values) // 2)
+        self.values: bytes = values
@@ -0,0 +1,125 @@
+"""Retry policy and circuit breaker of inverter communication."""
+from __future__ import annotations
+
+import logging
+import random
+import time
+from enum import Enum
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """
+    Policy of retrying requests which did not receive response in time.
+
+    The delay before n-th retry grows exponentially from backoff up to backoff_max seconds,
+    with optional jitter (randomized to 50-100% of the delay) to avoid synchronized retries.
+    Zero backoff means immediate retries.
+
+    Optional retry budget limits the number of retries of a single inverter:
+    each retry consumes one token, each successful request deposits budget_ratio tokens
+    (up to budget tokens at most). When no token is available, the request fails without retrying.
+    """
+
+    def __init__(self, backoff: float = 0, backoff_max: float = 5, jitter: bool = True,
+                 budget: float | None = None, budget_ratio: float = 0.2):
+        self.backoff: float = backoff
+        self.backoff_max: float = backoff_max
+        self.jitter: bool = jitter
+        self.budget: float | None = budget
+        self.budget_ratio: float = budget_ratio
+        self._tokens: float = budget or 0
+
+    def delay(self, attempt: int) -> float:
+        """Answer the delay (in seconds) before the attempt-th retry"""
+        if self.backoff <= 0:
+            return 0
+        delay = min(self.backoff_max, self.backoff * 2 ** (attempt - 1))
+        if self.jitter:
+            return random.uniform(delay / 2, delay)
+        return delay
+
+    def acquire_retry(self) -> bool:
+        """Answer True if the retry is allowed by the retry budget (and consume it)"""
+        if self.budget is None:
+            return True
+        if self._tokens < 1:
+            logger.debug("Retry budget exhausted.")
+            return False
+        self._tokens -= 1
+        return True
+
+    def record_success(self) -> None:
+        """Account successful request (replenish the retry budget)"""
+        if self.budget is not None:
+            self._tokens = min(self.budget, self._tokens + self.budget_ratio)
+
+
+class CircuitState(Enum):
+    """
+    Enumeration of circuit breaker states.
+
+    CLOSED - requests are sent normally
+    OPEN - requests fail immediately without being sent
+    HALF_OPEN - single probe request is sent to verify if the inverter is reachable again
+    """
+
+    CLOSED = 1
+    OPEN = 2
+    HALF_OPEN = 3
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker failing requests immediately after failure_threshold consecutive failed requests.
+    After reset_timeout seconds a single probe request is let through, its success closes the circuit,
+    its failure opens it again for another reset_timeout seconds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.state: CircuitState = CircuitState.CLOSED
+        self._clock: Callable[[], float] = clock
+        self._failures: int = 0
+        self._opened_at: float = 0
+        self._probing: bool = False
+        self._probe_at: float = 0
+
+    def allow_request(self) -> bool:
+        """Answer True if request may be sent"""
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            if self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            logger.debug("Circuit half-open, probing inverter.")
+            self.state = CircuitState.HALF_OPEN
+            self._probing = False
+        # Let another probe through if the previous one did not report its outcome (e.g. it was cancelled)
+        if self._probing and self._clock() - self._probe_at < self.reset_timeout:
+            return False
+        self._probing = True
+        self._probe_at = self._clock()
+        return True
+
+    def record_success(self) -> None:
+        """Account successful request"""
+        if self.state != CircuitState.CLOSED:
+            logger.debug("Circuit closed.")
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Account failed request"""
+        self._failures += 1
+        self._probing = False
+        if self.state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                logger.debug("Circuit opened after %d failures.", self._failures)
+            self.state = CircuitState.OPEN
+            self._opened_at = self._clock()
@@ -0,0 +1,86 @@
+"""Multi-rate polling of inverter runtime data."""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from typing import Any, Callable, NamedTuple
+
+from .inverter import Inverter, Sensor, SensorKind
+
+logger = logging.getLogger(__name__)
+
+
+class SensorValue(NamedTuple):
+    """Last known sensor value and its age (seconds since it was read)"""
+    value: Any
+    age: float
+
+
+class PollingScheduler:
+    """
+    Polling scheduler refreshing each sensor at its own interval.
+
+    The refresh interval is looked up by sensor id first, then by its SensorKind,
+    falling back to default_interval. On each tick() only the sensors which are due
+    are requested (merged to as few block reads as the inverter allows),
+    other sensors are served from the last known values.
+    """
+
+    def __init__(self, inverter: Inverter, default_interval: float = 10,
+                 clock: Callable[[], float] = time.monotonic):
+        self.inverter: Inverter = inverter
+        self.default_interval: float = default_interval
+        self._intervals: dict[str | SensorKind, float] = {}
+        self._clock: Callable[[], float] = clock
+        self._values: dict[str, Any] = {}
+        self._read_at: dict[str, float] = {}
+
+    def set_interval(self, sensor: str | SensorKind, interval: float) -> None:
+        """Set refresh interval (in seconds) of sensor (by its id) or all sensors of given kind"""
+        self._intervals[sensor] = interval
+
+    def interval(self, sensor: Sensor) -> float:
+        """Answer refresh interval of the sensor"""
+        interval = self._intervals.get(sensor.id_)
+        if interval is None:
+            interval = self._intervals.get(sensor.kind, self.default_interval)
+        return interval
+
+    def due_sensors(self) -> list[str]:
+        """Answer ids of sensors whose values are older than their refresh interval"""
+        now = self._clock()
+        return [s.id_ for s in self.inverter.sensors()
+                if now - self._read_at.get(s.id_, -math.inf) >= self.interval(s)]
+
+    async def tick(self) -> dict[str, SensorValue]:
+        """
+        Refresh sensors which are due and answer all known sensor values with their age.
+        Values read within the same blocks as the due sensors are refreshed as well.
+        Due sensors missing in the answer (e.g. their block is not read anymore) are not requested
+        again until their interval elapses.
+        """
+        due = self.due_sensors()
+        if due:
+            logger.debug("Refreshing %d sensors.", len(due))
+            data = await self.inverter.read_runtime_data(due)
+            read_at = self._clock()
+            for sensor_id in due:
+                self._read_at[sensor_id] = read_at
+            for sensor_id, value in data.items():
+                self._values[sensor_id] = value
+                self._read_at[sensor_id] = read_at
+        return self.values()
+
+    def values(self) -> dict[str, SensorValue]:
+        """Answer all known sensor values with their age (without reading anything)"""
+        now = self._clock()
+        return {sensor_id: SensorValue(value, now - self._read_at[sensor_id])
+                for sensor_id, value in self._values.items()}
+
+    def invalidate(self, sensor_id: str | None = None) -> None:
+        """Force refresh of the sensor (or all sensors) on next tick"""
+        if sensor_id is None:
+            self._read_at.clear()
+        else:
+            self._read_at.pop(sensor_id, None)
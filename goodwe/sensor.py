@@ -884,6 +884,26 @@ class Calculated(Sensor):
         return self._getter(data)
 
 
+class Derived(Sensor):
+    """
+    Sensor representing value derived from values of other (input) sensors, possibly of other blocks.
+    The formula is called with the input values (in order of inputs) after the blocks are read,
+    derived sensors may use other derived sensors as inputs (see derived.py).
+    The optional array_formula calculates the values of whole batch of frames (see batch.py).
+    """
+
+    def __init__(self, id_: str, inputs: tuple[str, ...], formula: Callable[..., Any], name: str, unit: str,
+                 kind: Optional[SensorKind] = None, array_formula: Callable[..., Any] | None = None):
+        super().__init__(id_, -1, name, 0, unit, kind)
+        self.inputs: tuple[str, ...] = inputs
+        self.formula: Callable[..., Any] = formula
+        self.array_formula: Callable[..., Any] | None = array_formula
+
+    def read_value(self, data: ProtocolResponse) -> Any:
+        """Not read from registers, value is evaluated from values of inputs"""
+        return None
+
+
 class TimeOfDay(Sensor):
     """Sensor representing time in HH:MM format encoded in 2 bytes.
 
@@ -963,63 +983,54 @@ class MonthMask(Sensor):
         raise ValueError(f"MonthMask requires list of month names, got {type(value)}")
 
 
+def _read(buffer: ProtocolResponse, offset: int | None, size: int) -> bytes:
+    """Read size bytes at offset (not affecting the buffer position) or at current buffer position if offset is None"""
+    if offset is not None:
+        return buffer.read_at(offset, size)
+    return buffer.read(size)
+
+
 def read_byte(buffer: ProtocolResponse, offset: int = None) -> int:
     """Retrieve single byte (signed int) value from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    return int.from_bytes(buffer.read(1), byteorder="big", signed=True)
+    return int.from_bytes(_read(buffer, offset, 1), byteorder="big", signed=True)
 
 
 def read_bytes2(buffer: ProtocolResponse, offset: int = None, undef: int = None) -> int:
     """Retrieve 2 byte (unsigned int) value from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    value = int.from_bytes(buffer.read(2), byteorder="big", signed=False)
+    value = int.from_bytes(_read(buffer, offset, 2), byteorder="big", signed=False)
     return undef if value == 0xffff else value
 
 
 def read_bytes2_signed(buffer: ProtocolResponse, offset: int = None) -> int:
     """Retrieve 2 byte (signed int) value from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    return int.from_bytes(buffer.read(2), byteorder="big", signed=True)
+    return int.from_bytes(_read(buffer, offset, 2), byteorder="big", signed=True)
 
 
 def read_bytes4(buffer: ProtocolResponse, offset: int = None, undef: int = None) -> int:
     """Retrieve 4 byte (unsigned int) value from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    value = int.from_bytes(buffer.read(4), byteorder="big", signed=False)
+    value = int.from_bytes(_read(buffer, offset, 4), byteorder="big", signed=False)
     return undef if value == 0xffffffff else value
 
 
 def read_bytes4_signed(buffer: ProtocolResponse, offset: int = None) -> int:
     """Retrieve 4 byte (signed int) value from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    return int.from_bytes(buffer.read(4), byteorder="big", signed=True)
+    return int.from_bytes(_read(buffer, offset, 4), byteorder="big", signed=True)
 
 
 def read_bytes8(buffer: ProtocolResponse, offset: int = None, undef: int = None) -> int:
     """Retrieve 8 byte (unsigned int) value from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    value = int.from_bytes(buffer.read(8), byteorder="big", signed=False)
+    value = int.from_bytes(_read(buffer, offset, 8), byteorder="big", signed=False)
     return undef if value == 0xffffffffffffffff else value
 
 
 def read_decimal2(buffer: ProtocolResponse, scale: int, offset: int = None) -> float:
     """Retrieve 2 byte (signed float) value from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    return float(int.from_bytes(buffer.read(2), byteorder="big", signed=True)) / scale
+    return float(int.from_bytes(_read(buffer, offset, 2), byteorder="big", signed=True)) / scale
 
 
 def read_float4(buffer: ProtocolResponse, offset: int = None) -> float:
     """Retrieve 4 byte (signed float) value from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    data = buffer.read(4)
+    data = _read(buffer, offset, 4)
     if len(data) == 4:
         return unpack('>f', data)[0]
     return float(0)
@@ -1027,9 +1038,7 @@ def read_float4(buffer: ProtocolResponse, offset: int = None) -> float:
 
 def read_voltage(buffer: ProtocolResponse, offset: int = None) -> float:
     """Retrieve voltage [V] value (2 unsigned bytes) from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    value = int.from_bytes(buffer.read(2), byteorder="big", signed=False)
+    value = int.from_bytes(_read(buffer, offset, 2), byteorder="big", signed=False)
     return float(value) / 10 if value != 0xffff else 0
 
 
@@ -1040,17 +1049,13 @@ def encode_voltage(value: Any) -> bytes:
 
 def read_current(buffer: ProtocolResponse, offset: int = None) -> float:
     """Retrieve current [A] value (2 unsigned bytes) from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    value = int.from_bytes(buffer.read(2), byteorder="big", signed=False)
+    value = int.from_bytes(_read(buffer, offset, 2), byteorder="big", signed=False)
     return float(value) / 10 if value != 0xffff else 0
 
 
 def read_current_signed(buffer: ProtocolResponse, offset: int = None) -> float:
     """Retrieve current [A] value (2 signed bytes) from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    value = int.from_bytes(buffer.read(2), byteorder="big", signed=True)
+    value = int.from_bytes(_read(buffer, offset, 2), byteorder="big", signed=True)
     return float(value) / 10
 
 
@@ -1066,17 +1071,13 @@ def encode_current_signed(value: Any) -> bytes:
 
 def read_freq(buffer: ProtocolResponse, offset: int = None) -> float:
     """Retrieve frequency [Hz] value (2 bytes) from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    value = int.from_bytes(buffer.read(2), byteorder="big", signed=True)
+    value = int.from_bytes(_read(buffer, offset, 2), byteorder="big", signed=True)
     return float(value) / 100
 
 
 def read_temp(buffer: ProtocolResponse, offset: int = None) -> float | None:
     """Retrieve temperature [C] value (2 bytes) from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    value = int.from_bytes(buffer.read(2), byteorder="big", signed=True)
+    value = int.from_bytes(_read(buffer, offset, 2), byteorder="big", signed=True)
     if value == -1 or value == 32767:
         return None
     return float(value) / 10
@@ -1084,14 +1085,13 @@ def read_temp(buffer: ProtocolResponse, offset: int = None) -> float | None:
 
 def read_datetime(buffer: ProtocolResponse, offset: int = None) -> datetime:
     """Retrieve datetime value (6 bytes) from buffer"""
-    if offset is not None:
-        buffer.seek(offset)
-    year = 2000 + int.from_bytes(buffer.read(1), byteorder='big')
-    month = int.from_bytes(buffer.read(1), byteorder='big')
-    day = int.from_bytes(buffer.read(1), byteorder='big')
-    hour = int.from_bytes(buffer.read(1), byteorder='big')
-    minute = int.from_bytes(buffer.read(1), byteorder='big')
-    second = int.from_bytes(buffer.read(1), byteorder='big')
+    data = _read(buffer, offset, 6)
+    year = 2000 + int.from_bytes(data[0:1], byteorder='big')
+    month = int.from_bytes(data[1:2], byteorder='big')
+    day = int.from_bytes(data[2:3], byteorder='big')
+    hour = int.from_bytes(data[3:4], byteorder='big')
+    minute = int.from_bytes(data[4:5], byteorder='big')
+    second = int.from_bytes(data[5:6], byteorder='big')
     return datetime(year=year, month=month, day=day, hour=hour, minute=minute, second=second)
 
 
@@ -0,0 +1,58 @@
+"""Shadow copy of the inverter registers values."""
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+from .protocol import ModbusRtuReadCommand, ModbusRtuWriteCommand, ModbusRtuWriteMultiCommand, ModbusTcpReadCommand, \
+    ModbusTcpWriteCommand, ModbusTcpWriteMultiCommand, ProtocolCommand, ProtocolResponse
+
+
+class RegisterShadow:
+    """
+    Last known raw values of inverter (modbus) registers, as seen in responses of read requests
+    or written by write requests, together with the time they were seen.
+    Values older than max_age seconds are considered stale and are not answered.
+    """
+
+    def __init__(self, max_age: float = 60, clock: Callable[[], float] = time.monotonic):
+        self.max_age: float = max_age
+        self._clock: Callable[[], float] = clock
+        self._registers: dict[int, tuple[bytes, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._registers)
+
+    def update(self, offset: int, data: bytes) -> None:
+        """Store the raw values of registers starting at offset"""
+        now = self._clock()
+        for i in range(0, len(data) - 1, 2):
+            self._registers[offset + i // 2] = (bytes(data[i:i + 2]), now)
+
+    def record(self, command: ProtocolCommand, response: ProtocolResponse) -> None:
+        """Store the register values read or written by the (successfully executed) modbus command"""
+        if isinstance(command, (ModbusRtuReadCommand, ModbusTcpReadCommand)):
+            self.update(command.first_address, response.data[:command.value * 2])
+        elif isinstance(command, (ModbusRtuWriteMultiCommand, ModbusTcpWriteMultiCommand)):
+            self.update(command.first_address, command.values)
+        elif isinstance(command, (ModbusRtuWriteCommand, ModbusTcpWriteCommand)):
+            self.update(command.first_address, command.value.to_bytes(2, byteorder="big", signed=command.value < 0))
+
+    def get(self, offset: int, count: int = 1) -> bytes | None:
+        """Answer the raw values of count registers starting at offset, None if any of them is unknown or stale"""
+        oldest = self._clock() - self.max_age
+        result = bytearray()
+        for register in range(offset, offset + count):
+            entry = self._registers.get(register)
+            if entry is None or entry[1] < oldest:
+                return None
+            result.extend(entry[0])
+        return bytes(result)
+
+    def invalidate(self, offset: int | None = None, count: int = 1) -> None:
+        """Forget the values of count registers starting at offset (or all registers if offset is None)"""
+        if offset is None:
+            self._registers.clear()
+        else:
+            for register in range(offset, offset + count):
+                self._registers.pop(register, None)
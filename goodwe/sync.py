@@ -0,0 +1,133 @@
+"""Synchronous (blocking) facade of the inverter API."""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import threading
+from typing import Any, Awaitable, Callable
+
+from . import connect as async_connect, discover as async_discover
+from .capabilities import CapabilityCache
+from .const import GOODWE_UDP_PORT
+from .inverter import Inverter
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopThread:
+    """Dedicated asyncio event loop running forever in a background (daemon) thread"""
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self._thread: threading.Thread = threading.Thread(target=self._run, name="goodwe-event-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def is_running(self) -> bool:
+        return self._thread.is_alive() and not self._loop.is_closed()
+
+    def run(self, coroutine: Awaitable, timeout: float | None = None) -> Any:
+        """Execute the coroutine in the background loop, wait for and answer its result"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Synchronous call from within the background event loop would deadlock.")
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def stop(self) -> None:
+        """Stop the loop and wait for the thread to finish"""
+        if self.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+
+_default_loop_thread: EventLoopThread | None = None
+_default_loop_lock = threading.Lock()
+
+
+def _loop_thread() -> EventLoopThread:
+    global _default_loop_thread
+    with _default_loop_lock:
+        if _default_loop_thread is None or not _default_loop_thread.is_running():
+            logger.debug("Starting background event loop thread.")
+            _default_loop_thread = EventLoopThread()
+        return _default_loop_thread
+
+
+def shutdown() -> None:
+    """Stop the shared background event loop thread (it is started again on next connect)"""
+    global _default_loop_thread
+    with _default_loop_lock:
+        if _default_loop_thread is not None:
+            _default_loop_thread.stop()
+            _default_loop_thread = None
+
+
+class SyncInverter:
+    """
+    Blocking wrapper of Inverter instance.
+
+    All the inverter's coroutine methods (read_runtime_data(), read_setting(), ...) are exposed
+    as plain blocking methods executed in the long-lived background event loop, so connections
+    (with keep-alive) and locks are reused across calls. Other attributes are delegated as they are.
+    The instance may be used from several threads, the calls are serialized by the inverter's protocol lock.
+    """
+
+    def __init__(self, inverter: Inverter, loop_thread: EventLoopThread):
+        self.inverter: Inverter = inverter
+        self._loop_thread: EventLoopThread = loop_thread
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.inverter, name)
+        if inspect.iscoroutinefunction(attr):
+            return self._blocking(attr)
+        return attr
+
+    def _blocking(self, method: Callable[..., Awaitable]) -> Callable[..., Any]:
+        def call(*args, **kwargs):
+            return self._loop_thread.run(method(*args, **kwargs))
+
+        call.__name__ = method.__name__
+        call.__doc__ = method.__doc__
+        return call
+
+    def close(self) -> None:
+        """Close the inverter connection (the background loop keeps running)"""
+        self._loop_thread.run(self.inverter._protocol.close())
+
+    def __enter__(self) -> SyncInverter:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def connect(host: str, port: int = GOODWE_UDP_PORT, family: str = None, comm_addr: int = 0, timeout: int = 1,
+            retries: int = 3, do_discover: bool = True, keep_alive: bool = True,
+            capability_cache: CapabilityCache | None = None) -> SyncInverter:
+    """Blocking variant of goodwe.connect(), answer SyncInverter instance.
+
+    The connection is kept alive between calls by default, since it is owned by the long-lived background loop.
+
+    Raise InverterError if unable to contact or recognise supported inverter.
+    """
+    loop_thread = _loop_thread()
+    inverter = loop_thread.run(async_connect(host, port, family, comm_addr, timeout, retries, do_discover,
+                                             capability_cache))
+    inverter.set_keep_alive(keep_alive)
+    return SyncInverter(inverter, loop_thread)
+
+
+def discover(host: str, port: int = GOODWE_UDP_PORT, timeout: int = 1, retries: int = 3,
+             keep_alive: bool = True, capability_cache: CapabilityCache | None = None) -> SyncInverter:
+    """Blocking variant of goodwe.discover(), answer SyncInverter instance.
+
+    Raise InverterError if unable to contact or recognise supported inverter.
+    """
+    loop_thread = _loop_thread()
+    inverter = loop_thread.run(async_discover(host, port, timeout, retries, capability_cache))
+    inverter.set_keep_alive(keep_alive)
+    return SyncInverter(inverter, loop_thread)
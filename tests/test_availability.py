@@ -0,0 +1,64 @@
+import asyncio
+from unittest import TestCase
+
+from goodwe.availability import RegisterAvailability
+from goodwe.et import ET
+from goodwe.exceptions import RequestRejectedException
+from goodwe.modbus import ILLEGAL_DATA_ADDRESS
+from goodwe.planner import plan_reads
+from goodwe.sensor import Integer
+
+
+class TestRegisterAvailability(TestCase):
+
+    def setUp(self) -> None:
+        self.now = 0
+        self.availability = RegisterAvailability(ttl=60, clock=lambda: self.now)
+
+    def test_record_rejected(self):
+        self.assertTrue(self.availability.is_available(100, 2))
+        self.availability.record_rejected(100, 2)
+        self.assertFalse(self.availability.is_available(100))
+        self.assertFalse(self.availability.is_available(99, 2))
+        self.assertTrue(self.availability.is_available(102))
+        self.assertIn(101, self.availability)
+        self.assertNotIn(102, self.availability)
+        self.availability.record_rejected(100, 2)
+        self.assertEqual([{"offset": 100, "count": 2, "hits": 4, "age": 0}], self.availability.snapshot())
+
+    def test_ttl(self):
+        self.availability.record_rejected(100)
+        self.now = 59
+        self.assertFalse(self.availability.is_available(100))
+        self.now = 60
+        self.assertTrue(self.availability.is_available(100))
+        self.assertEqual(0, len(self.availability))
+
+    def test_plan_reads_exclude(self):
+        sensors = (Integer("a", 100, "A"), Integer("b", 101, "B"), Integer("c", 102, "C"))
+        self.availability.record_rejected(101)
+        blocks = plan_reads(sensors, exclude=self.availability)
+        self.assertEqual([(100, 1), (102, 1)], [(b.offset, b.count) for b in blocks])
+
+    def test_read_sensors_skips_unavailable(self):
+        inverter = ET("localhost", 8899)
+        inverter.set_register_availability(self.availability)
+        requests = []
+
+        async def read_from_socket(command):
+            requests.append(command)
+            raise RequestRejectedException(ILLEGAL_DATA_ADDRESS)
+
+        inverter._read_from_socket = read_from_socket
+        setting = inverter._settings['grid_export_limit']
+        self.availability.record_rejected(setting.offset)
+        loop = asyncio.new_event_loop()
+        try:
+            for _ in range(2):
+                data = loop.run_until_complete(inverter._read_sensors((setting,), inverter._read_setting_or_none))
+                self.assertEqual({'grid_export_limit': None}, data)
+        finally:
+            loop.close()
+        self.assertEqual([], requests)
+        # recorded once and each of the 2 reads avoided counted once
+        self.assertEqual(3, self.availability.snapshot()[0]["hits"])
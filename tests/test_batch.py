@@ -0,0 +1,94 @@
+import os
+from unittest import TestCase, skipUnless
+
+from goodwe.decoder import SensorDecoder
+from goodwe.derived import evaluate, evaluation_order
+from goodwe.et import ET
+from goodwe.protocol import ModbusRtuReadCommand, ProtocolResponse
+from goodwe.sensor import Derived, Energy4W, Energy8, Float, Integer, Power, Voltage
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from goodwe.batch import FrameBatch, decode_frames
+
+
+@skipUnless(numpy is not None, "numpy not installed")
+class TestFrameBatch(TestCase):
+
+    def setUp(self) -> None:
+        self.command = ModbusRtuReadCommand(0xf7, 0x891c, 0x007d)
+        root_dir = os.path.dirname(os.path.abspath(__file__))
+        with open(root_dir + '/sample/et/GW10K-ET_running_data.hex', 'r') as f:
+            frame = f.read().strip()
+        # second frame with all registers undefined
+        self.frames = [frame, frame[:10] + 'ff' * 250 + frame[-4:]]
+        self.sensors = ET("localhost", 8899)._sensors
+
+    @staticmethod
+    def _values(column):
+        if numpy.ma.isMaskedArray(column):
+            return [None if masked else value
+                    for value, masked in zip(column.data.tolist(), numpy.ma.getmaskarray(column))]
+        return column.tolist()
+
+    def _assert_value(self, expected, actual):
+        if actual is numpy.ma.masked:
+            actual = None
+        elif isinstance(actual, numpy.generic):
+            actual = actual.item()
+        if isinstance(expected, float) and isinstance(actual, float) and expected != expected:
+            self.assertNotEqual(actual, actual)
+        else:
+            self.assertEqual(expected, actual)
+
+    def _assert_identical_to_decoder(self, frames, command, sensors):
+        batch = FrameBatch.from_hex(frames, command)
+        self.assertEqual(len(frames), len(batch))
+        columns = batch.decode(sensors)
+        for index, frame in enumerate(frames):
+            expected = SensorDecoder(sensors).decode(ProtocolResponse(bytes.fromhex(frame), command))
+            evaluate(evaluation_order(s for s in sensors if isinstance(s, Derived)), expected)
+            for sensor in sensors:
+                with self.subTest(frame=index, sensor=sensor.id_):
+                    self._assert_value(expected[sensor.id_], columns[sensor.id_][index])
+
+    def test_identical_to_decoder(self):
+        self._assert_identical_to_decoder(self.frames, self.command, self.sensors)
+
+    def test_identical_to_decoder_meter(self):
+        root_dir = os.path.dirname(os.path.abspath(__file__))
+        with open(root_dir + '/sample/et/GW25K-ET_meter_data.hex', 'r') as f:
+            frame = f.read().strip()
+        command = ModbusRtuReadCommand(0xf7, 0x8ca0, 0x3a)
+        sensors = ET("localhost", 8899)._sensors_meter
+        self.assertTrue(any(isinstance(s, Float) for s in sensors))
+        self._assert_identical_to_decoder([frame, frame[:10] + 'ff' * 116 + frame[-4:]], command, sensors)
+
+    def test_identical_to_decoder_wide_energy(self):
+        command = ModbusRtuReadCommand(0xf7, 0, 8)
+        sensors = (Energy4W("e4w", 0, "E4W", None), Energy8("e8", 2, "E8", None),
+                   Float("f", 6, 1000, "F", "kWh", None))
+        frames = ['aa55f70310' + data + '0000' for data in
+                  ('0001e24101234567890abcde4145e9ba', 'ffffffffffffffffffffffff3f9d70a4', '00000000' * 4)]
+        self._assert_identical_to_decoder(frames, command, sensors)
+
+    def test_derived(self):
+        batch = FrameBatch.from_hex(self.frames, self.command)
+        columns = batch.decode(self.sensors)
+        self.assertEqual([3456, 0], columns['ppv'].tolist())
+        self.assertEqual('int64', columns['house_consumption'].dtype.name)
+        columns = batch.decode((Power("p", 0x891c, "P", None), Power("q", 0x891d, "Q", None),
+                                Derived("sum", ("p", "q"), lambda p, q: (p or 0) + (q or 0), "Sum", "W")))
+        self.assertEqual([0x1508 + 0x160b, 0], columns['sum'].tolist())
+
+    def test_decode_frames(self):
+        data = numpy.array([[0x09, 0x29, 0xff, 0xff], [0x00, 0x64, 0x00, 0x0a]], dtype=numpy.uint8)
+        columns = decode_frames(data, (Voltage("v", 0, "V", None), Power("p", 2, "P", None),
+                                       Integer("i", 2, "I")))
+        self.assertEqual([234.5, 10.0], columns['v'].tolist())
+        self.assertEqual([None, 10], self._values(columns['p']))
+        self.assertEqual([0, 10], columns['i'].tolist())
@@ -0,0 +1,34 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from goodwe.capabilities import CapabilityCache
+
+
+class TestCapabilityCache(TestCase):
+
+    def test_get_put(self):
+        cache = CapabilityCache()
+        self.assertIsNone(cache.get("SN1", "fw1"))
+        cache.put("SN1", "fw1", {"mppt": True})
+        self.assertEqual({"mppt": True}, cache.get("SN1", "fw1"))
+        self.assertIsNone(cache.get("SN1", "fw2"))
+        self.assertIsNone(cache.get("SN2", "fw1"))
+        cache.remove("SN1")
+        self.assertIsNone(cache.get("SN1", "fw1"))
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "capabilities.json")
+            CapabilityCache(path).put("SN1", "fw1", {"meter_extended": False})
+            self.assertEqual({"meter_extended": False}, CapabilityCache(path).get("SN1", "fw1"))
+
+    def test_corrupted_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "capabilities.json")
+            with open(path, "w") as file:
+                file.write("{not json")
+            cache = CapabilityCache(path)
+            self.assertIsNone(cache.get("SN1", "fw1"))
+            cache.put("SN1", "fw1", {})
+            self.assertEqual({}, CapabilityCache(path).get("SN1", "fw1"))
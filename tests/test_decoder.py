@@ -0,0 +1,91 @@
+import random
+from unittest import TestCase
+
+from goodwe.decoder import SensorDecoder, decoder_for
+from goodwe.dt import DT
+from goodwe.es import ES
+from goodwe.et import ET
+from goodwe.hca import HCA
+from goodwe.inverter import Sensor
+from goodwe.protocol import ModbusRtuReadCommand, ProtocolResponse
+from goodwe.sensor import ByteH, ByteL, Decimal, Derived, Enum, Integer, Long, Temp, Voltage
+
+
+def _sensor_tables():
+    for cls in (ET, DT, ES, HCA):
+        inverter = cls("localhost", 8899)
+        for name, value in list(vars(cls).items()) + list(vars(inverter).items()):
+            if isinstance(value, tuple) and value and all(isinstance(s, Sensor) for s in value):
+                yield f"{cls.__name__}.{name}", value
+
+
+def _read_one_by_one(sensors, response):
+    result = {}
+    for sensor in sensors:
+        if isinstance(sensor, Derived):
+            continue
+        try:
+            result[sensor.id_] = sensor.read(response)
+        except ValueError:
+            result[sensor.id_] = None
+    return result
+
+
+def _decode_both(sensors, response):
+    try:
+        expected = _read_one_by_one(sensors, response)
+    except Exception as ex:
+        expected = type(ex)
+    try:
+        decoded = SensorDecoder(sensors).decode(response)
+    except Exception as ex:
+        decoded = type(ex)
+    # compared as repr, so NaN (e.g. float of ffffffff) equals to NaN
+    return repr(expected), repr(decoded)
+
+
+def _modbus_response(first_address: int, data: bytes) -> ProtocolResponse:
+    command = ModbusRtuReadCommand(0xf7, first_address, len(data) // 2)
+    return ProtocolResponse(bytes.fromhex('aa55f703') + bytes([len(data) & 0xff]) + data + b'\x00\x00', command)
+
+
+class TestSensorDecoder(TestCase):
+
+    def test_identical_to_read_value(self):
+        rnd = random.Random(42)
+        for name, sensors in _sensor_tables():
+            offsets = [s.offset for s in sensors if s.offset >= 0 and s.size_ > 0]
+            if not offsets:
+                continue
+            first, last = min(offsets), max(offsets)
+            for pattern in ('random', 'ff', '00'):
+                if pattern == 'random':
+                    data = bytes(rnd.getrandbits(8) for _ in range((last - first) * 2 + 16))
+                else:
+                    data = bytes.fromhex(pattern) * ((last - first) * 2 + 16)
+                with self.subTest(table=name, pattern=pattern, layout='modbus'):
+                    self.assertEqual(*_decode_both(sensors, _modbus_response(first, data)))
+                with self.subTest(table=name, pattern=pattern, layout='bytes'):
+                    self.assertEqual(*_decode_both(sensors, ProtocolResponse(data[:last + 8], None)))
+
+    def test_decode(self):
+        sensors = (Voltage("v", 0, "V", None), ByteH("h", 1, "H"), ByteL("l", 1, "L"), Integer("i", 1, "I"),
+                   Temp("t", 2, "T"), Decimal("d", 3, 100, "D"), Long("x", 4, "X"))
+        response = _modbus_response(0, bytes.fromhex("0929f00c7fff03e8ffffffff"))
+        self.assertEqual({"v": 234.5, "h": -16, "l": 12, "i": 61452, "t": None, "d": 10.0, "x": 0},
+                         SensorDecoder(sensors).decode(response))
+
+    def test_custom_sensor(self):
+        sensors = (Integer("i", 0, "I"), Enum("e", 2, {1: "One"}, "E"))
+        response = ProtocolResponse(bytes.fromhex("000701"), None)
+        self.assertEqual({"i": 7, "e": "One"}, SensorDecoder(sensors).decode(response))
+
+    def test_short_data(self):
+        sensors = (Integer("i", 0, "I"), Long("l", 2, "L"))
+        response = ProtocolResponse(bytes.fromhex("000700"), None)
+        self.assertEqual(_read_one_by_one(sensors, response), SensorDecoder(sensors).decode(response))
+
+    def test_decoder_for(self):
+        sensors = (Integer("i", 0, "I"),)
+        self.assertIs(decoder_for(sensors), decoder_for(sensors))
+        self.assertIsNot(decoder_for(sensors), decoder_for((Integer("i", 0, "I"),)))
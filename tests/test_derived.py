@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+from goodwe.derived import evaluate, evaluation_order, required_ids
+from goodwe.sensor import Derived
+
+
+class TestDerived(TestCase):
+
+    def setUp(self) -> None:
+        self.total = Derived("total", ("ab", "c"), lambda ab, c: ab + (c or 0), "Total", "W")
+        self.ab = Derived("ab", ("a", "b"), lambda a, b: a + b, "A+B", "W")
+
+    def test_evaluation_order(self):
+        self.assertEqual((self.ab, self.total), evaluation_order((self.total, self.ab)))
+        cycle = Derived("ab", ("total",), lambda total: total, "A+B", "W")
+        self.assertRaises(ValueError, evaluation_order, (self.total, cycle))
+
+    def test_required_ids(self):
+        self.assertEqual({"total", "ab", "a", "b", "c"}, required_ids((self.ab, self.total), ["total"]))
+        self.assertEqual({"a"}, required_ids((self.ab, self.total), ["a"]))
+
+    def test_evaluate(self):
+        sensors = evaluation_order((self.total, self.ab))
+        self.assertEqual({"a": 1, "b": 2, "c": 3, "ab": 3, "total": 6}, evaluate(sensors, {"a": 1, "b": 2, "c": 3}))
+        # block with c not read
+        self.assertEqual({"a": 1, "b": 2, "ab": 3}, evaluate(sensors, {"a": 1, "b": 2}))
+        # c not present on the inverter
+        self.assertEqual({"a": 1, "b": 2, "ab": 3, "total": 3},
+                         evaluate(sensors, {"a": 1, "b": 2}, {"a", "b", "ab", "total"}))
+        self.assertEqual({"a": 1, "b": None, "ab": None}, evaluate(sensors, {"a": 1, "b": None}))
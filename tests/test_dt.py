@@ -124,6 +124,15 @@ class GW6000_DT_Test(DtMock):
         self.loop.run_until_complete(self.read_setting('shadow_scan_pv1'))
         self.assertEqual('7f039d8600014051', self.request.hex())
 
+    def test_GW6000_DT_read_settings_data_unsupported(self):
+        async def read_from_socket(command):
+            raise RequestRejectedException(ILLEGAL_DATA_ADDRESS)
+
+        self._read_from_socket = read_from_socket
+        data = self.loop.run_until_complete(self.read_settings_data())
+        self.assertEqual({s.id_: None for s in self.settings()}, data)
+        self.assertEqual(len(self.settings()), len(self.unavailable_registers()))
+
     def test_GW6000_DT_write_setting(self):
         self.loop.run_until_complete(self.write_setting('shadow_scan_pv1', 1))
         self.assertEqual('7f069d8600018c51', self.request.hex())
@@ -1,13 +1,16 @@
 import asyncio
 import os
 from datetime import datetime
-from unittest import TestCase
+from unittest import IsolatedAsyncioTestCase, TestCase
 
+from goodwe.capabilities import CapabilityCache
 from goodwe.et import ET
 from goodwe.exceptions import RequestRejectedException, RequestFailedException
 from goodwe.inverter import OperationMode
+from goodwe.lazy import LazyRuntimeData
 from goodwe.modbus import ILLEGAL_DATA_ADDRESS
 from goodwe.protocol import ModbusRtuReadCommand, ProtocolCommand, ProtocolResponse
+from goodwe.sensor import ByteH, ByteL, Integer
 
 
 class EtMock(TestCase, ET):
@@ -278,6 +281,97 @@ class GW10K_ET_Test(EtMock):
         self.loop.run_until_complete(self.read_setting('modbus_47000'))
         self.assertEqual('f703b798000136c7', self.request.hex())
 
+    def test_GW10K_ET_selective_runtime_data(self):
+        self.loop.run_until_complete(self.read_device_info())
+        self._list_of_requests.clear()
+        # any read of other than battery block would fail
+        self.mock_response(self._READ_RUNNING_DATA, 'NO RESPONSE')
+        self.mock_response(self._READ_METER_DATA, 'NO RESPONSE')
+        data = self.loop.run_until_complete(self.read_runtime_data(['battery_soc', 'battery_temperature']))
+        self.assertEqual(68, data.get('battery_soc'))
+        self.assertNotIn('ppv', data)
+        self.assertTrue(self._has_battery)
+        self.assertEqual([], self._list_of_requests)
+
+    def test_GW10K_ET_tou_data(self):
+        self.mock_response(self._READ_TOU_DATA, 'GW10K-ET_tou_data.hex')
+        self.loop.run_until_complete(self.read_device_info())
+        data = self.loop.run_until_complete(self.read_runtime_data())
+        self.assertEqual('01:30', data.get('tou_slot1_start_time'))
+        self.assertEqual('06:00', data.get('tou_slot1_end_time'))
+        self.assertEqual('ECO Mode: Sun,Mon,Tue,Wed,Thu,Fri,Sat', data.get('tou_slot1_work_week'))
+        self.assertEqual(90, data.get('tou_slot1_param2'))
+        self.assertEqual('All year', data.get('tou_slot1_months'))
+        self.assertEqual('23:59', data.get('tou_slot8_end_time'))
+
+        # TOU slots are not read again until refresh interval elapses
+        self.mock_response(self._READ_TOU_DATA, 'NO RESPONSE')
+        data = self.loop.run_until_complete(self.read_runtime_data())
+        self.assertEqual('01:30', data.get('tou_slot1_start_time'))
+        self.assertRaises(RequestFailedException, self.loop.run_until_complete,
+                          self.read_runtime_data(['tou_slot1_start_time']))
+
+    def test_GW10K_ET_tou_data_slots_1_4(self):
+        self.mock_response(self._READ_TOU_DATA, ILLEGAL_DATA_ADDRESS)
+        self.mock_response(self._READ_TOU_DATA_SLOTS_1_4, 'GW10K-ET_tou_data_slots_1_4.hex')
+        self.loop.run_until_complete(self.read_device_info())
+        data = self.loop.run_until_complete(self.read_runtime_data(['tou_slot1_start_time']))
+        self.assertEqual('01:30', data.get('tou_slot1_start_time'))
+        self.assertNotIn('tou_slot5_start_time', data)
+        self.assertNotIn('tou_slot5_start_time', [s.id_ for s in self.sensors()])
+
+    def test_GW10K_ET_slave_tou_slot8_params(self):
+        self.mock_response(self._read_command(10400, 1), ILLEGAL_DATA_ADDRESS)
+        self.loop.run_until_complete(self.read_device_info())
+        self.assertEqual("slave_in_parallel", self._parallel_topology)
+        self.assertEqual(['tou_slot8_param1', 'tou_slot8_param2'],
+                         [s.id_ for s in self.sensors() if s.id_.startswith('tou_')])
+        self._list_of_requests.clear()
+        data = self.loop.run_until_complete(self.read_runtime_data())
+        self.assertEqual(0x0203, data['tou_slot8_param1'])
+        self.assertEqual(0x0405, data['tou_slot8_param2'])
+        self.assertNotIn('tou_slot1_start_time', data)
+        self.assertIn(self._READ_TOU_SLOT8_PARAMS.request, self._list_of_requests)
+
+    def test_GW10K_ET_tou_variant_renegotiated(self):
+        self.mock_response(self._READ_TOU_DATA, 'GW10K-ET_tou_data.hex')
+        self.loop.run_until_complete(self.read_device_info())
+        self.set_lazy_decoding(True)
+        self.loop.run_until_complete(self.read_runtime_data())
+        self.assertIsNotNone(self._get_sensor('tou_slot5_start_time'))
+
+        # wider variant is not supported anymore (e.g. when retried after firmware change)
+        self.mock_response(self._READ_TOU_DATA, ILLEGAL_DATA_ADDRESS)
+        self.mock_response(self._READ_TOU_DATA_SLOTS_1_4, 'GW10K-ET_tou_data_slots_1_4.hex')
+        self._tou_block.select(0)
+        data = self.loop.run_until_complete(self.read_runtime_data(['tou_slot1_start_time']))
+        self.assertEqual('01:30', data['tou_slot1_start_time'])
+        self.assertNotIn('tou_slot5_start_time', data)
+        self.assertIsNone(self._get_sensor('tou_slot5_start_time'))
+        self.assertIsNotNone(self._get_sensor('tou_slot4_start_time'))
+
+        self._apply_capabilities({'tou_variant': 0})
+        self.assertIsNotNone(self._get_sensor('tou_slot5_start_time'))
+
+    def test_GW10K_ET_capability_cache(self):
+        cache = CapabilityCache()
+        self.set_capability_cache(cache)
+        self.loop.run_until_complete(self.read_device_info())
+        self.assertNotEqual([], self._list_of_requests)
+        self.assertEqual(self.capabilities(), cache.get(self.serial_number, self._firmware_id()))
+
+        self._list_of_requests.clear()
+        self.loop.run_until_complete(self.read_device_info())
+        self.assertEqual([], self._list_of_requests)
+
+        self.assertIsNone(cache.get(self.serial_number, 'other firmware'))
+
+    def test_GW10K_ET_read_settings_data(self):
+        self.loop.run_until_complete(self.read_device_info())
+        data = self.loop.run_until_complete(self.read_settings_data())
+        self.assertEqual([s.id_ for s in self.settings()], list(data.keys()))
+        self.assertLess(len(self._list_of_requests), len(self.settings()) / 4)
+
     def test_GW10K_ET_write_setting(self):
         self.loop.run_until_complete(self.write_setting('grid_export_limit', 100))
         self.assertEqual('f706b996006459c7', self.request.hex())
@@ -292,6 +386,15 @@ class GW10K_ET_Test(EtMock):
         self.loop.run_until_complete(self.get_grid_export_limit())
         self.assertEqual('f703b996000155ec', self.request.hex())
 
+    def test_unavailable_setting(self):
+        self.mock_response(self._read_command(47510, 1), ILLEGAL_DATA_ADDRESS)
+        self.assertRaises(ValueError, self.loop.run_until_complete, self.read_setting('grid_export_limit'))
+        # Known unavailable register is not queried again
+        self.mock_response(self._read_command(47510, 1), 'NO RESPONSE')
+        self.assertRaises(ValueError, self.loop.run_until_complete, self.read_setting('grid_export_limit'))
+        self.assertEqual([{"offset": 47510, "count": 1, "hits": 2}],
+                         [{k: v for k, v in r.items() if k != "age"} for r in self.unavailable_registers()])
+
     def test_set_grid_export_limit(self):
         self.loop.run_until_complete(self.set_grid_export_limit(100))
         self.assertEqual('f706b996006459c7', self.request.hex())
@@ -315,15 +418,70 @@ class GW10K_ET_Test(EtMock):
     def test_set_operation_mode_ECO_CHARGE(self):
         self.loop.run_until_complete(self.read_device_info())
         self.loop.run_until_complete(self.set_operation_mode(OperationMode.ECO_CHARGE, eco_mode_power=40))
-        self.assertEqual('f710b99b0004080000173bffd8ff7f1343', self._list_of_requests[-9].hex())
+        self.assertEqual('f710b99b0004080000173bffd8ff7f1343', self._list_of_requests[-6].hex())
         self.loop.run_until_complete(
             self.set_operation_mode(OperationMode.ECO_CHARGE, eco_mode_power=40, eco_mode_soc=80))
-        self.assertEqual('f710b99b0004080000173bffd8ff7f1343', self._list_of_requests[-9].hex())
+        self.assertEqual('f710b99b0004080000173bffd8ff7f1343', self._list_of_requests[-6].hex())
 
     def test_set_operation_mode_DISCHARGE(self):
         self.loop.run_until_complete(self.read_device_info())
         self.loop.run_until_complete(self.set_operation_mode(OperationMode.ECO_DISCHARGE, eco_mode_power=50))
-        self.assertEqual('f710b99b0004080000173b0032ff7f02a3', self._list_of_requests[-9].hex())
+        self.assertEqual('f710b99b0004080000173b0032ff7f02a3', self._list_of_requests[-6].hex())
+
+    def test_register_shadow(self):
+        self.set_register_shadow(60)
+        self._shadow.update(47522, bytes.fromhex('0102'))
+        self._shadow.update(47510, bytes.fromhex('0064'))
+        self._list_of_requests.clear()
+        self.loop.run_until_complete(self.write_setting('eco_mode_2_switch', 0))
+        self.assertEqual(['f706b9a200029823'], [r.hex() for r in self._list_of_requests])
+        self.assertEqual(100, self.loop.run_until_complete(self.read_setting('grid_export_limit')))
+        self.assertEqual(1, len(self._list_of_requests))
+
+    def test_single_flight_runtime_data(self):
+        requests = []
+        read_from_socket = self._read_from_socket
+
+        async def counting_read(command):
+            requests.append(command)
+            return await read_from_socket(command)
+
+        async def concurrent_reads():
+            return await asyncio.gather(self.read_runtime_data(), self.read_runtime_data())
+
+        self._read_from_socket = counting_read
+        self.loop.run_until_complete(self.read_runtime_data())  # initial read includes TOU slots
+        requests.clear()
+        self.loop.run_until_complete(self.read_runtime_data())
+        single_read_count = len(requests)
+        requests.clear()
+        first, second = self.loop.run_until_complete(concurrent_reads())
+        self.assertEqual(single_read_count, len(requests))
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+
+        self.set_freshness_window(60)
+        self.loop.run_until_complete(self.read_runtime_data())
+        requests.clear()
+        self.loop.run_until_complete(self.read_runtime_data())
+        self.assertEqual([], requests)
+        self.loop.run_until_complete(self.read_runtime_data(['vgrid']))
+        self.assertNotEqual([], requests)
+
+    def test_lazy_runtime_data(self):
+        eager = self.loop.run_until_complete(self.read_runtime_data())
+        self.set_lazy_decoding(True)
+        data = self.loop.run_until_complete(self.read_runtime_data())
+        self.assertIsInstance(data, LazyRuntimeData)
+        self.assertFalse(data.is_decoded('vpv1'))
+        self.assertFalse(data.is_decoded('ppv'))
+        self.assertEqual(eager['ppv'], data['ppv'])
+        self.assertTrue(data.is_decoded('ppv1'))
+        self.assertFalse(data.is_decoded('vgrid'))
+        self.assertEqual(list(eager), list(data))
+        self.assertEqual(eager, dict(data))
+        self.set_lazy_decoding(False)
+        self.assertEqual(eager, self.loop.run_until_complete(self.read_runtime_data()))
 
     def test_get_ongrid_battery_dod(self):
         self.loop.run_until_complete(self.get_ongrid_battery_dod())
@@ -367,16 +525,16 @@ class GW10K_ET_fw819_Test(EtMock):
         self.loop.run_until_complete(
             self.set_operation_mode(OperationMode.ECO_CHARGE, eco_mode_power=40, eco_mode_soc=80))
         # Note: eco_mode_1 register is 47515 (0xB99B), not 0xB9BB (which is TOU slot 1 start time at 47547)
-        self.assertEqual('f710b99b0004080000173bffd8ff7f1343', self._list_of_requests[-9].hex())
+        self.assertEqual('f710b99b0004080000173bffd8ff7f1343', self._list_of_requests[-6].hex())
         self.loop.run_until_complete(
             self.set_operation_mode(OperationMode.ECO_CHARGE, eco_mode_power=40))
         # Second call has SoC=100 (0x64) instead of 80 (0xD8)
-        self.assertEqual('f710b99b0004080000173bffd8ff7f1343', self._list_of_requests[-9].hex())
+        self.assertEqual('f710b99b0004080000173bffd8ff7f1343', self._list_of_requests[-6].hex())
 
     def test_set_operation_mode_ECO_DISCHARGE(self):
         self.loop.run_until_complete(self.set_operation_mode(OperationMode.ECO_DISCHARGE, eco_mode_power=50))
         # Note: eco_mode_1 register is 47515 (0xB99B)
-        self.assertEqual('f710b99b0004080000173b0032ff7f02a3', self._list_of_requests[-9].hex())
+        self.assertEqual('f710b99b0004080000173b0032ff7f02a3', self._list_of_requests[-6].hex())
 
 
 class GW10K_ET_fw1023_Test(EtMock):
@@ -387,6 +545,78 @@ class GW10K_ET_fw1023_Test(EtMock):
         self.mock_response(self._READ_RUNNING_DATA, 'GW10K-ET_running_data_fw1023.hex')
         asyncio.get_event_loop().run_until_complete(self.read_device_info())
 
+    def test_write_settings(self):
+        self._list_of_requests.clear()
+        results = self.loop.run_until_complete(self.write_settings({'tou_slot1_start_time': '01:30',
+                                                                    'tou_slot1_end_time': '06:00',
+                                                                    'tou_slot1_param1': 50,
+                                                                    'tou_slot1_param2': 90,
+                                                                    'unknown': 1}))
+        self.assertEqual(['tou_slot1_start_time', 'tou_slot1_end_time', 'tou_slot1_param1', 'tou_slot1_param2'],
+                         [k for k, v in results.items() if v is None])
+        self.assertIsInstance(results['unknown'], ValueError)
+        self.assertEqual(['f710b9bb000204011e0600992e', 'f710b9be0002040032005a1abf'],
+                         [r.hex() for r in self._list_of_requests])
+
+    def test_write_settings_bytes(self):
+        self._list_of_requests.clear()
+        settings = {'h': ByteH('h', 100, 'H'), 'l': ByteL('l', 100, 'L'), 's': ByteH('s', 104, 'S')}
+        results = self.loop.run_until_complete(self._write_settings_batch({'h': 1, 'l': 2, 's': 3}, settings))
+        self.assertEqual({'h': None, 'l': None, 's': None}, results)
+        # ByteH/ByteL of the same register are merged, the lone ByteH is read-modified-written
+        self.assertEqual(['f703006800011140', 'f706006401025cd2', 'f706006803035c71'],
+                         [r.hex() for r in self._list_of_requests])
+
+    def test_encode_settings(self):
+        settings = {'h': ByteH('h', 100, 'H'), 'l': ByteL('l', 100, 'L')}
+        result = {}
+        encoded, coverage = self._encode_settings({'h': 1, 'l': 2, 'modbus-200': -1, 'unknown': 1}, settings, result)
+        self.assertEqual([('h', None), ('l', None), ('modbus-200', bytes.fromhex('ffff'))],
+                         [(setting.id_, raw_value) for setting, _, raw_value in encoded])
+        # ByteH and ByteL cover together whole register
+        self.assertEqual({100: {0, 1}, 200: {0, 1}}, coverage)
+        self.assertEqual(['unknown'], list(result))
+        self.assertIsInstance(result['unknown'], ValueError)
+
+    def test_partner_registers(self):
+        self._list_of_requests.clear()
+        self.set_register_shadow(60)
+        self._shadow.update(100, bytes.fromhex('0102'))
+        encoded = [(ByteH('h', 100, 'H'), 1, None), (ByteH('s', 104, 'S'), 3, None)]
+        result = {}
+        registers = self.loop.run_until_complete(
+            self._partner_registers({100: {0}, 104: {0}, 105: {0, 1}}, encoded, result))
+        # shadowed register is not read, fully covered register is not read at all
+        self.assertEqual({100: bytes.fromhex('0102'), 104: bytes.fromhex('0203')}, registers)
+        self.assertEqual(['f703006800011140'], [r.hex() for r in self._list_of_requests])
+        self.assertEqual({}, result)
+
+        self.mock_response(self._read_command(104, 1), 'NO RESPONSE')
+        registers = self.loop.run_until_complete(self._partner_registers({104: {0}}, encoded, result))
+        self.assertEqual({}, registers)
+        self.assertEqual(['s'], list(result))
+        self.assertIsInstance(result['s'], RequestFailedException)
+
+    def test_coalesce_writes(self):
+        encoded = [(ByteH('h', 100, 'H'), 1, None), (ByteL('l', 100, 'L'), 2, None),
+                   (Integer('i', 101, 'I'), 5, bytes.fromhex('0005')), (ByteH('s', 104, 'S'), 3, None),
+                   (ByteL('f', 106, 'F'), 9, None)]
+        frames = self._coalesce_writes(encoded, {104: bytes.fromhex('0203')}, {'f': ValueError()})
+        self.assertEqual([(100, bytes.fromhex('01020005'), {'h', 'l', 'i'}), (104, bytes.fromhex('0303'), {'s'})],
+                         frames)
+
+    def test_execute_writes(self):
+        self._list_of_requests.clear()
+        self.mock_response(self._write_command(104, 0x0303), 'NO RESPONSE')
+        result = {}
+        self.loop.run_until_complete(
+            self._execute_writes([(100, bytes.fromhex('01020005'), {'h', 'l', 'i'}),
+                                  (104, bytes.fromhex('0303'), {'s'})], result))
+        self.assertEqual([self._write_multi_command(100, bytes.fromhex('01020005')).request],
+                         self._list_of_requests)
+        self.assertEqual(['s'], list(result))
+        self.assertIsInstance(result['s'], RequestFailedException)
+
     def test_GW10K_ET_fw1023_device_info(self):
         self.assertEqual('GW10K-ET', self.model_name)
         self.assertEqual('9010KETU000W0000', self.serial_number)
@@ -1343,3 +1573,52 @@ class GW5K_BT_Test(EtMock):
         self.assertEqual(147, self.arm_svn_version)
         self.assertEqual('04029-03-S10', self.firmware)
         self.assertEqual('02041-11-S00', self.arm_firmware)
+
+
+class SingleFlightTest(IsolatedAsyncioTestCase):
+
+    async def test_concurrent_commands(self):
+        inverter = ET("localhost", 8899)
+        executed = []
+
+        async def execute_command(command):
+            executed.append(command)
+            await asyncio.sleep(0.01)
+            return ProtocolResponse(bytes.fromhex("f70304000102036f1f"), command)
+
+        inverter._execute_command = execute_command
+        read = ModbusRtuReadCommand(0xf7, 35100, 2)
+        first, second, third = await asyncio.gather(inverter._read_from_socket(read),
+                                                    inverter._read_from_socket(read),
+                                                    inverter._read_from_socket(ModbusRtuReadCommand(0xf7, 35102, 2)))
+        self.assertEqual(2, len(executed))
+        self.assertEqual(first.raw_data, second.raw_data)
+        self.assertIsNot(first, second)
+        await inverter._read_from_socket(read)
+        self.assertEqual(3, len(executed))
+
+    async def test_write_invalidates_recent_reads(self):
+        inverter = ET("localhost", 8899)
+        registers = {47518: 0x0101}
+        executed = []
+
+        async def execute_command(command):
+            executed.append(command)
+            if isinstance(command, ModbusRtuReadCommand):
+                data = b''.join(registers.get(command.first_address + i, 0).to_bytes(2, "big")
+                                for i in range(command.value))
+                return ProtocolResponse(bytes.fromhex("aa55f703") + bytes([len(data)]) + data + b'\0\0', command)
+            registers[command.first_address] = command.value & 0xffff
+            return ProtocolResponse(bytes.fromhex("aa55f706"), command)
+
+        inverter._execute_command = execute_command
+        inverter.set_freshness_window(60)
+        read = ModbusRtuReadCommand(0xf7, 47518, 1)
+        self.assertEqual(b'\x01\x01', (await inverter._read_from_socket(read)).read(2))
+        await inverter._read_from_socket(inverter._write_command(47518, 0x0202))
+        self.assertEqual(b'\x02\x02', (await inverter._read_from_socket(read)).read(2))
+        self.assertEqual(3, len(executed))
+
+        await inverter._write_setting(ByteH("high", 47518, "High"), 5)
+        await inverter._write_setting(ByteL("low", 47518, "Low"), 6)
+        self.assertEqual(0x0506, registers[47518])
@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from goodwe.derived import evaluate
+from goodwe.lazy import LazyRuntimeData
+from goodwe.protocol import ProtocolResponse
+from goodwe.sensor import Derived, Power, Voltage
+
+
+class CountingVoltage(Voltage):
+
+    def __init__(self, id_: str, offset: int):
+        super().__init__(id_, offset, id_, None)
+        self.reads = 0
+
+    def read_value(self, data: ProtocolResponse):
+        self.reads += 1
+        return super().read_value(data)
+
+
+class TestLazyRuntimeData(TestCase):
+
+    def setUp(self) -> None:
+        self.response = ProtocolResponse(bytes.fromhex('09290064ffff'), None)
+        self.v1 = CountingVoltage("v1", 0)
+        self.v2 = CountingVoltage("v2", 2)
+        self.sensors = (self.v1, self.v2, Power("p", 4, "P", None))
+
+    def test_decode_on_access(self):
+        data = LazyRuntimeData().add_response(self.response, self.sensors)
+        self.assertEqual(['v1', 'v2', 'p'], list(data))
+        self.assertEqual(0, self.v1.reads + self.v2.reads)
+        self.assertEqual(234.5, data['v1'])
+        self.assertEqual(234.5, data['v1'])
+        self.assertEqual(1, self.v1.reads)
+        self.assertEqual(0, self.v2.reads)
+        self.assertTrue('v2' in data)
+        self.assertFalse(data.is_decoded('v2'))
+        self.assertEqual({'v1': 234.5, 'v2': 10.0, 'p': None}, dict(data))
+        self.assertRaises(KeyError, data.__getitem__, 'x')
+
+    def test_update_and_copy(self):
+        data = LazyRuntimeData().add_response(self.response, self.sensors[:1])
+        data.update(LazyRuntimeData().add_response(self.response, self.sensors[1:]))
+        data['serial_number'] = 'SN'
+        self.assertEqual(0, self.v2.reads)
+        copy = data.copy()
+        self.assertEqual(10.0, copy['v2'])
+        self.assertFalse(data.is_decoded('v2'))
+        self.assertEqual({'v1': 234.5, 'v2': 10.0, 'p': None, 'serial_number': 'SN'}, dict(data))
+
+    def test_derived(self):
+        total = Derived("total", ("v1", "v2"), lambda v1, v2: v1 + v2, "Total", "V")
+        broken = Derived("broken", ("p",), lambda p: p + 1, "Broken", "W")
+        data = evaluate((total, broken), LazyRuntimeData().add_response(self.response, self.sensors))
+        self.assertFalse(data.is_decoded('total'))
+        self.assertEqual(0, self.v1.reads)
+        self.assertEqual(244.5, data['total'])
+        with self.assertLogs('goodwe.derived'):
+            self.assertIsNone(data['broken'])
@@ -0,0 +1,73 @@
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
+
+from goodwe.exceptions import RequestRejectedException
+from goodwe.metrics import Histogram, ProtocolMetrics
+from goodwe.protocol import ModbusRtuReadCommand, ProtocolCommand, UdpInverterProtocol
+
+
+class TestMetrics(TestCase):
+
+    def test_observe(self):
+        histogram = Histogram((0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(4, snapshot['count'])
+        self.assertEqual(0.05, snapshot['min'])
+        self.assertEqual(3, snapshot['max'])
+        self.assertAlmostEqual(0.9125, snapshot['avg'])
+        self.assertEqual({0.1: 2, 1: 3, float('inf'): 4}, snapshot['buckets'])
+
+    def test_count(self):
+        metrics = ProtocolMetrics()
+        metrics.count('bytes_sent', 8)
+        metrics.count('bytes_sent', 8)
+        metrics.count_rejected('')
+        self.assertEqual(16, metrics.snapshot()['bytes_sent'])
+        self.assertEqual({'INVALID RESPONSE': 1}, metrics.snapshot()['rejected'])
+
+
+class TestProtocolMetrics(IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.protocol = UdpInverterProtocol('127.0.0.1', 1337, 0xf7, 1, 3)
+
+        async def connect():
+            self.protocol._transport = mock.Mock()
+
+        self.protocol._connect = connect
+
+    async def test_request_metrics(self):
+        responses = [None, bytes.fromhex('aa55f7030401020304cd33')]
+
+        def send_request(command, response_future):
+            self.protocol._transport.sendto(command.request)
+            response = responses.pop(0)
+            if response:
+                self.protocol.command = command
+                self.protocol.response_future = response_future
+                self.protocol.datagram_received(response, ('127.0.0.1', 1337))
+            else:
+                response_future.cancel()
+
+        self.protocol._send_request = send_request
+        await ModbusRtuReadCommand(0xf7, 0x0401, 2).execute(self.protocol)
+
+        snapshot = self.protocol.metrics.snapshot()
+        self.assertEqual(1, snapshot['requests'])
+        self.assertEqual(1, snapshot['responses'])
+        self.assertEqual(1, snapshot['retries'])
+        self.assertEqual(11, snapshot['bytes_received'])
+        self.assertEqual(1, snapshot['latency']['ModbusRtuReadCommand']['count'])
+
+        self.protocol.metrics.reset()
+        self.assertEqual({'rejected': {}, 'latency': {}}, self.protocol.metrics.snapshot())
+
+    async def test_rejected_metrics(self):
+        def send_request(command, response_future):
+            response_future.set_exception(RequestRejectedException('ILLEGAL DATA ADDRESS'))
+
+        self.protocol._send_request = send_request
+        with self.assertRaises(RequestRejectedException):
+            await ProtocolCommand(bytes.fromhex('636f666665650d0a'), lambda x: True).execute(self.protocol)
+        self.assertEqual({'ILLEGAL DATA ADDRESS': 1}, self.protocol.metrics.snapshot()['rejected'])
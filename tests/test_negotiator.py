@@ -0,0 +1,65 @@
+import asyncio
+from unittest import TestCase
+
+from goodwe.exceptions import RequestRejectedException
+from goodwe.modbus import ILLEGAL_DATA_ADDRESS
+from goodwe.negotiator import BlockNegotiator
+from goodwe.protocol import ModbusRtuReadCommand, ProtocolResponse
+
+
+class TestBlockNegotiator(TestCase):
+
+    def setUp(self) -> None:
+        self.now = 0
+        self.wide = ModbusRtuReadCommand(0xf7, 0x8ca0, 0x7d)
+        self.narrow = ModbusRtuReadCommand(0xf7, 0x8ca0, 0x2d)
+        self.negotiator = BlockNegotiator('meter', (self.wide, self.narrow), 100, lambda: self.now)
+        self.supported = {self.narrow}
+        self.requests = []
+
+    async def _read(self, command):
+        self.requests.append(command)
+        if command not in self.supported:
+            raise RequestRejectedException(ILLEGAL_DATA_ADDRESS)
+        return ProtocolResponse(b'', command)
+
+    def read(self):
+        return asyncio.run(self.negotiator.read(self._read))
+
+    def test_negotiate(self):
+        self.assertEqual(self.narrow, self.read().command)
+        self.assertEqual([self.wide, self.narrow], self.requests)
+        self.assertIs(self.narrow, self.negotiator.command)
+
+        self.requests.clear()
+        self.read()
+        self.assertEqual([self.narrow], self.requests)
+
+    def test_retry_wider(self):
+        self.read()
+        self.now = 100
+        self.supported.add(self.wide)
+        self.assertEqual(self.wide, self.read().command)
+        self.assertIs(self.wide, self.negotiator.command)
+
+    def test_unsupported(self):
+        self.supported.clear()
+        self.assertIsNone(self.read())
+        self.assertFalse(self.negotiator.supported)
+        self.requests.clear()
+        self.assertIsNone(self.read())
+        self.assertEqual([], self.requests)
+
+        self.now = 100
+        self.supported.add(self.narrow)
+        self.assertIsNotNone(self.read())
+        self.assertTrue(self.negotiator.supported)
+
+    def test_other_rejection(self):
+        self.supported.clear()
+
+        async def _read(command):
+            raise RequestRejectedException('SLAVE DEVICE BUSY')
+
+        self.assertRaises(RequestRejectedException, asyncio.run, self.negotiator.read(_read))
+        self.assertTrue(self.negotiator.supported)
@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from goodwe.planner import ReadBlock, plan_reads, plan_writes
+from goodwe.sensor import ByteH, ByteL, Calculated, Integer, Long, Timestamp
+
+
+class TestPlanner(TestCase):
+
+    def test_plan_reads(self):
+        a = Integer("a", 100, "A")
+        b = Long("b", 101, "B")
+        c = Integer("c", 110, "C")
+        d = Integer("d", 200, "D")
+        self.assertEqual([ReadBlock(100, 3, (a, b)), ReadBlock(110, 1, (c,)), ReadBlock(200, 1, (d,))],
+                         plan_reads((d, c, b, a), max_gap=5))
+        self.assertEqual([ReadBlock(100, 11, (a, b, c)), ReadBlock(200, 1, (d,))],
+                         plan_reads((d, c, b, a), max_gap=8))
+
+    def test_plan_reads_max_registers(self):
+        sensors = tuple(Integer(f"s{i}", 1000 + i, "S") for i in range(300))
+        blocks = plan_reads(sensors)
+        self.assertEqual([(1000, 125), (1125, 125), (1250, 50)], [(b.offset, b.count) for b in blocks])
+        self.assertEqual(sensors, sum((b.sensors for b in blocks), ()))
+
+    def test_plan_reads_shared_register(self):
+        high = ByteH("high", 50, "H")
+        low = ByteL("low", 50, "L")
+        timestamp = Timestamp("time", 51, "T")
+        self.assertEqual([ReadBlock(50, 4, (high, low, timestamp))], plan_reads((high, low, timestamp)))
+
+    def test_plan_reads_exclude(self):
+        a = Integer("a", 100, "A")
+        b = Integer("b", 104, "B")
+        c = Integer("c", 106, "C")
+        self.assertEqual([ReadBlock(100, 1, (a,)), ReadBlock(104, 1, (b,))],
+                         plan_reads((a, b, c), exclude={102, 106}))
+
+    def test_plan_reads_calculated(self):
+        self.assertEqual([], plan_reads((Calculated("calc", lambda data: 1, "Calc", "W"),)))
+
+    def test_plan_writes(self):
+        registers = {100: b'\x00\x01', 101: b'\x00\x02', 103: b'\x00\x03', 102: b'\x00\x04'}
+        self.assertEqual([(100, b'\x00\x01\x00\x02\x00\x04\x00\x03')], plan_writes(registers))
+        self.assertEqual([(100, b'\x00\x01'), (105, b'\x00\x02')], plan_writes({105: b'\x00\x02', 100: b'\x00\x01'}))
+        self.assertEqual([(100, b'\x00\x01\x00\x02\x00\x04'), (103, b'\x00\x03')], plan_writes(registers, 3))
+        self.assertEqual([], plan_writes({}))
@@ -1,4 +1,4 @@
-from unittest import TestCase, mock
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
 
 from goodwe.protocol import *
 
@@ -25,6 +25,46 @@ class TestUDPClientProtocol(TestCase):
     #        self.future.set_result.assert_not_called()
     #        self.future.set_exception.assert_called_once_with(ProcessingException)
 
+    @mock.patch('goodwe.protocol.asyncio.get_running_loop')
+    def test_datagram_received_fragments(self, mock_get_event_loop):
+        self.protocol.command = ModbusRtuReadCommand(0xf7, 0x0401, 2)
+        # late fragment of previous response
+        self.protocol.datagram_received(bytes.fromhex('ffff'), ('127.0.0.1', 1337))
+        self.protocol.datagram_received(bytes.fromhex('aa55f70304'), ('127.0.0.1', 1337))
+        self.protocol.datagram_received(bytes.fromhex('0102'), ('127.0.0.1', 1337))
+        self.protocol.response_future.set_result.assert_not_called()
+        self.protocol.datagram_received(bytes.fromhex('0304cd33'), ('127.0.0.1', 1337))
+        self.protocol.response_future.set_result.assert_called_once_with(bytes.fromhex('aa55f7030401020304cd33'))
+        self.assertEqual(1, self.protocol.metrics.counters['fragmented_responses'])
+        self.assertEqual(1, self.protocol.metrics.counters['dropped_fragments'])
+
+    @mock.patch('goodwe.protocol.asyncio.get_running_loop')
+    def test_datagram_received_fragments_restart(self, mock_get_event_loop):
+        self.protocol.command = ModbusRtuReadCommand(0xf7, 0x0401, 2)
+        self.protocol.datagram_received(bytes.fromhex('aa55f70304'), ('127.0.0.1', 1337))
+        # complete response not fitting to already received fragment
+        self.protocol.datagram_received(bytes.fromhex('aa55f7030401020304cd33'), ('127.0.0.1', 1337))
+        self.protocol.response_future.set_result.assert_called_once_with(bytes.fromhex('aa55f7030401020304cd33'))
+        self.assertNotIn('fragmented_responses', self.protocol.metrics.counters)
+        self.assertEqual(1, self.protocol.metrics.counters['dropped_fragments'])
+
+    @mock.patch('goodwe.protocol.asyncio.get_running_loop')
+    def test_trace_listener(self, mock_get_event_loop):
+        frames = []
+
+        def listener(direction, data, command, timestamp):
+            frames.append((direction, data, command))
+
+        self.protocol.add_trace_listener(listener)
+        self.protocol.connection_made(mock.Mock())
+        self.protocol._send_request(self.protocol.command, self.protocol.response_future)
+        self.protocol.datagram_received(b'response', ('127.0.0.1', 1337))
+        self.assertEqual([(TRACE_SENT, self.protocol.command.request, self.protocol.command),
+                          (TRACE_RECEIVED, b'response', self.protocol.command)], frames)
+        self.protocol.remove_trace_listener(listener)
+        self.protocol.datagram_received(b'response', ('127.0.0.1', 1337))
+        self.assertEqual(2, len(frames))
+
     def test_error_received(self):
         exc = Exception('something went wrong')
         self.protocol.error_received(exc)
@@ -111,6 +151,21 @@ class TestUDPClientProtocol(TestCase):
         command = ModbusTcpReadCommand(180, 310, 2)
         self.assertEqual(bytes.fromhex('000100000006b40301360002'), command.request)
 
+    def test_modbus_tcp_request_bytes(self):
+        command = ModbusTcpReadCommand(180, 310, 2)
+        self.assertEqual(bytes.fromhex('abcd00000006b40301360002'), command.request_bytes(0xabcd))
+        self.assertEqual(bytes.fromhex('000100000006b40301360002'), command.request)
+        self.assertEqual(command.request, command.request_bytes())
+
+    def test_modbus_tcp_tx_per_connection(self):
+        protocol1 = TcpInverterProtocol('127.0.0.1', 502, 0xf7)
+        protocol2 = TcpInverterProtocol('127.0.0.2', 502, 0xf7)
+        self.assertEqual(1, protocol1._next_tx())
+        self.assertEqual(2, protocol1._next_tx())
+        self.assertEqual(1, protocol2._next_tx())
+        protocol1._tx = 0xFFFE
+        self.assertEqual(1, protocol1._next_tx())
+
     def test_modbus_tcp_write_command(self):
         command = ModbusTcpWriteCommand(180, 310, 0x4556)
         self.assertEqual(bytes.fromhex('000100000006B40601364556'), command.request)
@@ -130,3 +185,252 @@ class TestUDPClientProtocol(TestCase):
     def test_aa55_write_multi_command(self):
         command = Aa55WriteMultiCommand(0x0701, bytes.fromhex('08070605'))
         self.assertEqual(bytes.fromhex('AA55C07F02390B0701040807060502AA'), command.request)
+
+
+class TestTCPPipelinedProtocol(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.protocol = TcpInverterProtocol('127.0.0.1', 502, 0xf7, 1, 0)
+        self.protocol.pipeline = 4
+        self.protocol.keep_alive = True
+        self.transport = mock.Mock()
+        self.transport.is_closing.return_value = False
+
+        async def connect():
+            self.protocol._transport = self.transport
+
+        self.protocol._connect = connect
+
+    async def _until_sent(self, count: int):
+        for _ in range(20):
+            if self.transport.write.call_count >= count:
+                return
+            await asyncio.sleep(0)
+
+    async def test_out_of_order_responses(self):
+        command1 = ModbusTcpReadCommand(0xf7, 0x88b8, 1)
+        command2 = ModbusTcpReadCommand(0xf7, 0x891c, 2)
+        task1 = asyncio.create_task(command1.execute(self.protocol))
+        task2 = asyncio.create_task(command2.execute(self.protocol))
+        await self._until_sent(2)
+        self.assertEqual(2, self.transport.write.call_count)
+        tx1 = self.transport.write.call_args_list[0].args[0][0:2]
+        tx2 = self.transport.write.call_args_list[1].args[0][0:2]
+        self.assertNotEqual(tx1, tx2)
+
+        # second response arrives first, split over two segments together with first response
+        stream = tx2 + bytes.fromhex('00000007f70304a1a2a3a4') + tx1 + bytes.fromhex('00000005f7030200ff')
+        self.protocol.data_received(stream[:10])
+        self.protocol.data_received(stream[10:])
+
+        self.assertEqual(bytes.fromhex('00ff'), (await task1).response_data())
+        self.assertEqual(bytes.fromhex('a1a2a3a4'), (await task2).response_data())
+        self.assertFalse(self.protocol._pending)
+
+    async def test_rejected_response(self):
+        command = ModbusTcpReadCommand(0xf7, 0x88b8, 1)
+        task = asyncio.create_task(command.execute(self.protocol))
+        await self._until_sent(1)
+        tx = self.transport.write.call_args.args[0][0:2]
+        self.protocol.data_received(tx + bytes.fromhex('00000003f78302'))
+        with self.assertRaises(RequestRejectedException):
+            await task
+
+    async def test_stalled_connection_reconnects(self):
+        connections = []
+
+        async def connect():
+            connections.append(self.transport)
+            self.protocol._transport = self.transport
+
+        self.protocol._connect = connect
+        self.protocol.timeout = 0.05
+        self.protocol.retries = 1
+        command = ModbusTcpReadCommand(0xf7, 0x88b8, 1)
+        task = asyncio.create_task(command.execute(self.protocol))
+        # first request stalls, answer only the retry (sent over reopened connection)
+        for _ in range(100):
+            if self.transport.write.call_count >= 2:
+                break
+            await asyncio.sleep(0.005)
+        self.assertEqual(2, self.transport.write.call_count)
+        self.transport.close.assert_called_once()
+        tx = self.transport.write.call_args_list[1].args[0][0:2]
+        self.protocol.data_received(tx + bytes.fromhex('00000005f7030200ff'))
+
+        self.assertEqual(bytes.fromhex('00ff'), (await task).response_data())
+        self.assertEqual(2, len(connections))
+        self.assertFalse(self.protocol._pending)
+
+    async def test_max_retries(self):
+        self.protocol.timeout = 0.01
+        self.protocol.retries = 3
+        self.protocol.retry_policy = RetryPolicy(budget=1, backoff=0.01, jitter=False)
+        with self.assertRaises(MaxRetriesException):
+            await ModbusTcpReadCommand(0xf7, 0x88b8, 1).execute(self.protocol)
+        # retry budget of the policy shared with serial requests allows single retry
+        self.assertEqual(2, self.transport.write.call_count)
+        self.transport.close.assert_called()
+
+
+class TestProtocolResponse(TestCase):
+
+    def test_read_at(self):
+        command = ModbusRtuReadCommand(0xf7, 0x88b8, 3)
+        response = ProtocolResponse(bytes.fromhex('aa55f70306000102030405ffff'), command)
+        self.assertEqual(bytes.fromhex('000102030405'), response.data)
+        self.assertEqual(bytes.fromhex('0203'), response.read_at(0x88b9, 2))
+        self.assertEqual(bytes.fromhex('0405'), response.read_at(0x88ba, 4))
+        self.assertRaises(ValueError, response.read_at, 0x88b7, 2)
+
+    def test_seek_read(self):
+        command = ModbusRtuReadCommand(0xf7, 0x88b8, 3)
+        response = ProtocolResponse(bytes.fromhex('aa55f70306000102030405ffff'), command)
+        response.seek(0x88b9)
+        self.assertEqual(bytes.fromhex('02'), response.read(1))
+        # random access does not affect the read position
+        self.assertEqual(bytes.fromhex('0001'), response.read_at(0x88b8, 2))
+        self.assertEqual(bytes.fromhex('0304'), response.read(2))
+        self.assertEqual(bytes.fromhex('05'), response.read(2))
+        self.assertEqual(b'', response.read(2))
+        self.assertRaises(ValueError, response.seek, 0x88b7)
+
+
+class TestRttEstimator(TestCase):
+
+    def test_update(self):
+        rtt = RttEstimator(1, 0.05, 3)
+        self.assertEqual(1, rtt.rto)
+        rtt.update(0.02)
+        self.assertAlmostEqual(0.02, rtt.srtt)
+        self.assertAlmostEqual(0.01, rtt.rttvar)
+        # 0.02 + 4 * 0.01 = 0.06
+        self.assertAlmostEqual(0.06, rtt.rto)
+        for _ in range(50):
+            rtt.update(0.02)
+        # variance converges to 0, rto to the floor
+        self.assertEqual(0.05, rtt.rto)
+        self.assertEqual(51, rtt.samples)
+
+    def test_backoff(self):
+        rtt = RttEstimator(1, 0.05, 3)
+        rtt.backoff()
+        self.assertEqual(2, rtt.rto)
+        rtt.backoff()
+        self.assertEqual(3, rtt.rto)
+        self.assertEqual(2, rtt.stats()['timeouts'])
+
+    @mock.patch('goodwe.protocol.asyncio.get_running_loop')
+    def test_udp_adaptive_timeout(self, mock_get_event_loop):
+        mock_loop = mock.Mock()
+        mock_loop.time.return_value = 10.0
+        mock_get_event_loop.return_value = mock_loop
+        protocol = UdpInverterProtocol('127.0.0.1', 1337, 0xf7, 1, 3)
+        protocol.rtt = RttEstimator(1, 0.05, 3)
+        protocol.connection_made(mock.Mock())
+        command = ProtocolCommand(bytes.fromhex('636f666665650d0a'), lambda x: True)
+        protocol._send_request(command, mock.Mock())
+        mock_loop.call_later.assert_called_with(1, protocol._timeout_mechanism)
+
+        mock_loop.time.return_value = 10.1
+        protocol.datagram_received(b'response', ('127.0.0.1', 1337))
+        self.assertAlmostEqual(0.1, protocol.rtt.srtt)
+        protocol._send_request(command, mock.Mock())
+        mock_loop.call_later.assert_called_with(protocol.rtt.rto, protocol._timeout_mechanism)
+        self.assertAlmostEqual(0.3, protocol.rtt.rto)
+
+
+class TestSharedUdpEndpoint(IsolatedAsyncioTestCase):
+
+    async def _start_inverter(self, reply: bytes) -> int:
+        class EchoProtocol(asyncio.DatagramProtocol):
+            def connection_made(self, transport):
+                self.transport = transport
+
+            def datagram_received(self, data, addr):
+                self.transport.sendto(reply, addr)
+
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            EchoProtocol, local_addr=('127.0.0.1', 0))
+        self.addCleanup(transport.close)
+        return transport.get_extra_info('sockname')[1]
+
+    async def test_shared_socket(self):
+        port1 = await self._start_inverter(b'inverter1')
+        port2 = await self._start_inverter(b'inverter2')
+        protocol1 = UdpInverterProtocol('127.0.0.1', port1, 0xf7, 1, 0)
+        protocol2 = UdpInverterProtocol('127.0.0.1', port2, 0xf7, 1, 0)
+        protocol1.shared_local_port = protocol2.shared_local_port = 0
+        command = ProtocolCommand(bytes.fromhex('636f666665650d0a'), lambda x: True)
+
+        response1, response2 = await asyncio.gather(command.execute(protocol1), command.execute(protocol2))
+        self.assertEqual(b'inverter1', response1.raw_data)
+        self.assertEqual(b'inverter2', response2.raw_data)
+
+        endpoint = await SharedUdpEndpoint.get(0)
+        self.assertFalse(endpoint._peers)
+        self.assertIsNotNone(endpoint._idle_timer)
+        endpoint.close()
+
+
+class TestTCPManagedConnection(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.connections = 0
+        self.requests = 0
+        self.writers = []
+        self.reject_probe = False
+
+        async def handle(reader, writer):
+            self.connections += 1
+            self.writers.append(writer)
+            try:
+                while True:
+                    request = await reader.readexactly(12)
+                    self.requests += 1
+                    if self.reject_probe and request[8:10] == bytes.fromhex('88b9'):
+                        writer.write(request[0:2] + bytes.fromhex('00000003f78302'))
+                    else:
+                        writer.write(request[0:2] + bytes.fromhex('00000005f7030200ff'))
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+
+        self.server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        self.addAsyncCleanup(self._stop_server)
+        self.protocol = TcpInverterProtocol('127.0.0.1', self.server.sockets[0].getsockname()[1], 0xf7, 1, 0)
+        self.protocol.managed = True
+        self.protocol.keep_alive = True
+        self.protocol.probe_command = ModbusTcpReadCommand(0xf7, 0x88b8, 1)
+        self.protocol.probe_interval = 0.05
+        self.protocol.idle_ttl = 0.3
+
+    async def _stop_server(self):
+        self.protocol.managed = False
+        self.protocol._close_transport()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_probe_and_reap(self):
+        await ModbusTcpReadCommand(0xf7, 35000, 1).execute(self.protocol)
+        await asyncio.sleep(0.15)
+        self.assertGreater(self.requests, 1)
+        self.assertIsNotNone(self.protocol._transport)
+        await asyncio.sleep(0.3)
+        self.assertIsNone(self.protocol._transport)
+        self.assertEqual(1, self.connections)
+
+    async def test_rejected_probe(self):
+        self.reject_probe = True
+        self.protocol.probe_command = ModbusTcpReadCommand(0xf7, 0x88b9, 1)
+        await ModbusTcpReadCommand(0xf7, 35000, 1).execute(self.protocol)
+        await asyncio.sleep(0.15)
+        self.assertGreater(self.requests, 2)
+        self.assertFalse(self.protocol._watchdog.done())
+        self.assertIsNotNone(self.protocol._transport)
+        self.assertEqual(1, self.connections)
+
+    async def test_reconnect(self):
+        await ModbusTcpReadCommand(0xf7, 35000, 1).execute(self.protocol)
+        self.writers[0].close()
+        await asyncio.sleep(0.05)
+        self.assertEqual(2, self.connections)
+        self.assertIsNotNone(self.protocol._transport)
@@ -0,0 +1,117 @@
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
+
+from goodwe.exceptions import CircuitOpenException, MaxRetriesException, RequestFailedException
+from goodwe.protocol import ProtocolCommand, UdpInverterProtocol
+from goodwe.retry import CircuitBreaker, CircuitState, RetryPolicy
+
+
+class TestRetryPolicy(TestCase):
+
+    def test_delay(self):
+        policy = RetryPolicy(backoff=0.1, backoff_max=0.5, jitter=False)
+        self.assertEqual([0.1, 0.2, 0.4, 0.5], [policy.delay(i) for i in range(1, 5)])
+        self.assertEqual(0, RetryPolicy().delay(3))
+
+    def test_delay_jitter(self):
+        policy = RetryPolicy(backoff=0.2)
+        for _ in range(20):
+            self.assertTrue(0.1 <= policy.delay(1) <= 0.2)
+
+    def test_budget(self):
+        policy = RetryPolicy(budget=2, budget_ratio=0.5)
+        self.assertTrue(policy.acquire_retry())
+        self.assertTrue(policy.acquire_retry())
+        self.assertFalse(policy.acquire_retry())
+        policy.record_success()
+        self.assertFalse(policy.acquire_retry())
+        policy.record_success()
+        self.assertTrue(policy.acquire_retry())
+
+    def test_no_budget(self):
+        policy = RetryPolicy()
+        for _ in range(100):
+            self.assertTrue(policy.acquire_retry())
+
+
+class TestCircuitBreaker(TestCase):
+
+    def setUp(self) -> None:
+        self.now = 0
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=lambda: self.now)
+
+    def test_open(self):
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertEqual(CircuitState.OPEN, self.breaker.state)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_half_open(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now = 60
+        self.assertTrue(self.breaker.allow_request())
+        self.assertEqual(CircuitState.HALF_OPEN, self.breaker.state)
+        # only single probe is let through
+        self.assertFalse(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertEqual(CircuitState.OPEN, self.breaker.state)
+        self.now = 100
+        self.assertFalse(self.breaker.allow_request())
+        self.now = 120
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success()
+        self.assertEqual(CircuitState.CLOSED, self.breaker.state)
+        self.assertTrue(self.breaker.allow_request())
+
+
+class TestRetryEngine(IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.protocol = UdpInverterProtocol('127.0.0.1', 1337, 0xf7, 1, 3)
+        self.command = ProtocolCommand(bytes.fromhex('636f666665650d0a'), lambda x: True)
+
+        async def connect():
+            self.protocol._transport = mock.Mock()
+
+        self.protocol._connect = connect
+        self.sent = 0
+
+        def send_request(command, response_future):
+            # never answered, simulate timeout immediately
+            self.sent += 1
+            response_future.cancel()
+
+        self.protocol._send_request = send_request
+
+    async def test_max_retries(self):
+        with self.assertRaises(MaxRetriesException):
+            await self.command.execute(self.protocol)
+        self.assertEqual(4, self.sent)
+
+    async def test_retry_budget(self):
+        self.protocol.retry_policy = RetryPolicy(budget=1)
+        with self.assertRaises(MaxRetriesException):
+            await self.command.execute(self.protocol)
+        self.assertEqual(2, self.sent)
+
+    async def test_backoff(self):
+        self.protocol.retry_policy = RetryPolicy(backoff=0.1, jitter=False)
+        with mock.patch('goodwe.protocol.asyncio.sleep') as mock_sleep:
+            with self.assertRaises(MaxRetriesException):
+                await self.command.execute(self.protocol)
+        self.assertEqual([mock.call(0.1), mock.call(0.2), mock.call(0.4)], mock_sleep.call_args_list)
+
+    async def test_circuit_breaker(self):
+        from goodwe.dt import DT
+        inverter = DT('127.0.0.1', 1337, 0x7f, 1, 0)
+        inverter._protocol = self.protocol
+        self.protocol.retries = 0
+        inverter.set_circuit_breaker(CircuitBreaker(failure_threshold=2))
+        for _ in range(2):
+            with self.assertRaises(RequestFailedException):
+                await inverter._read_from_socket(self.command)
+        with self.assertRaises(CircuitOpenException) as ctx:
+            await inverter._read_from_socket(self.command)
+        self.assertEqual(2, ctx.exception.consecutive_failures_count)
+        self.assertEqual(2, self.sent)
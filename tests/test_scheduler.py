@@ -0,0 +1,74 @@
+import asyncio
+from unittest import TestCase
+
+from goodwe.inverter import SensorKind
+from goodwe.scheduler import PollingScheduler, SensorValue
+from goodwe.sensor import Energy, Power
+
+
+class InverterMock:
+
+    def __init__(self):
+        self._sensors = (
+            Power("pgrid", 100, "Grid power", SensorKind.AC),
+            Power("pbattery", 102, "Battery power", SensorKind.BAT),
+            Energy("e_total", 200, "Total energy", SensorKind.PV),
+        )
+        self.requests = []
+        self.missing = set()
+
+    def sensors(self):
+        return self._sensors
+
+    async def read_runtime_data(self, sensor_ids=None):
+        self.requests.append(sorted(sensor_ids))
+        return {sensor_id: len(self.requests) for sensor_id in sensor_ids if sensor_id not in self.missing}
+
+
+class TestPollingScheduler(TestCase):
+
+    def setUp(self) -> None:
+        self.now = 0
+        self.inverter = InverterMock()
+        self.scheduler = PollingScheduler(self.inverter, default_interval=60, clock=lambda: self.now)
+        self.scheduler.set_interval(SensorKind.PV, 300)
+        self.scheduler.set_interval("pgrid", 1)
+        self.scheduler.set_interval(SensorKind.BAT, 5)
+
+    def tick(self) -> dict[str, SensorValue]:
+        return asyncio.run(self.scheduler.tick())
+
+    def test_tick(self):
+        values = self.tick()
+        self.assertEqual([['e_total', 'pbattery', 'pgrid']], self.inverter.requests)
+        self.assertEqual(SensorValue(1, 0), values['e_total'])
+
+        self.now = 1
+        values = self.tick()
+        self.assertEqual(['pgrid'], self.inverter.requests[-1])
+        self.assertEqual(SensorValue(2, 0), values['pgrid'])
+        self.assertEqual(SensorValue(1, 1), values['e_total'])
+
+        self.now = 5
+        self.tick()
+        self.assertEqual(['pbattery', 'pgrid'], self.inverter.requests[-1])
+
+        self.now = 5.5
+        self.tick()
+        self.assertEqual(3, len(self.inverter.requests))
+
+    def test_invalidate(self):
+        self.tick()
+        self.scheduler.invalidate("e_total")
+        self.assertEqual(["e_total"], self.scheduler.due_sensors())
+
+    def test_missing_sensor(self):
+        self.inverter.missing.add("pbattery")
+        values = self.tick()
+        self.assertNotIn("pbattery", values)
+        self.now = 1
+        self.tick()
+        self.assertEqual(['pgrid'], self.inverter.requests[-1])
+        self.now = 5
+        self.tick()
+        self.assertEqual(['pbattery', 'pgrid'], self.inverter.requests[-1])
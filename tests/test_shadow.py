@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+from goodwe.protocol import ModbusRtuReadCommand, ModbusRtuWriteCommand, ModbusTcpWriteMultiCommand, \
+    ProtocolResponse
+from goodwe.shadow import RegisterShadow
+
+
+class TestRegisterShadow(TestCase):
+
+    def setUp(self) -> None:
+        self.now = 0
+        self.shadow = RegisterShadow(max_age=10, clock=lambda: self.now)
+
+    def test_update_get(self):
+        self.assertIsNone(self.shadow.get(100))
+        self.shadow.update(100, b'\x00\x01\x00\x02')
+        self.assertEqual(b'\x00\x01\x00\x02', self.shadow.get(100, 2))
+        self.assertEqual(b'\x00\x02', self.shadow.get(101))
+        self.assertIsNone(self.shadow.get(101, 2))
+        self.now = 10
+        self.assertEqual(b'\x00\x02', self.shadow.get(101))
+        self.now = 10.1
+        self.assertIsNone(self.shadow.get(101))
+
+    def test_invalidate(self):
+        self.shadow.update(100, b'\x00\x01\x00\x02')
+        self.shadow.invalidate(101)
+        self.assertEqual(1, len(self.shadow))
+        self.shadow.invalidate()
+        self.assertEqual(0, len(self.shadow))
+
+    def test_record(self):
+        command = ModbusRtuReadCommand(0xf7, 0x88b8, 2)
+        self.shadow.record(command, ProtocolResponse(bytes.fromhex('aa55f7030401020304cd33'), command))
+        self.assertEqual(bytes.fromhex('01020304'), self.shadow.get(0x88b8, 2))
+
+        command = ModbusRtuWriteCommand(0xf7, 0x88b8, -1)
+        self.shadow.record(command, ProtocolResponse(b'', command))
+        self.assertEqual(bytes.fromhex('ffff0304'), self.shadow.get(0x88b8, 2))
+
+        command = ModbusTcpWriteMultiCommand(0xf7, 0x88b9, bytes.fromhex('0506'))
+        self.shadow.record(command, ProtocolResponse(b'', command))
+        self.assertEqual(bytes.fromhex('ffff0506'), self.shadow.get(0x88b8, 2))
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+from unittest import TestCase, mock
+
+from goodwe.et import ET
+from goodwe.sync import EventLoopThread, SyncInverter, connect
+
+
+class TestSyncInverter(TestCase):
+
+    def setUp(self) -> None:
+        self.loop_thread = EventLoopThread()
+        self.addCleanup(self.loop_thread.stop)
+        self.inverter = ET('127.0.0.1', 502)
+        self.sync_inverter = SyncInverter(self.inverter, self.loop_thread)
+
+    def test_same_loop(self):
+        loops = []
+
+        async def read_sensor(sensor_id):
+            loops.append((asyncio.get_running_loop(), threading.current_thread()))
+            return sensor_id
+
+        self.inverter.read_sensor = read_sensor
+        self.assertEqual('vpv1', self.sync_inverter.read_sensor('vpv1'))
+        self.assertEqual('vpv2', self.sync_inverter.read_sensor('vpv2'))
+        self.assertIs(loops[0][0], loops[1][0])
+        self.assertIsNot(threading.current_thread(), loops[0][1])
+
+    def test_lock_reused(self):
+        self.inverter.read_sensor = mock.AsyncMock(side_effect=lambda _: self.inverter._protocol._ensure_lock())
+        self.assertIs(self.sync_inverter.read_sensor('vpv1'), self.sync_inverter.read_sensor('vpv1'))
+
+    def test_attributes(self):
+        self.inverter.serial_number = '1234'
+        self.assertEqual('1234', self.sync_inverter.serial_number)
+        self.assertEqual(self.inverter.sensors(), self.sync_inverter.sensors())
+
+    @mock.patch('goodwe.sync.async_connect')
+    def test_connect(self, mock_connect):
+        mock_connect.return_value = self.inverter
+        sync_inverter = connect('127.0.0.1', 502, 'ET')
+        self.assertIs(self.inverter, sync_inverter.inverter)
+        self.assertTrue(self.inverter._protocol.keep_alive)